@@ -107,6 +107,121 @@ io.on('connection', (socket) => {
 const MODEL_SERVICE_URL = 'http://127.0.0.1:5000';
 // const MODEL_SERVICE_URL = 'http://192.168.1.107:5000'; // Alternatif IP
 
+// Aşama adlarının kullanıcıya gösterilecek karşılıkları
+const MODEL_STAGE_MESSAGES = {
+  decoding: 'Decoding audio',
+  detecting_speech: 'Detecting speech',
+  transcribing: 'Transcribing audio',
+  diarizing: 'Identifying speakers',
+  aligning: 'Aligning transcript with speakers',
+  analyzing: 'Analyzing meeting'
+};
+
+// Model servisindeki işi server-sent events ile takip eder ve olayları Socket.io ile istemciye iletir.
+// Bağlantı koparsa son olay kimliğinden (Last-Event-ID) devam ederek yeniden bağlanır.
+function watchModelJob(jobId, lastEventId = null, retries = 0) {
+  const headers = { Accept: 'text/event-stream' };
+  if (lastEventId) {
+    headers['Last-Event-ID'] = String(lastEventId);
+  }
+  
+  let finished = false;
+  let lastStage = null;
+  
+  const handleEvent = (event) => {
+    if (event.seq) {
+      lastEventId = event.seq;
+    }
+    
+    if (event.status === 'completed') {
+      finished = true;
+      io.emit('processingUpdate', {
+        status: 'completed',
+        message: 'İşlem tamamlandı!',
+        jobId: jobId
+      });
+    } else if (event.status === 'error' || event.status === 'not_found') {
+      finished = true;
+      io.emit('processingUpdate', {
+        status: 'error',
+        message: `Model hatası: ${event.error || 'Bilinmeyen hata'}`,
+        jobId: jobId
+      });
+    } else if (event.status === 'processing') {
+      // Yalnızca aşama değiştiğinde mesaj göster, ilerleme yüzdesi her olayda gönderilir
+      const stageChanged = event.stage && event.stage !== lastStage;
+      lastStage = event.stage || lastStage;
+      io.emit('processingUpdate', {
+        status: 'modelProgress',
+        message: stageChanged ? `${MODEL_STAGE_MESSAGES[event.stage] || event.stage}...` : null,
+        stage: event.stage,
+        progress: event.progress,
+        jobId: jobId
+      });
+    } else if (event.status === 'queued') {
+      io.emit('processingUpdate', {
+        status: 'modelProgress',
+        message: event.queue_position ? `Waiting in queue (position ${event.queue_position})...` : null,
+        progress: 0,
+        jobId: jobId
+      });
+    }
+  };
+  
+  const reconnect = (reason) => {
+    if (finished) {
+      return;
+    }
+    if (retries >= 5) {
+      io.emit('processingUpdate', {
+        status: 'error',
+        message: `Model servisi ile bağlantı kesildi: ${reason}`,
+        jobId: jobId
+      });
+      return;
+    }
+    console.log(`Olay akışı kesildi (${reason}), yeniden bağlanılıyor: ${jobId}`);
+    setTimeout(() => watchModelJob(jobId, lastEventId, retries + 1), 2000 * (retries + 1));
+  };
+  
+  axios({
+    method: 'get',
+    url: `${MODEL_SERVICE_URL}/api/events/${jobId}`,
+    headers: headers,
+    responseType: 'stream',
+    timeout: 0
+  }).then((response) => {
+    let buffer = '';
+    response.data.on('data', (chunk) => {
+      buffer += chunk.toString('utf8');
+      let separatorIndex;
+      while ((separatorIndex = buffer.indexOf('\n\n')) >= 0) {
+        const rawEvent = buffer.slice(0, separatorIndex);
+        buffer = buffer.slice(separatorIndex + 2);
+        const data = rawEvent
+          .split('\n')
+          .filter((line) => line.startsWith('data:'))
+          .map((line) => line.slice(5).trim())
+          .join('\n');
+        if (!data) {
+          continue; // keepalive yorumu
+        }
+        try {
+          retries = 0;
+          handleEvent(JSON.parse(data));
+        } catch (error) {
+          console.error('Olay ayrıştırma hatası:', error.message);
+        }
+      }
+    });
+    response.data.on('end', () => reconnect('stream ended'));
+    response.data.on('error', (error) => reconnect(error.message));
+  }).catch((error) => {
+    console.error('Olay akışı hatası:', error.message);
+    reconnect(error.message);
+  });
+}
+
 // Rotalar
 app.get('/api/test-model', async (req, res) => {
   try {
@@ -184,7 +299,7 @@ app.post('/api/upload', upload.fields([
 
 app.post('/api/process', async (req, res) => {
   try {
-    const { audioPath, textFilePath } = req.body;
+    const { audioPath, textFilePath, quality } = req.body;
     
     if (!audioPath) {
       return res.status(400).json({ error: 'Ses dosyası yolu belirtilmedi' });
@@ -209,6 +324,11 @@ app.post('/api/process', async (req, res) => {
         audio_path: fullAudioPath.replace(/\\/g, '/')
       };
       
+      // Özet kalite seviyesi (fast, balanced, quality) verildiyse ilet
+      if (quality) {
+        requestData.quality = quality;
+      }
+      
       // Text dosyası varsa ekle
       if (textFilePath) {
         const fullTextPath = path.join(__dirname, textFilePath);
@@ -252,40 +372,8 @@ app.post('/api/process', async (req, res) => {
         jobId: jobId
       });
       
-      // Durumu kontrol et (polling)
-      let isComplete = false;
-      const checkInterval = setInterval(async () => {
-        try {
-          const statusResponse = await axios.get(`${MODEL_SERVICE_URL}/api/status/${jobId}`);
-          console.log(`Durum kontrolü: ${jobId}`, statusResponse.data);
-          
-          const status = statusResponse.data.status;
-          
-          if (status === 'completed') {
-            clearInterval(checkInterval);
-            isComplete = true;
-            
-            // İşlem tamamlandı bildirimi gönder
-            io.emit('processingUpdate', { 
-              status: 'completed', 
-              message: 'İşlem tamamlandı!',
-              jobId: jobId
-            });
-          } else if (status === 'error') {
-            clearInterval(checkInterval);
-            isComplete = true;
-            
-            // Hata bildirimi gönder
-            io.emit('processingUpdate', { 
-              status: 'error', 
-              message: `Model hatası: ${statusResponse.data.error || 'Bilinmeyen hata'}`,
-              jobId: jobId
-            });
-          }
-        } catch (error) {
-          console.error('Durum kontrolü hatası:', error.message);
-        }
-      }, 10000); // 10 saniyede bir kontrol et
+      // Durumu model servisinin olay akışından (SSE) takip et, polling yapılmaz
+      watchModelJob(jobId);
       
     } catch (error) {
       console.error('Model servis hatası:', error.message);
@@ -310,6 +398,58 @@ app.post('/api/process', async (req, res) => {
   }
 });
 
+// Tamamlanmış bir toplantıyı yeni metin dosyası ile yeniden analiz et (ses tekrar işlenmez)
+app.post('/api/reanalyze/:jobId', async (req, res) => {
+  const { jobId } = req.params;
+  const { textFilePath, quality } = req.body;
+
+  try {
+    const requestData = {};
+    if (quality) {
+      requestData.quality = quality;
+    }
+    if (textFilePath) {
+      const fullTextPath = path.join(__dirname, textFilePath);
+      if (!fs.existsSync(fullTextPath)) {
+        return res.status(404).json({ error: 'Metin dosyası bulunamadı' });
+      }
+      requestData.text_file_path = fullTextPath.replace(/\\/g, '/');
+    }
+
+    const modelResponse = await axios.post(`${MODEL_SERVICE_URL}/api/reanalyze/${jobId}`, requestData, {
+      headers: { 'Content-Type': 'application/json' },
+      timeout: 60000
+    });
+    const newJobId = modelResponse.data.job_id;
+
+    res.status(200).json({
+      message: 'Yeniden analiz model servise iletildi',
+      jobId: newJobId,
+      sourceJobId: jobId
+    });
+
+    io.emit('processingUpdate', {
+      status: 'modelStarted',
+      message: 'Yeniden analiz başladı...',
+      jobId: newJobId
+    });
+    watchModelJob(newJobId);
+
+  } catch (error) {
+    console.error('Yeniden analiz hatası:', error.message);
+    if (error.response) {
+      return res.status(error.response.status).json({
+        status: 'error',
+        error: `Model servisten hata: ${error.response.data.error || error.message}`
+      });
+    }
+    return res.status(500).json({
+      status: 'error',
+      error: `Model servise bağlanılamadı: ${error.message}`
+    });
+  }
+});
+
 app.get('/api/result/:jobId', async (req, res) => {
   const { jobId } = req.params;
   
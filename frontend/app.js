@@ -128,9 +128,7 @@ async function handleFormSubmit(e) {
                 currentJobId = processResult.jobId;
                 
                 addStatusMessage('info', 'Model processing has started, this may take a few minutes...');
-                
-                // Düzenli sonuç kontrolü başlat
-                pollProcessingResult(currentJobId);
+                // İlerleme ve tamamlanma bildirimleri Socket.io 'processingUpdate' olaylarıyla gelir
                 
             } catch (error) {
                 console.error('Model işleme hatası:', error);
@@ -160,6 +158,12 @@ function handleProcessingUpdate(data) {
         case 'modelProcessing':
             addStatusMessage('info', data.message);
             break;
+        case 'modelProgress':
+            // Aşama değişimlerinde mesaj gelir, ara ilerleme olaylarında yalnızca yüzde güncellenir
+            if (data.message) {
+                addStatusMessage('info', `${data.message} (${data.progress || 0}%)`);
+            }
+            break;
         case 'completed':
             addStatusMessage('success', 'The transaction is complete!');
             // Sonuçları göster
@@ -205,39 +209,6 @@ function displayVideo(videoUrl) {
     videoPlayerCard.classList.remove('d-none');
 }
 
-// Sonuç kontrolü (polling)
-function pollProcessingResult(jobId) {
-    const pollInterval = setInterval(async () => {
-        try {
-            const response = await fetch(`${API_BASE_URL}/api/status/${jobId}`);
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            
-            const data = await response.json();
-            
-            if (data.status === 'completed') {
-                clearInterval(pollInterval);
-                addStatusMessage('success', 'The transaction is complete!');
-                fetchAndDisplayResults(jobId);
-            } else if (data.status === 'error') {
-                clearInterval(pollInterval);
-                addStatusMessage('error', `İşlem hatası: ${data.error}`);
-                resetProcessingUI();
-            }
-            
-        } catch (error) {
-            console.error('Durum kontrolü hatası:', error);
-            // Hata durumunda interval'i durdurma - servis bağlantısı kesilmiş olabilir
-            if (error.message.includes('Failed to fetch')) {
-                clearInterval(pollInterval);
-                addStatusMessage('error', 'Sunucu bağlantısı kesildi.');
-                resetProcessingUI();
-            }
-        }
-    }, 5000); // 5 saniyede bir kontrol et
-}
-
 // Sonuçları getir ve göster
 async function fetchAndDisplayResults(jobId) {
     try {
@@ -6,6 +6,7 @@ from datetime import datetime
 import os
 from .topic import detect_meeting_topic
 from .sentiment import analyze_sentiment
+from ..runtime.metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,19 @@ def save_analysis_results(analysis_results, output_dir="meeting_analyses"):
         logger.error(f"Sonuçlar kaydedilirken hata oluştu: {str(e)}")
         return None
 
-def analyze_meeting(aligned_transcript, text_file_path=None):
+def analyze_meeting(aligned_transcript, text_file_path=None, progress_callback=None, options=None, speech_map=None,
+                    audio_seconds=None, stage_metrics=None, raise_errors=False):
+    """
+    Args:
+        options (dict): İsteğe bağlı ayarlar, ör. {"quality": "fast"} (konu özetinin kalite seviyesi)
+        speech_map (SpeechMap): VAD konuşma bölgeleri; verilirse sessizlik oranları rapora eklenir
+        audio_seconds (float): Kayıt süresi, alt aşamaların gerçek zaman oranı (RTF) için
+        stage_metrics (dict): Verilirse topic, sentiment ve save alt aşamalarının ölçümleri buraya yazılır
+        raise_errors (bool): Analiz veya konu tespiti başarısız olursa yedek sonuç döndürmek yerine hatayı ilet
+    """
+    options = options or {}
+    if audio_seconds is None and speech_map is not None:
+        audio_seconds = speech_map.total_seconds
     try:
         print(f"Toplantı analizi başlatılıyor...")
         print(f"Analiz için {len(aligned_transcript) if isinstance(aligned_transcript, list) else 'Hatalı'} segment mevcut")
@@ -100,16 +113,23 @@ def analyze_meeting(aligned_transcript, text_file_path=None):
         
         # Toplantı konusu tespiti - segmentleri de geçirerek çağır
         # Eğer ek metin dosyası varsa, bunu da konuya ekle
+        topic_stats = {}
         if additional_text:
             print("Metin dosyası içeriği özet oluşturmada kullanılacak")
-            meeting_topic = detect_meeting_topic(full_text, aligned_transcript, additional_text)
-        else:
-            meeting_topic = detect_meeting_topic(full_text, aligned_transcript)
+        with stage_timer("topic", audio_seconds, report=stage_metrics):
+            meeting_topic = detect_meeting_topic(
+                full_text, aligned_transcript, additional_text,
+                quality=options.get("quality"), stats=topic_stats, raise_errors=raise_errors
+            )
         
         print(f"Tespit edilen toplantı konusu: {meeting_topic}")
+        # Konu tespiti analizin en uzun kısmıdır, ilerlemeyi bildir
+        if progress_callback:
+            progress_callback(0.6)
         
         # Duygu analizi
-        meeting_sentiment = analyze_sentiment(aligned_transcript)
+        with stage_timer("sentiment", audio_seconds, report=stage_metrics):
+            meeting_sentiment = analyze_sentiment(aligned_transcript)
         print(f"Toplantı duygu analizi: {meeting_sentiment['overall']}")
         
         # Özet oluştur
@@ -127,9 +147,20 @@ def analyze_meeting(aligned_transcript, text_file_path=None):
             "speaker_stats": speakers,
             "sentiment": meeting_sentiment,
             "speaker_dialogues": speaker_dialogues,  # Diyalogları sonuçlara ekle
-            "used_additional_text": used_additional_text  # Ek metin kullanıldı mı bilgisi
+            "used_additional_text": used_additional_text,  # Ek metin kullanıldı mı bilgisi
+            "generation": topic_stats  # Özet kalite seviyesi, modu ve üretim süresi
         }
         
+        # Kayıttaki sessizlik oranı ve konuşmacı segmentlerinin içinde kalan sessizlik
+        if speech_map is not None:
+            silence = speech_map.summary()
+            silence["speaker_silence_seconds"] = {
+                speaker: round(sum(speech_map.silence_within(d["start_time"], d["end_time"]) for d in dialogues), 3)
+                for speaker, dialogues in speaker_dialogues.items()
+            }
+            analysis_results["silence"] = silence
+            print(f"Sessizlik oranı: %{silence['silence_ratio'] * 100:.1f}")
+        
         # Eğer ek metin kullanıldıysa bunu analiz sonuçlarında özellikle belirt
         if used_additional_text:
             analysis_results["additional_text_info"] = {
@@ -138,7 +169,8 @@ def analyze_meeting(aligned_transcript, text_file_path=None):
             }
         
         # Sonuçları kaydet
-        save_analysis_results(analysis_results)
+        with stage_timer("save", audio_seconds, report=stage_metrics):
+            save_analysis_results(analysis_results)
         
         return analysis_results
     
@@ -147,6 +179,8 @@ def analyze_meeting(aligned_transcript, text_file_path=None):
         import traceback
         print(f"Analiz hata detayları:\n{traceback.format_exc()}")
         logger.error(f"Analiz hatası: {str(e)}")
+        if raise_errors:
+            raise
         return {
             "summary": "Analiz sırasında hata oluştu.",
             "topic": "Toplantı konusu belirlenemedi",
@@ -1,79 +1,166 @@
 #  Duygusal analiz yapar. Konuşmanın olumlu, olumsuz veya nötr olduğunu belirler.
 
 
+import os
 import logging
-import torch
+
+from ..runtime.registry import model_registry
 
 logger = logging.getLogger(__name__)
 
+SENTIMENT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_REGISTRY_NAME = "sentiment"
+
+def _load_sentiment():
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    
+    # GPU kontrolü
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_ID)
+    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_ID)
+    model.to(device)
+    model.eval()
+    return {
+        "tokenizer": tokenizer,
+        "model": model,
+        "device": device
+    }
+
+def _warmup_sentiment(sentiment):
+    token_ids = sentiment["tokenizer"]("Thanks, this looks good.", add_special_tokens=False)["input_ids"]
+    score_windows(sentiment, [(0, token_ids)], 1)
+
+model_registry.register(SENTIMENT_REGISTRY_NAME, _load_sentiment, warmup=_warmup_sentiment)
+
+def _sentiment_label(positive_ratio):
+    # Genel duygu durumunu belirle
+    if positive_ratio > 0.6:
+        return "positive", "positive and constructive"
+    if positive_ratio < 0.4:
+        return "negative", "tense and problematic"
+    return "neutral", "neutral"
+
+def _window_size(tokenizer, model):
+    # Özel tokenler ([CLS], [SEP]) için yer bırakarak bir pencereye sığan içerik token sayısı
+    max_length = min(tokenizer.model_max_length, getattr(model.config, "max_position_embeddings", 512))
+    return max_length - tokenizer.num_special_tokens_to_add(pair=False)
+
+def build_token_windows(token_ids, window_size):
+    """
+    Segmentlerin token dizilerini model sınırına tam sığan pencerelere böler. Pencereler segment sınırını
+    aşmaz, böylece her pencerenin skoru tek bir segmente aittir; uzun segmentler birden fazla pencereye
+    bölünür ve hiçbir token kesilip atılmaz.
+    Returns:
+        list: [(segment indeksi, token id listesi), ...]
+    """
+    windows = []
+    for segment_index, ids in enumerate(token_ids):
+        for offset in range(0, len(ids), window_size):
+            windows.append((segment_index, ids[offset:offset + window_size]))
+    return windows
+
+def score_windows(sentiment, windows, batch_size):
+    """
+    Pencereleri uzunluğa göre sıralayıp (dolgu israfını azaltmak için) gruplar halinde modelden geçirir.
+    Returns:
+        list: Her pencere için olumlu sınıf olasılığı (pencere sırasıyla)
+    """
+    import torch
+    tokenizer = sentiment["tokenizer"]
+    model = sentiment["model"]
+    positive_id = model.config.label2id.get("POSITIVE", 1)
+    scores = [0.0] * len(windows)
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i][1]))
+    
+    with torch.inference_mode():
+        for batch_start in range(0, len(order), batch_size):
+            batch_indices = order[batch_start:batch_start + batch_size]
+            encoded = tokenizer.pad(
+                {"input_ids": [tokenizer.build_inputs_with_special_tokens(windows[i][1]) for i in batch_indices]},
+                return_tensors="pt"
+            )
+            encoded = {key: value.to(sentiment["device"]) for key, value in encoded.items()}
+            probabilities = torch.softmax(model(**encoded).logits.float(), dim=-1)[:, positive_id].tolist()
+            for window_index, probability in zip(batch_indices, probabilities):
+                scores[window_index] = probability
+    return scores
+
 def analyze_sentiment(transcript):
     try:
         print("Duygu analizi başlatılıyor...")
+        batch_size = max(1, int(os.getenv("SENTIMENT_BATCH_SIZE", "32")))
+        texts = [segment["text"] for segment in transcript]
         
-        # Tüm metni birleştir
-        all_text = " ".join([segment["text"] for segment in transcript])
+        # Duygu analizi modelini kayıt defterinden al (ilk kullanımda yüklenir)
+        print("Duygu analizi modeli hazırlanıyor...")
+        sentiment_model = model_registry.acquire(SENTIMENT_REGISTRY_NAME)
+        print("Duygu analizi modeli hazır")
         
-        # Modeli import et
         try:
-            print("Transformers modülünü import ediliyor...")
-            from transformers import pipeline
-            print("Transformers import edildi")
-        except Exception as e:
-            print(f"Transformers import hatası: {str(e)}")
-            raise Exception(f"Transformers import hatası: {str(e)}")
-        
-        # GPU kontrolü
-        device = 0 if torch.cuda.is_available() else -1
-        print(f"Cihaz: {device}, CUDA kullanılabilir: {torch.cuda.is_available()}")
-        
-        # Duygu analizi modeli
-        print("Duygu analizi modeli yükleniyor...")
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis", 
-            model="distilbert-base-uncased-finetuned-sst-2-english", 
-            device=device
-        )
-        print("Duygu analizi modeli başarıyla yüklendi")
-        
-        # Metni uygun parçalara böl (model genellikle token limitine sahip)
-        chunk_size = 500  # distilbert için yaklaşık 500 kelimelik parçalar uygun
-        text_chunks = []
-        words = all_text.split()
-        
-        for i in range(0, len(words), chunk_size):
-            chunk = " ".join(words[i:i+chunk_size])
-            text_chunks.append(chunk)
+            # Tüm segmentleri tek seferde tokenize et, sonra model sınırına tam sığan pencerelere böl
+            tokenizer = sentiment_model["tokenizer"]
+            token_ids = tokenizer(texts, add_special_tokens=False)["input_ids"] if texts else []
+            windows = build_token_windows(token_ids, _window_size(tokenizer, sentiment_model["model"]))
+            print(f"Metin {len(windows)} pencereye bölündü ({sum(len(ids) for ids in token_ids)} token)")
+            
+            window_scores = score_windows(sentiment_model, windows, batch_size)
+        finally:
+            model_registry.release(SENTIMENT_REGISTRY_NAME)
         
-        print(f"Metin {len(text_chunks)} parçaya bölündü")
+        # Segment skorları: segmentin pencerelerinin token sayısıyla ağırlıklı ortalaması
+        segment_weighted = [0.0] * len(texts)
+        segment_tokens = [0] * len(texts)
+        for (segment_index, ids), score in zip(windows, window_scores):
+            segment_weighted[segment_index] += score * len(ids)
+            segment_tokens[segment_index] += len(ids)
         
-        # Her parça için duygu analizi yap
-        results = []
-        for chunk in text_chunks:
-            result = sentiment_analyzer(chunk)
-            results.append(result[0])
+        segment_results = []
+        speaker_totals = {}
+        for index, segment in enumerate(transcript):
+            if not segment_tokens[index]:
+                continue
+            score = segment_weighted[index] / segment_tokens[index]
+            label, _ = _sentiment_label(score)
+            segment_results.append({
+                "index": index,
+                "speaker": segment.get("speaker"),
+                "start": segment.get("start"),
+                "end": segment.get("end"),
+                "overall": label,
+                "score": round(score, 4)
+            })
+            totals = speaker_totals.setdefault(segment.get("speaker"), {"weighted": 0.0, "tokens": 0, "segments": 0})
+            totals["weighted"] += segment_weighted[index]
+            totals["tokens"] += segment_tokens[index]
+            totals["segments"] += 1
         
-        # Sonuçları değerlendir
-        positive_count = sum(1 for r in results if r['label'] == 'POSITIVE')
-        total_chunks = len(results)
-        positive_ratio = positive_count / total_chunks if total_chunks > 0 else 0
+        # Konuşmacı ve toplantı skorları da token ağırlıklıdır, böylece tüm metin eşit temsil edilir
+        speaker_results = {}
+        for speaker, totals in speaker_totals.items():
+            score = totals["weighted"] / totals["tokens"]
+            label, description = _sentiment_label(score)
+            speaker_results[speaker] = {
+                "overall": label,
+                "description": description,
+                "score": round(score, 4),
+                "segments": totals["segments"]
+            }
         
-        # Genel duygu durumunu belirle
-        if positive_ratio > 0.6:
-            sentiment = "positive"
-            description = "positive and constructive"
-        elif positive_ratio < 0.4:
-            sentiment = "negative"
-            description = "tense and problematic"
-        else:
-            sentiment = "neutral"
-            description = "neutral"
+        total_tokens = sum(segment_tokens)
+        positive_ratio = sum(segment_weighted) / total_tokens if total_tokens > 0 else 0
+        sentiment, description = _sentiment_label(positive_ratio)
         
         print(f"Duygu analizi tamamlandı: {sentiment} ({positive_ratio:.2f})")
         
         return {
             "overall": sentiment,
             "description": description,
-            "score": positive_ratio
+            "score": positive_ratio,
+            "speakers": speaker_results,
+            "segments": segment_results,
+            "windows": len(windows),
+            "tokens": total_tokens
         }
     
     except Exception as e:
@@ -1,22 +1,262 @@
 # Toplantının konusunu tespit eder. NLP modellerini kullanarak içerik analizi yapar.
 
+import os
+import time
 import logging
-import torch
+import functools
+
+from ..runtime.registry import model_registry
+from ..runtime.precision import model_precision, apply_precision
 
 logger = logging.getLogger(__name__)
 
-def detect_meeting_topic(text, aligned_transcript=None, additional_text=None):
+SUMMARIZER_MODEL_ID = "google/pegasus-xsum"
+SUMMARIZER_REGISTRY_NAME = "summarizer"
+
+def _load_summarizer(precision=None):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZER_MODEL_ID)
+    model = AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZER_MODEL_ID)
+    
+    # Model GPU'ya taşı
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = model.to(device)
+    
+    # SUMMARIZER_PRECISION ile bfloat16 veya int8 dinamik kuantizasyon seçilebilir
+    model, precision = apply_precision(model, precision or model_precision("summarizer"), device)
+    print(f"Pegasus hassasiyeti: {precision}")
+    
+    return {
+        "tokenizer": tokenizer,
+        "model": model,
+        "precision": precision
+    }
+
+def _warmup_summarizer(summarizer):
+    # Kısa bir metinden birkaç tokenlik özet üret (generate ve beam search hazırlığı)
+    token_ids = summarizer["tokenizer"]("The team reviewed the project plan.", add_special_tokens=False)["input_ids"]
+    _generate_summaries(summarizer, [token_ids], 1, {"num_beams": 2, "min_length": 1, "max_length": 8, "do_sample": False})
+
+model_registry.register(SUMMARIZER_REGISTRY_NAME, _load_summarizer, warmup=_warmup_summarizer)
+
+def summarizer_registry_name(precision=None):
+    """
+    Varsayılan hassasiyet (SUMMARIZER_PRECISION) için "summarizer", diğerleri için ayrı kayıt (ör. "summarizer@int8").
+    Sunum yolu (detect_meeting_topic) ve precision_bench aynı kayıtları kullanır.
+    """
+    if not precision or precision == model_precision("summarizer"):
+        return SUMMARIZER_REGISTRY_NAME
+    name = f"{SUMMARIZER_REGISTRY_NAME}@{precision}"
+    if not model_registry.is_registered(name):
+        model_registry.register(name, functools.partial(_load_summarizer, precision), warmup=_warmup_summarizer)
+    return name
+
+# Kalite seviyeleri: gecikme ile özet kalitesi arasındaki denge. Hepsi belirlenimcidir (sampling yok),
+# aynı girdi her zaman aynı özeti üretir. "final" nihai özet, "partial" hiyerarşik özetlemenin ara adımları içindir.
+QUALITY_TIERS = {
+    "fast": {
+        "final": {
+            "num_beams": 1,            # Greedy decoding
+            "min_length": 30,
+            "max_length": 100,
+            "no_repeat_ngram_size": 3,
+            "do_sample": False
+        },
+        "partial": {
+            "num_beams": 1,
+            "min_length": 16,
+            "max_length": 64,
+            "no_repeat_ngram_size": 3,
+            "do_sample": False
+        }
+    },
+    "balanced": {
+        "final": {
+            "num_beams": 3,            # Küçük beam
+            "min_length": 80,
+            "max_length": 180,
+            "length_penalty": 1.5,
+            "early_stopping": True,
+            "no_repeat_ngram_size": 3,
+            "do_sample": False
+        },
+        "partial": {
+            "num_beams": 2,
+            "min_length": 24,
+            "max_length": 96,
+            "early_stopping": True,
+            "no_repeat_ngram_size": 3,
+            "do_sample": False
+        }
+    },
+    "quality": {
+        "final": {
+            "num_beams": 6,            # Beam search için kullanılacak beam sayısı artırıldı
+            "min_length": 150,         # Minimum özet uzunluğu artırıldı
+            "max_length": 300,         # Maximum özet uzunluğu artırıldı
+            "length_penalty": 2.0,     # Daha uzun özetleri teşvik et
+            "early_stopping": True,    # Tüm beamler EOS'a ulaştığında durdur
+            "no_repeat_ngram_size": 3, # Kelime tekrarını önle
+            "do_sample": False
+        },
+        "partial": {
+            "num_beams": 4,
+            "min_length": 32,
+            "max_length": 128,
+            "early_stopping": True,
+            "no_repeat_ngram_size": 3,
+            "do_sample": False
+        }
+    }
+}
+
+DEFAULT_QUALITY_TIER = os.getenv("TOPIC_QUALITY_TIER", "quality")
+
+def resolve_quality_tier(quality=None):
+    """
+    İstekteki kalite seviyesini doğrular; verilmemişse varsayılanı döndürür.
+    Raises:
+        ValueError: Bilinmeyen kalite seviyesi
+    """
+    tier = quality or DEFAULT_QUALITY_TIER
+    if tier not in QUALITY_TIERS:
+        raise ValueError(f"Geçersiz kalite seviyesi: {tier} (seçenekler: {', '.join(QUALITY_TIERS)})")
+    return tier
+
+def _summary_mode():
+    # single: ilk pencere (eski davranış), hierarchical: her zaman map-reduce, auto: metin sığmazsa map-reduce
+    return os.getenv("TOPIC_SUMMARY_MODE", "auto")
+
+def _window_size(tokenizer, model):
+    # Özel tokenler için yer bırakarak modele tek seferde verilebilecek içerik token sayısı
+    max_length = min(tokenizer.model_max_length, getattr(model.config, "max_position_embeddings", 1024))
+    return max_length - tokenizer.num_special_tokens_to_add(pair=False)
+
+def build_summary_windows(token_ids, window_size):
+    """
+    Metin parçalarının token dizilerini sırayla, model sınırını aşmayacak şekilde pencerelere yerleştirir.
+    Bir parça pencereye sığmıyorsa sonraki pencereye geçilir; tek başına sığmayan parçalar bölünür.
+    Args:
+        token_ids (list): Her metin parçası (ör. transkripsiyon segmenti) için token id listesi
+        window_size (int): Bir penceredeki en fazla token sayısı
+    Returns:
+        list: Token id listeleri
+    """
+    windows = []
+    current = []
+    for ids in token_ids:
+        if current and len(current) + len(ids) > window_size:
+            windows.append(current)
+            current = []
+        for offset in range(0, len(ids), window_size):
+            piece = ids[offset:offset + window_size]
+            if current and len(current) + len(piece) > window_size:
+                windows.append(current)
+                current = []
+            current = current + piece
+    if current:
+        windows.append(current)
+    return windows
+
+def fit_summary_window(token_ids, window_size):
+    """
+    Parçaları tek pencereye sığacak şekilde kısaltır: her parça eşit pay alır, payını doldurmayan kısa parçaların
+    artan payı diğerlerine dağıtılır. Sıra korunur, böylece metnin sonundaki parçalar da özete katılır.
+    Args:
+        token_ids (list): Sırayla parçaların token id listeleri
+        window_size (int): Penceredeki en fazla token sayısı
+    Returns:
+        list: En fazla window_size tokenlik tek pencere
+    """
+    pieces = [ids for ids in token_ids if ids]
+    if len(pieces) > window_size:
+        # Her parçaya en az bir token düşmüyorsa eşit aralıklı parçalar seçilir
+        step = len(pieces) / window_size
+        pieces = [pieces[int(index * step)] for index in range(window_size)]
+    budget = window_size
+    limits = {}
+    for remaining, index in enumerate(sorted(range(len(pieces)), key=lambda i: len(pieces[i]))):
+        limits[index] = min(len(pieces[index]), budget // (len(pieces) - remaining))
+        budget -= limits[index]
+    return [token for index, ids in enumerate(pieces) for token in ids[:limits[index]]]
+
+def _generate_summaries(summarizer, windows, batch_size, generation_kwargs):
+    # Pencereleri gruplar halinde modelden geçirip özet metinlerini döndürür
+    import torch
+    tokenizer = summarizer["tokenizer"]
+    model = summarizer["model"]
+    summaries = []
+    with torch.inference_mode():
+        for batch_start in range(0, len(windows), batch_size):
+            batch = tokenizer.pad(
+                {"input_ids": [tokenizer.build_inputs_with_special_tokens(ids)
+                               for ids in windows[batch_start:batch_start + batch_size]]},
+                return_tensors="pt"
+            )
+            batch = {key: value.to(model.device) for key, value in batch.items()}
+            summary_ids = model.generate(**batch, **generation_kwargs)
+            summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+    return summaries
+
+def hierarchical_summary(summarizer, texts, batch_size=8, max_reduce_levels=3, quality=None):
+    """
+    Map-reduce özetleme: metin token sınırlı pencerelere bölünür, pencereler gruplar halinde özetlenir,
+    özetler tek pencereye sığana kadar (en fazla max_reduce_levels kez) tekrar özetlenir ve son pencereden
+    nihai özet üretilir. Seviye sınırında hâlâ birden fazla pencere varsa kalan özetlerin her biri kısaltılarak
+    tek pencerede birleştirilir (stats["truncated"]). Maliyet metin uzunluğuyla doğrusal artar.
+    Args:
+        summarizer (dict): Kayıt defterindeki {"tokenizer", "model"}
+        texts (list): Sırayla özetlenecek metin parçaları
+    Returns:
+        tuple: (özet, istatistikler); metin boşsa özet ""
+    """
+    tier = QUALITY_TIERS[resolve_quality_tier(quality)]
+    tokenizer = summarizer["tokenizer"]
+    window_size = _window_size(tokenizer, summarizer["model"])
+    token_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+    windows = build_summary_windows(token_ids, window_size)
+    stats = {"mode": "hierarchical", "input_tokens": sum(len(ids) for ids in token_ids), "windows": [len(windows)]}
+    if not windows:
+        # Özetlenecek metin yok (ör. konuşma içermeyen kayıt): boş özet döndürülür
+        stats.update(truncated=False, reduce_levels=0)
+        return "", stats
+    
+    level = 0
+    while len(windows) > 1 and level < max_reduce_levels:
+        print(f"Özetleme seviyesi {level + 1}: {len(windows)} pencere özetleniyor...")
+        partial_summaries = _generate_summaries(summarizer, windows, batch_size, tier["partial"])
+        token_ids = tokenizer(partial_summaries, add_special_tokens=False)["input_ids"]
+        windows = build_summary_windows(token_ids, window_size)
+        stats["windows"].append(len(windows))
+        level += 1
+    
+    stats["truncated"] = len(windows) > 1
+    if stats["truncated"]:
+        # Seviye sınırına ulaşıldı: kalan özetlerin hiçbiri atılmaz, her biri kısaltılarak tek pencereye sığdırılır
+        print(f"Özetleme seviye sınırına ulaşıldı, {len(windows)} pencere kısaltılarak tek pencerede birleştiriliyor")
+        windows = [fit_summary_window(token_ids, window_size)]
+    stats["reduce_levels"] = level
+    
+    summary = _generate_summaries(summarizer, windows, 1, tier["final"])[0]
+    return summary, stats
+
+def detect_meeting_topic(text, aligned_transcript=None, additional_text=None, quality=None, stats=None,
+                         raise_errors=False, precision=None):
+    """
+    Args:
+        quality (str): Kalite seviyesi (fast, balanced, quality); verilmezse TOPIC_QUALITY_TIER
+        precision (str): Varsayılandan (SUMMARIZER_PRECISION) farklı bir hassasiyet, ör. "int8"
+        stats (dict): Verilirse özetleme modu, kalite seviyesi ve üretim süresi bu sözlüğe yazılır
+        raise_errors (bool): Özet üretilemezse "belirlenemedi" metni yerine hatayı ilet
+    """
+    if stats is None:
+        stats = {}
     try:
         print("Toplantı konusu tespiti başlatılıyor...")
-        
-        # Transformers modelini import et
-        try:
-            print("Transformers modülünü import ediliyor...")
-            from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-            print("Transformers import edildi")
-        except Exception as e:
-            print(f"Transformers import hatası: {str(e)}")
-            raise Exception(f"Transformers import hatası: {str(e)}")
+        tier = resolve_quality_tier(quality)
+        stats["quality"] = tier
         
         # Toplantı içeriğini hazırla
         if aligned_transcript and len(aligned_transcript) > 0:
@@ -47,55 +287,66 @@ def detect_meeting_topic(text, aligned_transcript=None, additional_text=None):
             print("Ek metin içeriği özete dahil ediliyor...")
             prepared_text = f"{prepared_text}\n\nEk Bilgiler: {additional_text}"
         
-        # Metni kısaltmamız gerekebilir (model genellikle token limitine sahip)
-        max_length = min(1024, len(prepared_text.split()))
-        truncated_text = " ".join(prepared_text.split()[:max_length])
-        print(f"Konu tespiti için metin hazırlandı, uzunluk: {len(truncated_text.split())} kelime")
-        
         # GPU kontrolü
+        import torch
         device = 0 if torch.cuda.is_available() else -1
         print(f"Cihaz: {device}, CUDA kullanılabilir: {torch.cuda.is_available()}")
         
-        # Pegasus özetleme modelini yükle
-        print("Pegasus özetleme modeli yükleniyor...")
-        model_name = "google/pegasus-xsum"
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-        
-        # Model GPU'ya taşı
-        if torch.cuda.is_available():
-            model = model.to("cuda")
+        # Pegasus özetleme modelini kayıt defterinden al (ilk kullanımda yüklenir)
+        print("Pegasus özetleme modeli hazırlanıyor...")
+        with model_registry.use(summarizer_registry_name(precision)) as summarizer:
+            tokenizer = summarizer["tokenizer"]
+            model = summarizer["model"]
+            print(f"Pegasus modeli hazır, kalite seviyesi: {tier}")
             
-        print("Pegasus modeli başarıyla yüklendi")
-        
-        # Modele metni ilet
-        print("Toplantı konusu özeti oluşturuluyor...")
-        inputs = tokenizer(truncated_text, return_tensors="pt", truncation=True)
-        
-        # GPU'ya taşı
-        if torch.cuda.is_available():
-            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+            generation_started = time.perf_counter()
+            mode = _summary_mode()
+            if mode == "auto":
+                token_count = len(tokenizer(prepared_text, add_special_tokens=False)["input_ids"])
+                mode = "hierarchical" if token_count > _window_size(tokenizer, model) else "single"
             
-        # Özetleme için optimize edilmiş parametreler
-        summary_ids = model.generate(
-            inputs["input_ids"],
-            num_beams=6,            # Beam search için kullanılacak beam sayısı artırıldı
-            min_length=150,          # Minimum özet uzunluğu artırıldı
-            max_length=300,         # Maximum özet uzunluğu artırıldı
-            length_penalty=2.0,     # Daha uzun özetleri teşvik et
-            early_stopping=True,    # Tüm beamler EOS'a ulaştığında durdur
-            no_repeat_ngram_size=3, # Kelime tekrarını önle
-            do_sample=True,         # Yaratıcı özetler için sampling aktif
-            top_k=50,              # Top-k sampling için parametre
-            top_p=0.95,            # Nucleus sampling için parametre
-            temperature=0.6         # Yaratıcılık seviyesi
-        )
-        
-        # Tokenlardan metne çevir
-        topic = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+            if mode == "hierarchical":
+                # Uzun toplantılar: tüm metin pencerelere bölünüp özetlerin özeti çıkarılır. Başlangıç/sonuç
+                # vurgusu yerine segmentler sırayla verilir, böylece toplantının tamamı kapsanır.
+                texts = [segment["text"] for segment in aligned_transcript] if aligned_transcript else [text]
+                if additional_text:
+                    texts.append(f"Ek Bilgiler: {additional_text}")
+                print(f"Hiyerarşik özetleme: {len(texts)} metin parçası")
+                topic, summary_stats = hierarchical_summary(
+                    summarizer, texts,
+                    batch_size=max(1, int(os.getenv("TOPIC_BATCH_SIZE", "8"))),
+                    max_reduce_levels=max(0, int(os.getenv("TOPIC_MAX_REDUCE_LEVELS", "3"))),
+                    quality=tier
+                )
+                stats.update(summary_stats)
+                print(f"Hiyerarşik özetleme tamamlandı: pencereler {summary_stats['windows']}")
+            else:
+                # Metni kısaltmamız gerekebilir (model genellikle token limitine sahip)
+                max_length = min(1024, len(prepared_text.split()))
+                truncated_text = " ".join(prepared_text.split()[:max_length])
+                print(f"Konu tespiti için metin hazırlandı, uzunluk: {len(truncated_text.split())} kelime")
+                
+                # Modele metni ilet
+                print("Toplantı konusu özeti oluşturuluyor...")
+                inputs = tokenizer(truncated_text, return_tensors="pt", truncation=True)
+                
+                # GPU'ya taşı
+                if torch.cuda.is_available():
+                    inputs = {k: v.to("cuda") for k, v in inputs.items()}
+                    
+                # Özetleme için optimize edilmiş parametreler
+                with torch.inference_mode():
+                    summary_ids = model.generate(inputs["input_ids"], **QUALITY_TIERS[tier]["final"])
+                
+                # Tokenlardan metne çevir
+                topic = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+                stats["mode"] = "single"
+            
+            stats["generation_seconds"] = round(time.perf_counter() - generation_started, 3)
+            print(f"Özet üretim süresi ({tier}): {stats['generation_seconds']:.2f}s")
         
-        # Özeti iyileştir
-        topic = topic.replace(" .", ".").replace(" ,", ",").strip()
+        # Özeti iyileştir; metin boşsa konu belirlenemez
+        topic = topic.replace(" .", ".").replace(" ,", ",").strip() or "Toplantı konusu belirlenemedi"
         
         print(f"Özet oluşturuldu: {topic[:100]}...")
         return topic
@@ -105,4 +356,6 @@ def detect_meeting_topic(text, aligned_transcript=None, additional_text=None):
         import traceback
         print(f"Hata detayları:\n{traceback.format_exc()}")
         logger.error(f"Özet oluşturma hatası: {str(e)}")
+        if raise_errors:
+            raise
         return "Toplantı konusu belirlenemedi" 
\ No newline at end of file
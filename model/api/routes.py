@@ -1,15 +1,40 @@
 # API rotalarını tanımlar. İstemcilerin erişebileceği HTTP endpoint'lerini içerir.
 
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 import os
 import time
-from threading import Thread
+import json
+import uuid
 import logging
+from threading import Lock, Thread
 
-from ..jobs.processor import process_job, results_cache
+from ..jobs.processor import results_cache, reanalyze_job
+from ..jobs.scheduler import job_scheduler, QueueFullError
+from ..jobs.dedup import content_key, content_index, reanalysis_key
+from ..jobs.progress import progress_broker, FINAL_STATUSES
+from ..jobs.checkpoints import checkpoint_store
+from ..runtime.registry import model_registry
+from ..runtime.metrics import metrics, MetricsRegistry
+from ..runtime.warmup import readiness
+from ..serving import inference_dispatcher
+from ..analysis.topic import resolve_quality_tier
+from ..audio.transcription import resolve_whisper_hint
 
 logger = logging.getLogger(__name__)
 
+# İçerik anahtarı kontrolü ile kuyruğa ekleme arasında başka bir isteğin araya girmesini önler
+_submit_lock = Lock()
+
+# Long-poll ve SSE bekleme süreleri (saniye)
+MAX_LONG_POLL_SECONDS = 60
+SSE_KEEPALIVE_SECONDS = 15
+
+def _sse_message(event, seq=None):
+    message = f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    if seq:
+        message = f"id: {seq}\n" + message
+    return message
+
 def register_routes(app):
     @app.route('/api/process', methods=['POST'])
     def start_processing():
@@ -44,19 +69,75 @@ def register_routes(app):
                 print(f"HATA: Ses dosyası bulunamadı: {audio_path}")
                 return jsonify({"error": f"Audio file not found: {audio_path}"}), 404
             
-            job_id = str(int(time.time()))
+            # Özet kalite seviyesi: fast (greedy), balanced (küçük beam), quality (tam beam)
+            # Whisper modeli: auto (süre/kuyruk/önceliğe göre), fast, accurate veya aday model kimliği
+            try:
+                options = {
+                    "quality": resolve_quality_tier(data.get('quality')),
+                    "whisper_model": resolve_whisper_hint(data.get('whisper_model'))
+                }
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            # Aynı saniyede gelen işler çakışmasın diye rastgele benzersiz kimlik kullan
+            job_id = uuid.uuid4().hex
             print(f"Oluşturulan job_id: {job_id}")
             
-            # İşlemi arka planda başlat
-            print("Arka plan işlemi başlatılıyor...")
-            thread = Thread(target=process_job, args=(audio_path, job_id, text_file_path))
-            thread.daemon = True
-            thread.start()
+            # Aynı ses ve metin dosyası aynı modellerle daha önce işlendiyse (veya işleniyorsa) o işi döndür
+            try:
+                key = content_key(audio_path, text_file_path, options)
+            except Exception as e:
+                print(f"UYARI: İçerik anahtarı hesaplanamadı: {str(e)}")
+                key = None
+            
+            priority = data.get('priority', 'normal')
+            with _submit_lock:
+                if key:
+                    # Süren işler bellekteki dizinde, tamamlananlar kalıcı depoda aranır
+                    existing_job_id = content_index.get(key) or results_cache.find_by_content_key(key)
+                    existing_status = results_cache.get(existing_job_id, {}).get("status") if existing_job_id else None
+                    if existing_status in ("queued", "processing", "completed"):
+                        print(f"Aynı içerik zaten mevcut, job_id: {existing_job_id}, durum: {existing_status}")
+                        return jsonify({
+                            "message": "Identical upload already processed" if existing_status == "completed" else "Identical upload already in progress",
+                            "job_id": existing_job_id,
+                            "cached": existing_status == "completed"
+                        })
+                    # Hatalı veya silinmiş işe ait eski kaydı bırak
+                    if existing_job_id:
+                        content_index.forget(key, existing_job_id)
+                    # Çok süreçli modda aynı içerik başka bir HTTP işçisinde bu arada kaydedilmiş olabilir
+                    claimed_job_id = content_index.claim(key, job_id)
+                    if claimed_job_id is not None:
+                        return jsonify({"message": "Identical upload already in progress", "job_id": claimed_job_id, "cached": False})
+                
+                # İşi kuyruğa ekle, işçi havuzu sırası gelince işler
+                try:
+                    position = job_scheduler.submit(job_id, (audio_path, job_id, text_file_path, key, dict(options, priority=priority)),
+                                             priority=priority)
+                except (ValueError, QueueFullError) as e:
+                    if key:
+                        content_index.forget(key, job_id)
+                    if isinstance(e, ValueError):
+                        return jsonify({"error": str(e)}), 400
+                    print(f"UYARI: {str(e)}")
+                    stats = job_scheduler.stats()
+                    response = jsonify({
+                        "error": "Job queue is full",
+                        "queue_depth": stats["queue_depth"],
+                        "max_queue_size": stats["max_queue_size"],
+                        "estimated_wait_seconds": stats["estimated_wait_seconds"]
+                    })
+                    response.headers['Retry-After'] = str(int(stats["estimated_wait_seconds"]) + 1)
+                    return response, 429
             
-            print(f"İşlem başlatıldı, job_id: {job_id}")
+            print(f"İş kuyruğa eklendi, job_id: {job_id}, sıra: {position}")
             return jsonify({
                 "message": "Processing started",
-                "job_id": job_id
+                "job_id": job_id,
+                "cached": False,
+                "queue_position": position,
+                "estimated_start_seconds": job_scheduler.estimated_start(job_id)
             })
             
         except Exception as e:
@@ -64,16 +145,198 @@ def register_routes(app):
             logger.error(f"API hatası: {str(e)}")
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/resume/<job_id>', methods=['POST'])
+    def resume_job(job_id):
+        # Hata veren (veya süreç yeniden başladığı için yarım kalan) işi aynı kimlikle tekrar kuyruğa ekler;
+        # kontrol noktası olan aşamalar tekrar çalışmaz
+        print(f"POST /api/resume/{job_id} endpoint'i çağrıldı")
+        job_status = results_cache.get_status(job_id)
+        status = job_status.get("status") if job_status else None
+        if status in ("queued", "processing"):
+            return jsonify({"error": "Job is still running", "status": status}), 409
+        if status == "completed":
+            return jsonify({"message": "Job already completed", "job_id": job_id, "status": status})
+        
+        job_input = checkpoint_store.job_inputs(job_id)
+        if job_input is None:
+            return jsonify({"error": "No checkpoints found for job"}), 404
+        reused_stages = checkpoint_store.stages(job_id)
+        # Transkripsiyon ve konuşmacı ayrıştırma kontrol noktasından gelmiyorsa ses dosyası gerekir
+        if not {"transcription", "diarization"} <= set(reused_stages) and not os.path.exists(job_input["audio_path"]):
+            return jsonify({"error": f"Audio file no longer available: {job_input['audio_path']}"}), 410
+        
+        options = job_input["options"]
+        key = job_input["input_hash"]
+        with _submit_lock:
+            # Aynı içerik bu arada başka bir işle yüklendiyse ikinci kez işlenmez, o iş döndürülür
+            existing_job_id = content_index.get(key) or results_cache.find_by_content_key(key)
+            if existing_job_id and existing_job_id != job_id:
+                existing_status = results_cache.get(existing_job_id, {}).get("status")
+                if existing_status == "completed":
+                    return jsonify({"message": "Identical upload already processed", "job_id": existing_job_id, "cached": True})
+                if existing_status in ("queued", "processing"):
+                    return jsonify({"error": "Identical upload already in progress", "job_id": existing_job_id,
+                                    "status": existing_status}), 409
+                content_index.forget(key, existing_job_id)
+            claimed_job_id = content_index.claim(key, job_id)
+            if claimed_job_id is not None and claimed_job_id != job_id:
+                return jsonify({"error": "Identical upload already in progress", "job_id": claimed_job_id}), 409
+            try:
+                position = job_scheduler.submit(job_id, (job_input["audio_path"], job_id, job_input["text_file_path"], key, options),
+                                                priority=options.get("priority", "normal"))
+            except (ValueError, QueueFullError) as e:
+                content_index.forget(key, job_id)
+                return jsonify({"error": str(e)}), 400 if isinstance(e, ValueError) else 429
+        
+        print(f"İş yeniden kuyruğa eklendi, job_id: {job_id}, kontrol noktaları: {reused_stages}")
+        return jsonify({
+            "message": "Processing resumed",
+            "job_id": job_id,
+            "checkpoints": reused_stages,
+            "queue_position": position,
+            "estimated_start_seconds": job_scheduler.estimated_start(job_id)
+        })
+
+    @app.route('/api/reanalyze/<job_id>', methods=['POST'])
+    def reanalyze(job_id):
+        # Tamamlanmış işin transkriptini yeni metin dosyası (gündem, notlar) ile yeniden analiz eder;
+        # ses tekrar işlenmez, sonuç yeni bir iş kimliğiyle döner
+        print(f"POST /api/reanalyze/{job_id} endpoint'i çağrıldı")
+        data = request.get_json(silent=True) or {}
+        
+        source_status = results_cache.get_status(job_id)
+        if source_status is None:
+            return jsonify({"error": "Job not found"}), 404
+        if source_status.get("status") != "completed":
+            return jsonify({"error": "Job is not completed", "status": source_status.get("status")}), 409
+        
+        text_file_path = data.get('text_file_path')
+        if text_file_path and not os.path.exists(text_file_path):
+            return jsonify({"error": f"Text file not found: {text_file_path}"}), 404
+        try:
+            options = {"quality": resolve_quality_tier(data.get('quality'))}
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        new_job_id = uuid.uuid4().hex
+        try:
+            key = reanalysis_key(job_id, text_file_path, options)
+        except Exception as e:
+            print(f"UYARI: İçerik anahtarı hesaplanamadı: {str(e)}")
+            key = None
+        
+        with _submit_lock:
+            if key:
+                existing_job_id = content_index.get(key) or results_cache.find_by_content_key(key)
+                existing_status = results_cache.get(existing_job_id, {}).get("status") if existing_job_id else None
+                if existing_status in ("queued", "processing", "completed"):
+                    return jsonify({
+                        "message": "Identical reanalysis already processed" if existing_status == "completed" else "Identical reanalysis already in progress",
+                        "job_id": existing_job_id,
+                        "source_job_id": job_id,
+                        "cached": existing_status == "completed"
+                    })
+                if existing_job_id:
+                    content_index.forget(key, existing_job_id)
+                # Çok süreçli modda aynı yeniden analiz başka bir HTTP işçisinde bu arada kaydedilmiş olabilir
+                claimed_job_id = content_index.claim(key, new_job_id)
+                if claimed_job_id is not None:
+                    return jsonify({"message": "Identical reanalysis already in progress", "job_id": claimed_job_id,
+                                    "source_job_id": job_id, "cached": False})
+            results_cache[new_job_id] = {"status": "queued", "queued_at": time.time()}
+        
+        # Yeniden analiz iş kuyruğunu beklemez, ayrı iş parçacığında hemen başlar; çok süreçli modda modeller
+        # çıkarım işçilerinde olduğu için doğrudan onlara verilir
+        dispatcher = inference_dispatcher()
+        if dispatcher is not None:
+            dispatcher.dispatch(new_job_id, "reanalyze", (job_id, new_job_id, text_file_path, key, options), key)
+        else:
+            worker = Thread(target=reanalyze_job, args=(job_id, new_job_id, text_file_path, key, options),
+                            name=f"reanalysis-{new_job_id[:8]}")
+            worker.daemon = True
+            worker.start()
+        
+        print(f"Yeniden analiz başlatıldı, job_id: {new_job_id}, kaynak: {job_id}")
+        return jsonify({
+            "message": "Reanalysis started",
+            "job_id": new_job_id,
+            "source_job_id": job_id,
+            "cached": False
+        })
+
     @app.route('/api/status/<job_id>', methods=['GET'])
     def get_job_status(job_id):
         print(f"GET /api/status/{job_id} endpoint'i çağrıldı")
         
-        if job_id not in results_cache:
+        # Tam sonuç yerine yalnızca durum, aşama, ilerleme ve süreleri döndür (tam sonuç: /api/result)
+        job_status = results_cache.get_status(job_id)
+        if job_status is None:
             print(f"HATA: Job ID bulunamadı: {job_id}")
             return jsonify({"status": "not_found"}), 404
         
-        print(f"Durum yanıtı: {results_cache[job_id]}")
-        return jsonify(results_cache[job_id])
+        # Long-poll: ?wait=<saniye>&since=<event_seq> verilirse yeni bir olay gelene kadar bekle
+        try:
+            wait_seconds = min(float(request.args.get('wait', 0)), MAX_LONG_POLL_SECONDS)
+            since = int(request.args.get('since', 0))
+        except ValueError:
+            return jsonify({"error": "wait and since must be numbers"}), 400
+        if wait_seconds > 0 and job_status.get("status") not in FINAL_STATUSES:
+            progress_broker.wait(job_id, since, wait_seconds)
+            job_status = results_cache.get_status(job_id) or job_status
+        job_status["event_seq"] = progress_broker.last_seq(job_id)
+        
+        if job_status.get("status") == "queued":
+            # Kuyrukta bekleyen iş için sıra ve tahmini başlama süresini ekle
+            job_status["queue_position"] = job_scheduler.position(job_id)
+            job_status["queue_depth"] = job_scheduler.depth()
+            job_status["estimated_start_seconds"] = job_scheduler.estimated_start(job_id)
+        
+        return jsonify(job_status)
+
+    @app.route('/api/events/<job_id>', methods=['GET'])
+    def stream_job_events(job_id):
+        # Server-sent events: aşama geçişleri ve ilerleme olayları gerçekleştikçe istemciye gönderilir
+        initial_status = results_cache.get_status(job_id)
+        if initial_status is None:
+            return jsonify({"status": "not_found"}), 404
+        
+        try:
+            since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+        except ValueError:
+            since = 0
+        
+        def generate():
+            last_seq = max(since, progress_broker.last_seq(job_id))
+            # Önce güncel durumu gönder, ardından yeni olayları bekle
+            yield _sse_message(dict(initial_status, event="status"), last_seq)
+            if initial_status.get("status") in FINAL_STATUSES:
+                return
+            
+            while True:
+                events = progress_broker.wait(job_id, last_seq, SSE_KEEPALIVE_SECONDS)
+                if not events:
+                    # Olay kaçırıldıysa (ör. tampon taştıysa) depodaki son duruma bak
+                    current = results_cache.get_status(job_id)
+                    if current is None or current.get("status") in FINAL_STATUSES:
+                        yield _sse_message(dict(current or {"status": "not_found"}, event="status"))
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    last_seq = event["seq"]
+                    yield _sse_message(event, last_seq)
+                    if event.get("status") in FINAL_STATUSES:
+                        return
+        
+        return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    @app.route('/api/status', methods=['GET'])
+    def get_queue_status():
+        # Genel kuyruk durumu: işçi sayısı, kuyruk derinliği ve yeni bir işin tahmini bekleme süresi
+        return jsonify(job_scheduler.stats())
 
     @app.route('/api/result/<job_id>', methods=['GET'])
     def get_job_result(job_id):
@@ -95,6 +358,48 @@ def register_routes(app):
         print(f"Sonuç başarıyla döndürüldü")
         return jsonify(job_result)
 
+    @app.route('/api/models', methods=['GET'])
+    def get_model_stats():
+        # Kayıtlı modellerin yüklenme durumu, yükleme süresi ve bellek kullanımı (çok süreçli modda çıkarım işçisi başına)
+        dispatcher = inference_dispatcher()
+        return jsonify(dispatcher.model_stats() if dispatcher is not None else model_registry.stats())
+
+    @app.route('/api/ready', methods=['GET'])
+    def get_readiness():
+        # Yük dengeleyici için hazırlık kontrolü: GPU/torch hazırlığı bitip PRELOAD_MODELS ile seçilen tüm modeller
+        # yüklenip ısınana kadar (veya biri başarısız olduysa) 503.
+        # Çok süreçli modda modelleri hazır en az bir çıkarım işçisi yeterlidir.
+        dispatcher = inference_dispatcher()
+        state = dispatcher.readiness() if dispatcher is not None else readiness()
+        return jsonify(state), 200 if state["ready"] else 503
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        # Aşama histogramları (süre, CPU, tepe bellek, RTF), model yükleme süreleri ve anlık kuyruk/model durumu
+        queue = job_scheduler.stats()
+        metrics.gauge("meeting_queue_depth", "Kuyrukta bekleyen iş sayısı").set(queue["queue_depth"])
+        metrics.gauge("meeting_running_jobs", "Çalışan iş sayısı").set(queue["running"])
+        loaded = metrics.gauge("meeting_model_loaded", "Model bellekte yüklü mü (1/0)", ("model",))
+        dispatcher = inference_dispatcher()
+        if dispatcher is None:
+            for name, stats in model_registry.stats().items():
+                loaded.set(1 if stats["loaded"] else 0, model=name)
+            return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+        
+        # Çok süreçli mod: aşama ölçümleri çıkarım işçilerinde toplanır, bu işçinin değerleriyle birleştirilir
+        # (sayaç ve histogramlar toplanır); model en az bir işçide yüklüyse yüklü sayılır
+        for name in model_registry.stats():
+            loaded.set(0, model=name)
+        for worker_models in dispatcher.model_stats().values():
+            for name, stats in worker_models.items():
+                if stats.get("loaded"):
+                    loaded.set(1, model=name)
+        combined = MetricsRegistry()
+        combined.merge(metrics.export())
+        for exported in dispatcher.worker_metrics():
+            combined.merge(exported)
+        return Response(combined.render(), mimetype='text/plain; version=0.0.4')
+
     # İlave test endpoint'i
     @app.route('/api/test', methods=['GET', 'POST'])
     def test_api():
@@ -1,34 +1,25 @@
 # Ana uygulama dosyası. Flask web sunucusunu başlatır, CORS ayarlarını yapar, loglama sistemini kurar ve API rotalarını kaydeder.
 
+import time
+
+_import_started = time.perf_counter()
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import logging
 import os
-import torch
 from dotenv import load_dotenv
 
+# Çevre değişkenlerini yükle (modüller import sırasında yapılandırma okuduğu için önce yüklenmeli)
+load_dotenv()
+
 # Modülleri import et
 from .api.routes import register_routes
 from .jobs.processor import results_cache
-
-# GPU kullanımını optimize etmek için ayarlar
-def configure_gpu():
-    if torch.cuda.is_available():
-        # GPU kullanımını optimize et
-        torch.backends.cudnn.benchmark = True
-        torch.backends.cudnn.deterministic = False
-        
-        # Bellek kullanımını optimize et
-        torch.cuda.empty_cache()
-        
-        # Veri tipi tutarlılığı için float32 kullan
-        torch.set_default_dtype(torch.float32)
-        
-        logger = logging.getLogger(__name__)
-        logger.info(f"GPU yapılandırıldı: {torch.cuda.get_device_name(0)}")
-        print(f"GPU yapılandırıldı: {torch.cuda.get_device_name(0)}")
-        return True
-    return False
+from .runtime.warmup import start_warmup
+from .runtime.metrics import metrics
+from .runtime.gpu import configure_gpu
+from .serving import serving_role
 
 # Uygulama oluşturma
 app = Flask(__name__)
@@ -54,16 +45,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Çevre değişkenlerini yükle
-load_dotenv()
-
-# GPU yapılandırmasını çalıştır
-has_gpu = configure_gpu()
-if has_gpu:
-    logger.info("GPU kullanımı etkinleştirildi")
-else:
-    logger.info("GPU bulunamadı, CPU kullanılacak")
-
 # FFmpeg'i otomatik olarak yapılandır
 try:
     backend_ffmpeg_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
@@ -82,6 +63,17 @@ except Exception as e:
 # API rotalarını kaydet
 register_routes(app)
 
+# GPU'yu yapılandır, istenen modelleri arka planda önceden yükle ve sahte çıkarımla ısıt
+# (ör. PRELOAD_MODELS=whisper,diarization); /api/ready ısınma bitene kadar 503 döndürür.
+# Çok süreçli modda HTTP işçileri model tutmaz, GPU ve modeller çıkarım işçilerinde hazırlanır.
+if serving_role() != "http":
+    start_warmup(prepare=configure_gpu)
+
+# HTTP katmanının açılış süresi (torch ve model sınıfları ilk kullanımda import edilir)
+startup_seconds = time.perf_counter() - _import_started
+metrics.gauge("meeting_startup_seconds", "HTTP katmanının import ve kurulum süresi (saniye)").set(startup_seconds)
+logger.info(f"HTTP katmanı {startup_seconds:.2f} saniyede hazır")
+
 # Ana fonksiyon
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=False) 
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .transcription import transcribe_audio
-from .diarization import diarize_audio 
\ No newline at end of file
+from .diarization import diarize_audio 
+from .decoding import decode_audio, DecodedAudio
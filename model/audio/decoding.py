@@ -0,0 +1,105 @@
+# Yüklenen ses dosyasını bir kez çözüp 16 kHz mono float32 dalga formuna dönüştürür. Dalga formu bellek eşlemeli
+# (memory-mapped) bir dosyada tutulur; transkripsiyon, konuşmacı ayrıştırma ve sonraki aşamalar aynı tamponu kopyalamadan okur.
+
+import os
+import uuid
+import logging
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+def _audio_cache_dir():
+    cache_dir = os.getenv("AUDIO_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "meeting_audio")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+class DecodedAudio:
+    """
+    Çözülmüş ses dosyası. Örnekler disk üzerindeki ham float32 dosyadan np.memmap ile okunur,
+    bu yüzden büyük toplantılar bellekte iki kez yer kaplamaz.
+    """
+
+    def __init__(self, path, source_path, sample_rate=SAMPLE_RATE):
+        self.path = path
+        self.source_path = source_path
+        self.sample_rate = sample_rate
+        self.num_samples = os.path.getsize(path) // np.dtype(np.float32).itemsize
+        self._waveform = None
+
+    @property
+    def waveform(self):
+        if self._waveform is None:
+            if self.num_samples == 0:
+                self._waveform = np.zeros(0, dtype=np.float32)
+            else:
+                # Copy-on-write: okuma kopyasızdır, yanlışlıkla yazma olursa dosya değişmez
+                self._waveform = np.memmap(self.path, dtype=np.float32, mode="c", shape=(self.num_samples,))
+        return self._waveform
+
+    @property
+    def duration(self):
+        return self.num_samples / float(self.sample_rate)
+
+    def whisper_input(self):
+        # HF pipeline sözlüğün anahtarlarını tükettiği için her çağrıda yeni sözlük döndür
+        return {"raw": self.waveform, "sampling_rate": self.sample_rate}
+
+    def pyannote_input(self):
+        import torch
+        # torch.from_numpy aynı belleği paylaşır, kopya oluşmaz; pyannote (kanal, zaman) şekli bekler
+        return {"waveform": torch.from_numpy(self.waveform).unsqueeze(0), "sample_rate": self.sample_rate}
+
+    def close(self):
+        """Bellek eşlemesini bırakır ve geçici dosyayı siler."""
+        waveform = self._waveform
+        self._waveform = None
+        if isinstance(waveform, np.memmap) and waveform._mmap is not None:
+            try:
+                waveform._mmap.close()
+            except Exception:
+                # Hâlâ başka bir görünüm (view) tarafından kullanılıyorsa GC'ye bırak
+                pass
+        del waveform
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"Geçici ses dosyası silinemedi: {self.path} ({str(e)})")
+
+    def __repr__(self):
+        return f"DecodedAudio({self.source_path!r}, {self.duration:.1f}s)"
+
+
+def decode_audio(audio_path, job_id, sample_rate=SAMPLE_RATE):
+    """
+    Ses dosyasını FFmpeg ile tek seferde 16 kHz mono float32 ham dosyaya çözer.
+    Returns:
+        DecodedAudio: Tüm aşamaların paylaşacağı çözülmüş ses
+    """
+    import ffmpeg
+
+    output_path = os.path.join(_audio_cache_dir(), f"{job_id}_{uuid.uuid4().hex}.f32")
+    print(f"[{job_id}] Ses çözülüyor: {audio_path} -> {output_path}")
+    try:
+        (
+            ffmpeg
+            .input(audio_path)
+            .output(output_path, format="f32le", acodec="pcm_f32le", ac=1, ar=sample_rate)
+            .global_args("-nostdin")
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", errors="ignore") if e.stderr else ""
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise Exception(f"Ses çözme hatası: {stderr[-500:]}")
+    
+    decoded = DecodedAudio(output_path, audio_path, sample_rate)
+    print(f"[{job_id}] Ses çözüldü: {decoded.duration:.1f} saniye, {decoded.num_samples} örnek")
+    return decoded
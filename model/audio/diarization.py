@@ -1,107 +1,144 @@
 # Konuşmacı ayrıştırma fonksiyonlarını içerir. Farklı konuşmacıları birbirinden ayırır.
 
 import os
-import torch
 import logging
 
+from ..runtime.registry import model_registry
+from .decoding import DecodedAudio, SAMPLE_RATE
+
 logger = logging.getLogger(__name__)
 
-def diarize_audio(audio_path, job_id):
+DIARIZATION_MODEL_ID = "pyannote/speaker-diarization-3.1"
+DIARIZATION_REGISTRY_NAME = "diarization"
+
+def _load_diarization():
+    # Environment variable kontrolü yap
+    token = os.getenv("HUGGINGFACE_TOKEN")
+    if not token:
+        print("UYARI: HUGGINGFACE_TOKEN çevre değişkeni bulunamadı!")
+        print(".env dosyasını kontrol edin ve gerekli token'ı ayarlayın")
+        # UYARI: Mockup veriler kullanmak yerine hata döndür
+        raise Exception("HUGGINGFACE_TOKEN çevre değişkeni bulunamadı. Konuşmacı ayrıştırma yapılamaz.")
+    
+    # Pyannote.audio modelini import et
+    import torch
     try:
-        logger.info(f"[{job_id}] Konuşmacı ayrıştırma başlatılıyor: {audio_path}")
-        print(f"[{job_id}] Konuşmacı ayrıştırma için ses dosyası: {audio_path}")
-        
-        # Environment variable kontrolü yap
-        token = os.getenv("HUGGINGFACE_TOKEN")
-        if not token:
-            print(f"[{job_id}] UYARI: HUGGINGFACE_TOKEN çevre değişkeni bulunamadı!")
-            print(f"[{job_id}] .env dosyasını kontrol edin ve gerekli token'ı ayarlayın")
-            # UYARI: Mockup veriler kullanmak yerine hata döndür
-            raise Exception("HUGGINGFACE_TOKEN çevre değişkeni bulunamadı. Konuşmacı ayrıştırma yapılamaz.")
-        
-        # Pyannote.audio modelini import et
+        print("Pyannote.audio modülünü import ediliyor...")
+        from pyannote.audio import Pipeline
+        print("Pyannote.audio import edildi")
+    except Exception as e:
+        print(f"Pyannote.audio import hatası: {str(e)}")
+        raise Exception(f"Pyannote.audio import hatası: {str(e)}")
+    
+    # GPU kullanımını kontrol et. Cihaz DIARIZATION_DEVICE ile seçilebilir; birden fazla GPU varsa
+    # transkripsiyonla paralel çalışabilmesi için varsayılan olarak ikinci GPU kullanılır
+    device = os.getenv("DIARIZATION_DEVICE")
+    if not device:
+        if torch.cuda.is_available():
+            device = "cuda:1" if torch.cuda.device_count() > 1 else "cuda:0"
+        else:
+            device = "cpu"
+    use_gpu = torch.cuda.is_available() and device.startswith("cuda")
+    # GPU kullanılıyorsa float32 kullan, float16 ile uyumsuzluk sorunları var
+    if use_gpu:
+        # PyTorch'un varsayılan veri tipini float32'ye ayarla
+        torch.set_default_dtype(torch.float32)
+        # Belleği temizle
+        torch.cuda.empty_cache()
+    
+    # Modeli CPU'da yükle, sonra GPU'ya taşı
+    diarization_pipeline = Pipeline.from_pretrained(
+        DIARIZATION_MODEL_ID,
+        use_auth_token=token
+    )
+    
+    # Modelin None dönüp dönmediğini kontrol et
+    if diarization_pipeline is None:
+        error_msg = f"Pyannote.audio Pipeline.from_pretrained modeli yükleyemedi ve None döndürdü. Token: {'Token mevcut' if token else 'Token YOK'}, Model: {DIARIZATION_MODEL_ID}"
+        print(error_msg)
+        logger.error(error_msg)
+        raise ValueError("Pyannote.audio Pipeline.from_pretrained modeli yükleyemedi ve None döndürdü. Lütfen Hugging Face model erişiminizi ve ağ bağlantınızı kontrol edin.")
+    
+    if use_gpu:
+        print(f"Pyannote modeli GPU'ya taşınıyor: {device}")
         try:
-            print(f"[{job_id}] Pyannote.audio modülünü import ediliyor...")
-            from pyannote.audio import Pipeline
-            print(f"[{job_id}] Pyannote.audio import edildi")
+            # Modeli GPU'ya taşı, float32 veri tipini kullanarak
+            diarization_pipeline.to(torch.device(device))
+            print("Pyannote modeli GPU'ya taşındı")
         except Exception as e:
-            print(f"[{job_id}] Pyannote.audio import hatası: {str(e)}")
-            import traceback
-            print(f"[{job_id}] Import hata detayları:\n{traceback.format_exc()}")
-            raise Exception(f"Pyannote.audio import hatası: {str(e)}")
-        
-        # GPU kullanımını kontrol et
-        use_gpu = torch.cuda.is_available()
-        # GPU kullanılıyorsa float32 kullan, float16 ile uyumsuzluk sorunları var
-        if use_gpu:
-            # PyTorch'un varsayılan veri tipini float32'ye ayarla
-            torch.set_default_dtype(torch.float32)
-            # Belleği temizle
-            torch.cuda.empty_cache()
+            print(f"Model GPU'ya taşınırken hata: {str(e)}")
+            print("CPU kullanılacak")
+            use_gpu = False
+    
+    return {
+        "pipeline": diarization_pipeline,
+        "use_gpu": use_gpu
+    }
+
+def _warmup_diarization(diarizer):
+    import torch
+    # 2 saniyelik hafif gürültü: segmentasyon ve konuşmacı gömme modelleri bir kez çalışır
+    waveform = torch.randn(1, 2 * SAMPLE_RATE, generator=torch.Generator().manual_seed(0)) * 0.01
+    diarizer["pipeline"]({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+
+model_registry.register(DIARIZATION_REGISTRY_NAME, _load_diarization, warmup=_warmup_diarization)
+
+def _pipeline_input(audio):
+    # Çözülmüş ses varsa aynı tamponu tensör olarak paylaş, yoksa pyannote dosyayı kendisi okur
+    if isinstance(audio, DecodedAudio):
+        return audio.pyannote_input()
+    return audio
+
+def diarize_audio(audio, job_id):
+    # audio: dosya yolu veya decode_audio ile çözülmüş DecodedAudio
+    audio_path = audio.source_path if isinstance(audio, DecodedAudio) else audio
+    try:
+        logger.info(f"[{job_id}] Konuşmacı ayrıştırma başlatılıyor: {audio_path}")
+        print(f"[{job_id}] Konuşmacı ayrıştırma için ses dosyası: {audio_path}")
         
-        # Modeli yükle
+        # Modeli kayıt defterinden al (ilk kullanımda yüklenir)
         try:
-            print(f"[{job_id}] Pyannote.audio modeli yükleniyor...")
-            
-            # Modeli CPU'da yükle, sonra GPU'ya taşı
-            diarization_pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=token
-            )
-            
-            # Modelin None dönüp dönmediğini kontrol et
-            if diarization_pipeline is None:
-                error_msg = f"[{job_id}] Pyannote.audio Pipeline.from_pretrained modeli yükleyemedi ve None döndürdü. Token: {'Token mevcut' if token else 'Token YOK'}, Model: pyannote/speaker-diarization-3.1"
-                print(error_msg)
-                logger.error(error_msg)
-                raise ValueError("Pyannote.audio Pipeline.from_pretrained modeli yükleyemedi ve None döndürdü. Lütfen Hugging Face model erişiminizi ve ağ bağlantınızı kontrol edin.")
-
-            print(f"[{job_id}] Pyannote.audio modeli başarıyla yüklendi")
-            
-            if use_gpu:
-                print(f"[{job_id}] Model GPU'ya taşınıyor...")
-                try:
-                    # Modeli GPU'ya taşı, float32 veri tipini kullanarak
-                    diarization_pipeline.to(torch.device("cuda"))
-                    print(f"[{job_id}] Model GPU'ya taşındı")
-                except Exception as e:
-                    print(f"[{job_id}] Model GPU'ya taşınırken hata: {str(e)}")
-                    print(f"[{job_id}] CPU kullanılacak")
-                    use_gpu = False
-                
+            print(f"[{job_id}] Pyannote.audio modeli hazırlanıyor...")
+            diarizer = model_registry.acquire(DIARIZATION_REGISTRY_NAME)
+            print(f"[{job_id}] Pyannote.audio modeli hazır")
         except Exception as e:
             print(f"[{job_id}] Pyannote.audio modeli yükleme hatası: {str(e)}")
             import traceback
             print(f"[{job_id}] Yükleme hata detayları:\n{traceback.format_exc()}")
             raise Exception(f"Pyannote.audio modeli yükleme hatası: {str(e)}")
         
-        print(f"[{job_id}] Konuşmacı ayrıştırma işlemi başlıyor...")
         try:
-            # İşlemi gerçekleştir
-            diarization = diarization_pipeline(audio_path)
-            print(f"[{job_id}] Konuşmacı ayrıştırma başarıyla tamamlandı")
-            
-        except Exception as e:
-            print(f"[{job_id}] Konuşmacı ayrıştırma işlemi sırasında hata: {str(e)}")
-            import traceback
-            print(f"[{job_id}] Ayrıştırma hata detayları:\n{traceback.format_exc()}")
-            
-            # GPU hatası alındıysa CPU'ya geçiş yap
-            if use_gpu and "cuda" in str(e).lower():
-                print(f"[{job_id}] GPU hatası tespit edildi, CPU'ya geçiliyor...")
-                try:
-                    # Belleği temizle
-                    torch.cuda.empty_cache()
-                    # Modeli CPU'ya taşı
-                    diarization_pipeline.to(torch.device("cpu"))
-                    # İşlemi CPU'da tekrar dene
-                    diarization = diarization_pipeline(audio_path)
-                    print(f"[{job_id}] CPU ile konuşmacı ayrıştırma başarıyla tamamlandı")
-                except Exception as cpu_e:
-                    print(f"[{job_id}] CPU ile de işlem başarısız: {str(cpu_e)}")
-                    raise Exception(f"Konuşmacı ayrıştırma işlemi hatası (GPU ve CPU): {str(e)}")
-            else:
-                raise Exception(f"Konuşmacı ayrıştırma işlemi hatası: {str(e)}")
+            print(f"[{job_id}] Konuşmacı ayrıştırma işlemi başlıyor...")
+            try:
+                # İşlemi gerçekleştir
+                diarization = diarizer["pipeline"](_pipeline_input(audio))
+                print(f"[{job_id}] Konuşmacı ayrıştırma başarıyla tamamlandı")
+                
+            except Exception as e:
+                print(f"[{job_id}] Konuşmacı ayrıştırma işlemi sırasında hata: {str(e)}")
+                import traceback
+                print(f"[{job_id}] Ayrıştırma hata detayları:\n{traceback.format_exc()}")
+                
+                # GPU hatası alındıysa CPU'ya geçiş yap
+                if diarizer["use_gpu"] and "cuda" in str(e).lower():
+                    print(f"[{job_id}] GPU hatası tespit edildi, CPU'ya geçiliyor...")
+                    try:
+                        import torch
+                        # Belleği temizle
+                        torch.cuda.empty_cache()
+                        # Paylaşılan modeli CPU'ya taşı, sonraki işler de CPU'da çalışır
+                        diarizer["pipeline"].to(torch.device("cpu"))
+                        diarizer["use_gpu"] = False
+                        # İşlemi CPU'da tekrar dene
+                        diarization = diarizer["pipeline"](_pipeline_input(audio))
+                        print(f"[{job_id}] CPU ile konuşmacı ayrıştırma başarıyla tamamlandı")
+                    except Exception as cpu_e:
+                        print(f"[{job_id}] CPU ile de işlem başarısız: {str(cpu_e)}")
+                        raise Exception(f"Konuşmacı ayrıştırma işlemi hatası (GPU ve CPU): {str(e)}")
+                else:
+                    raise Exception(f"Konuşmacı ayrıştırma işlemi hatası: {str(e)}")
+        finally:
+            model_registry.release(DIARIZATION_REGISTRY_NAME)
         
         # Sonuçları listele
         speakers = []
@@ -121,4 +158,4 @@ def diarize_audio(audio_path, job_id):
         import traceback
         logger.error(f"[{job_id}] Ayrıştırma hata detayları:\n{traceback.format_exc()}")
         # Hatayı yukarıya ilet
-        raise Exception(f"Konuşmacı ayrıştırma hatası: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Konuşmacı ayrıştırma hatası: {str(e)}")
@@ -0,0 +1,65 @@
+# Uzun ses kayıtlarını sessiz noktalardan bağımsız pencerelere böler. Parçalı transkripsiyon her pencereyi
+# ayrı bir işlemde yazıya döker, bu yüzden kesim noktalarının konuşmanın ortasına denk gelmemesi gerekir.
+
+import numpy as np
+
+# Enerji hesabında kullanılan çerçeve uzunluğu ve sessizlik aranırken uygulanan yumuşatma süresi (saniye)
+FRAME_SECONDS = 0.03
+SMOOTHING_SECONDS = 0.3
+
+def frame_energy(waveform, sample_rate, frame_seconds=FRAME_SECONDS, block_frames=10000):
+    """
+    Dalga formunun çerçeve bazında RMS enerjisini hesaplar. Bellek eşlemeli uzun kayıtlar tamamen belleğe
+    alınmasın diye hesap bloklar halinde yapılır.
+    Returns:
+        tuple: (çerçeve enerjileri, çerçeve başına örnek sayısı)
+    """
+    frame = max(1, int(sample_rate * frame_seconds))
+    frame_count = len(waveform) // frame
+    energy = np.zeros(frame_count, dtype=np.float32)
+    for block_start in range(0, frame_count, block_frames):
+        block_end = min(block_start + block_frames, frame_count)
+        frames = np.asarray(waveform[block_start * frame:block_end * frame], dtype=np.float32)
+        frames = frames.reshape(block_end - block_start, frame)
+        energy[block_start:block_end] = np.sqrt(np.mean(np.square(frames), axis=1))
+    return energy, frame
+
+def split_at_silences(waveform, sample_rate, target_seconds=60.0, search_seconds=10.0, min_seconds=5.0):
+    """
+    Kaydı en fazla target_seconds uzunluğunda pencerelere böler. Her kesim, hedef sınırdan önceki
+    search_seconds içindeki en sessiz noktaya (yumuşatılmış enerjinin en düşük olduğu çerçeve) yapılır.
+    Args:
+        waveform: Mono dalga formu (np.ndarray veya np.memmap)
+        sample_rate (int): Örnekleme hızı
+    Returns:
+        list: [(başlangıç örneği, bitiş örneği), ...] - kaydı boşluksuz ve örtüşmesiz kaplar
+    """
+    total = len(waveform)
+    target = max(1, int(target_seconds * sample_rate))
+    if total <= target:
+        return [(0, total)] if total else []
+
+    energy, frame = frame_energy(waveform, sample_rate)
+    smoothing = max(1, int(SMOOTHING_SECONDS / FRAME_SECONDS))
+    search = int(search_seconds * sample_rate)
+    minimum = int(min_seconds * sample_rate)
+
+    bounds = []
+    start = 0
+    while total - start > target:
+        hi = start + target
+        lo = max(start + minimum, hi - search)
+        frame_lo, frame_hi = lo // frame, hi // frame
+        window = energy[frame_lo:frame_hi]
+        if len(window) == 0:
+            cut = hi
+        else:
+            if len(window) > smoothing:
+                # Tek bir sessiz çerçeve yerine kısa bir sessizlik aralığının ortasını bul
+                window = np.convolve(window, np.ones(smoothing) / smoothing, mode="same")
+            cut = (frame_lo + int(np.argmin(window))) * frame + frame // 2
+            cut = min(max(cut, start + 1), hi)
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
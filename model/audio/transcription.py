@@ -2,112 +2,473 @@
 
 
 import os
-import torch
+import atexit
+import functools
 import logging
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+import multiprocessing
+import numpy as np
+from threading import Lock, local
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from ..runtime.registry import model_registry
+from ..runtime.precision import model_precision, resolve_precision, apply_precision, torch_dtype
+from .decoding import DecodedAudio, SAMPLE_RATE
+from .segmentation import split_at_silences
 
 logger = logging.getLogger(__name__)
 
-def transcribe_audio(audio_path, job_id):
+WHISPER_MODEL_ID = os.getenv("WHISPER_MODEL_ID", "openai/whisper-large-v3")
+WHISPER_REGISTRY_NAME = "whisper"
+
+# Yönlendirme adayları, küçükten büyüğe (ör. "openai/whisper-small,openai/whisper-medium,openai/whisper-large-v3").
+# Tanımlanmazsa yalnızca WHISPER_MODEL_ID kullanılır.
+WHISPER_MODELS = [
+    model_id.strip() for model_id in os.getenv("WHISPER_MODELS", WHISPER_MODEL_ID).split(",") if model_id.strip()
+] or [WHISPER_MODEL_ID]
+# Bu süreden kısa kayıtlar ve bu kuyruk derinliğinden itibaren bir küçük model seçilir
+WHISPER_SHORT_AUDIO_SECONDS = float(os.getenv("WHISPER_SHORT_AUDIO_SECONDS", "300"))
+WHISPER_BUSY_QUEUE_DEPTH = int(os.getenv("WHISPER_BUSY_QUEUE_DEPTH", "3"))
+# İstekte verilebilecek model ipuçları (aday model kimliği de verilebilir)
+WHISPER_HINTS = ("auto", "fast", "accurate")
+# Yardımlı (assisted/speculative) çözümleme için taslak model, ör. distil-whisper/distil-large-v3.
+# Yalnızca aynı tokenizer'ı paylaştığı varsayılan model (WHISPER_MODEL_ID) için kullanılır.
+WHISPER_ASSISTANT_MODEL = os.getenv("WHISPER_ASSISTANT_MODEL") or None
+
+# Çalışan iş parçacığının yardımlı çözümleme istatistikleri (decoder kancası buraya yazar)
+_assisted_stats = local()
+
+class AssistedDecodingStats:
+    """
+    Yardımlı çözümlemede taslak modelin önerdiği ve büyük modelin kabul ettiği token sayıları.
+    Büyük modelin decoder'ı her doğrulama turunda bir kez çağrılır; girdi [son onaylı token + k taslak token]
+    içerir ve tur sonunda önbellek kabul edilen tokenlere kırpılır. Bu yüzden ardışık iki turun önbellek
+    uzunluğu farkından kabul edilen taslak token sayısı çıkarılır. İlk tur (istem tokenleri) ve her dizinin
+    son turu ölçülemediği için hesaba katılmaz; oran bu turlar dışındaki tahmindir.
+    """
+
+    def __init__(self):
+        self.rounds = 0
+        self.proposed = 0
+        self.accepted = 0
+        self._last = None
+
+    def observe(self, cache_length, input_length):
+        last = self._last
+        if last is not None and cache_length > last[0]:
+            last_cache_length, last_input_length, measurable = last
+            if measurable:
+                self.rounds += 1
+                self.proposed += last_input_length - 1
+                self.accepted += max(0, min(cache_length - last_cache_length - 1, last_input_length - 1))
+            self._last = (cache_length, input_length, True)
+        else:
+            # Yeni dizi (ör. sonraki 30 saniyelik pencere): ilk tur istem tokenlerini de içerir
+            self._last = (cache_length, input_length, False)
+
+    @property
+    def acceptance_rate(self):
+        return self.accepted / float(self.proposed) if self.proposed else None
+
+    def merge(self, other):
+        self.rounds += other.get("rounds", 0)
+        self.proposed += other.get("proposed_tokens", 0)
+        self.accepted += other.get("accepted_tokens", 0)
+
+    def to_dict(self):
+        rate = self.acceptance_rate
+        return {
+            "rounds": self.rounds,
+            "proposed_tokens": self.proposed,
+            "accepted_tokens": self.accepted,
+            "acceptance_rate": round(rate, 4) if rate is not None else None
+        }
+
+def _cache_length(kwargs):
+    cache_position = kwargs.get("cache_position")
+    if cache_position is not None and cache_position.numel():
+        return int(cache_position[0])
+    past = kwargs.get("past_key_values")
+    if past is None:
+        return 0
+    if hasattr(past, "get_seq_length"):
+        return int(past.get_seq_length())
+    return int(past[0][0].shape[-2])
+
+def _decoder_pre_hook(module, args, kwargs):
+    stats = getattr(_assisted_stats, "current", None)
+    if stats is None:
+        return None
+    input_ids = kwargs.get("input_ids")
+    if input_ids is None and args:
+        input_ids = args[0]
+    if input_ids is not None:
+        stats.observe(_cache_length(kwargs), input_ids.shape[-1])
+    return None
+
+def _load_assistant(model, device, precision):
+    import torch
+    from transformers import AutoModelForSpeechSeq2Seq
+
+    # Taslak model büyük modelle aynı cihaz ve hassasiyette çalışmalı (encoder çıktıları paylaşılır)
+    print(f"Whisper taslak modeli yükleniyor: {WHISPER_ASSISTANT_MODEL}")
+    assistant = AutoModelForSpeechSeq2Seq.from_pretrained(
+        WHISPER_ASSISTANT_MODEL,
+        torch_dtype=torch.float32,
+        low_cpu_mem_usage=True,
+        use_safetensors=True
+    )
+    assistant.to(device)
+    assistant, _ = apply_precision(assistant, precision, device)
+    # Kabul oranını ölçmek için büyük modelin decoder çağrılarını izle
+    model.get_decoder().register_forward_pre_hook(_decoder_pre_hook, with_kwargs=True)
+    return assistant
+
+def _load_whisper(model_id=None, precision=None):
+    # torch ve transformers yalnızca model yüklenirken import edilir, HTTP katmanının açılışını yavaşlatmaz
+    import torch
+    from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+
+    model_id = model_id or WHISPER_MODEL_ID
+    # GPU için belleği temizle ve veri tipini float32 olarak ayarla (float16 sorunlara neden oluyor)
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+        torch.set_default_dtype(torch.float32)
+    
+    # Cihaz WHISPER_DEVICE ile seçilebilir (ör. cuda:0, cpu); varsayılan ilk GPU
+    device = os.getenv("WHISPER_DEVICE") or ("cuda:0" if torch.cuda.is_available() else "cpu")
+    precision = resolve_precision(precision or model_precision("whisper"), device)
+    print(f"Whisper cihazı: {device}, model: {model_id}, hassasiyet: {precision}")
+    
+    # Model float32 yüklenir; WHISPER_PRECISION ile bfloat16'ya veya int8 dinamik kuantizasyona çevrilebilir
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(
+        model_id, 
+        torch_dtype=torch.float32,
+        low_cpu_mem_usage=True,
+        use_safetensors=True
+    )
+    model.to(device)
+    model, precision = apply_precision(model, precision, device)
+    dtype = torch_dtype(precision)
+    
+    # Taslak model önerir, büyük model doğrular; greedy çözümlemede çıktı büyük modelle birebir aynıdır
+    assistant = None
+    if WHISPER_ASSISTANT_MODEL and model_id == WHISPER_MODEL_ID:
+        assistant = _load_assistant(model, device, precision)
+    
+    processor = AutoProcessor.from_pretrained(model_id)
+    
+    transcriber = pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        chunk_length_s=30,
+        device=device,
+        torch_dtype=dtype  # Aynı veri tipini pipeline'da da belirt
+    )
+    return {
+        "model": model,
+        "processor": processor,
+        "pipeline": transcriber,
+        "device": device,
+        "model_id": model_id,
+        "precision": precision,
+        "dtype": dtype,
+        "assistant": assistant
+    }
+
+def _warmup_whisper(whisper):
+    # 1 saniyelik hafif gürültü: özellik çıkarımı, encoder ve decoder (varsa taslak model de) bir kez çalışır
+    samples = np.random.default_rng(0).normal(0.0, 0.01, SAMPLE_RATE).astype(np.float32)
+    _run_pipeline(whisper, {"raw": samples, "sampling_rate": SAMPLE_RATE})
+
+model_registry.register(WHISPER_REGISTRY_NAME, _load_whisper, warmup=_warmup_whisper)
+
+def whisper_registry_name(model_id=None, precision=None):
+    """
+    Varsayılan model ve hassasiyet için "whisper", farklı bir model veya hassasiyet için ayrı bir kayıt
+    (ör. "whisper:openai/whisper-small@int8") döndürür. Farklı sürümler kayıt defterinde yan yana tutulabilir.
+    """
+    if (not model_id or model_id == WHISPER_MODEL_ID) and not precision:
+        return WHISPER_REGISTRY_NAME
+    name = f"{WHISPER_REGISTRY_NAME}:{model_id or WHISPER_MODEL_ID}@{precision or model_precision('whisper')}"
+    if not model_registry.is_registered(name):
+        model_registry.register(name, functools.partial(_load_whisper, model_id, precision), warmup=_warmup_whisper)
+    return name
+
+# Tüm adaylar kayıt defterinde tutulur (ilk kullanımda yüklenir, PRELOAD_MODELS ile önceden yüklenebilir)
+for _candidate in WHISPER_MODELS:
+    whisper_registry_name(_candidate)
+
+def resolve_whisper_hint(hint=None):
+    """
+    İstekteki Whisper ipucunu doğrular.
+    Raises:
+        ValueError: Bilinmeyen ipucu veya aday olmayan model kimliği
+    """
+    hint = hint or "auto"
+    if hint not in WHISPER_HINTS and hint not in WHISPER_MODELS:
+        raise ValueError(f"Geçersiz Whisper modeli: {hint} (seçenekler: {', '.join(WHISPER_HINTS + tuple(WHISPER_MODELS))})")
+    return hint
+
+def route_whisper_model(duration=None, queue_depth=0, hint=None, priority="normal"):
+    """
+    İş için Whisper modelini seçer. Varsayılan en büyük adaydır; kısa kayıt, yoğun kuyruk ve düşük öncelik
+    her biri bir küçük modele iner. "fast" en küçük, "accurate" en büyük adayı seçer.
+    Args:
+        duration (float): İşlenecek ses süresi (saniye), bilinmiyorsa None
+        queue_depth (int): Kuyrukta bekleyen iş sayısı
+        hint (str): auto, fast, accurate veya aday model kimliği
+    Returns:
+        tuple: (model kimliği, seçim gerekçesi)
+    """
+    hint = resolve_whisper_hint(hint)
+    if hint in WHISPER_MODELS:
+        return hint, "hint"
+    if hint == "fast":
+        return WHISPER_MODELS[0], "hint"
+    if hint == "accurate":
+        return WHISPER_MODELS[-1], "hint"
+    
+    level = len(WHISPER_MODELS) - 1
+    reasons = []
+    if duration is not None and duration <= WHISPER_SHORT_AUDIO_SECONDS:
+        level -= 1
+        reasons.append("short_audio")
+    if queue_depth >= WHISPER_BUSY_QUEUE_DEPTH:
+        level -= 1
+        reasons.append("busy")
+    if priority == "low":
+        level -= 1
+        reasons.append("low_priority")
+    return WHISPER_MODELS[max(level, 0)], ",".join(reasons) or "default"
+
+def _pipeline_input(audio):
+    # Çözülmüş ses varsa paylaşılan tamponu kopyalamadan ver, yoksa pipeline dosyayı kendisi çözer
+    if isinstance(audio, DecodedAudio):
+        return audio.whisper_input()
+    return audio
+
+def _run_pipeline(whisper, pipeline_input, stats=None):
+    # Taslak model varsa yardımlı çözümleme kullan ve bu iş parçacığının kabul istatistiklerini topla
+    assistant = whisper.get("assistant")
+    if assistant is None:
+        return whisper["pipeline"](pipeline_input, return_timestamps=True)
+    assisted = AssistedDecodingStats()
+    _assisted_stats.current = assisted
     try:
+        return whisper["pipeline"](
+            pipeline_input,
+            return_timestamps=True,
+            generate_kwargs={"assistant_model": assistant}
+        )
+    finally:
+        _assisted_stats.current = None
+        if stats is not None:
+            stats["assisted_decoding"] = dict(assisted.to_dict(), assistant_model=WHISPER_ASSISTANT_MODEL)
+
+# Parçalı transkripsiyon: kayıt sessiz noktalardan bölünür ve parçalar ayrı işlemlerde yazıya dökülür.
+# Her işlem kendi Whisper kopyasını yükler (large-v3 için işlem başına ~6 GB bellek).
+_segment_pool = None
+_segment_pool_workers = 0
+_segment_pool_lock = Lock()
+
+def _segment_workers():
+    # Varsayılan: işlem başına 4 CPU çekirdeği
+    return max(1, int(os.getenv("TRANSCRIPTION_WORKERS", "0")) or (os.cpu_count() or 1) // 4)
+
+def _segment_seconds():
+    return float(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "60"))
+
+def _use_segmented(audio):
+    # pipeline: tek model örneği (varsayılan), segmented: her zaman işlem havuzu,
+    # auto: GPU yoksa ve kayıt birden fazla parçaya bölünecek kadar uzunsa işlem havuzu
+    if not isinstance(audio, DecodedAudio):
+        return False
+    mode = os.getenv("TRANSCRIPTION_MODE", "pipeline")
+    if mode == "segmented":
+        return True
+    if mode != "auto":
+        return False
+    import torch
+    return (not torch.cuda.is_available() and _segment_workers() > 1
+            and audio.duration > 2 * _segment_seconds())
+
+def _segment_worker_init(threads):
+    import torch
+    # Çekirdekleri işlemler arasında paylaştır, her işlem kendi payı kadar iş parçacığı kullanır
+    torch.set_num_threads(threads)
+
+def _get_segment_pool(workers):
+    global _segment_pool, _segment_pool_workers
+    with _segment_pool_lock:
+        if _segment_pool is None or _segment_pool_workers != workers:
+            if _segment_pool is not None:
+                _segment_pool.shutdown(wait=False)
+            # fork, torch/CUDA iş parçacıkları varken güvenli değil; işlemler spawn ile başlatılır
+            _segment_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_segment_worker_init,
+                initargs=(max(1, (os.cpu_count() or 1) // workers),)
+            )
+            _segment_pool_workers = workers
+        return _segment_pool
+
+def _shutdown_segment_pool():
+    global _segment_pool
+    with _segment_pool_lock:
+        if _segment_pool is not None:
+            _segment_pool.shutdown(wait=False, cancel_futures=True)
+            _segment_pool = None
+
+atexit.register(_shutdown_segment_pool)
+
+def _transcribe_segment(path, num_samples, sample_rate, start, end, model_id=None, precision=None):
+    """
+    İşlem havuzunda çalışır: çözülmüş ses dosyasının [start, end) örneklerini yazıya döker ve
+    parça zaman damgalarını kaydın başına göre (global) döndürür. Model işlem başına bir kez yüklenir.
+    """
+    waveform = np.memmap(path, dtype=np.float32, mode="r", shape=(num_samples,))
+    samples = np.array(waveform[start:end])
+    del waveform
+    
+    registry_name = whisper_registry_name(model_id, precision)
+    whisper = model_registry.acquire(registry_name)
+    stats = {}
+    try:
+        result = _run_pipeline(whisper, {"raw": samples, "sampling_rate": sample_rate}, stats)
+    finally:
+        model_registry.release(registry_name)
+    
+    offset = start / float(sample_rate)
+    duration = (end - start) / float(sample_rate)
+    chunks = []
+    for chunk in result.get("chunks", []):
+        chunk_start, chunk_end = chunk["timestamp"]
+        # Whisper son parçanın bitişini None döndürebilir; parça sınırı bilindiği için pencere sonu kullanılır
+        if chunk_end is None:
+            chunk_end = duration
+        chunks.append({
+            "timestamp": (None if chunk_start is None else chunk_start + offset, chunk_end + offset),
+            "text": chunk["text"]
+        })
+    return result["text"], chunks, stats.get("assisted_decoding")
+
+def _transcribe_segmented(audio, job_id, progress_callback=None, model_id=None, precision=None, stats=None):
+    workers = _segment_workers()
+    bounds = split_at_silences(audio.waveform, audio.sample_rate, target_seconds=_segment_seconds())
+    print(f"[{job_id}] Parçalı transkripsiyon: {len(bounds)} pencere, {workers} işlem")
+    
+    pool = _get_segment_pool(workers)
+    futures = {
+        pool.submit(_transcribe_segment, audio.path, audio.num_samples, audio.sample_rate, start, end,
+                    model_id, precision): index
+        for index, (start, end) in enumerate(bounds)
+    }
+    results = [None] * len(bounds)
+    try:
+        for completed, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(completed / len(bounds))
+    except Exception as e:
+        for future in futures:
+            future.cancel()
+        if isinstance(e, BrokenProcessPool):
+            # Bir işlem çöktüyse (ör. bellek yetersizliği) havuz kullanılamaz, sonraki iş yenisini oluşturur
+            _shutdown_segment_pool()
+        raise
+    
+    # Pencereleri zaman sırasıyla birleştir
+    text = " ".join(segment_text.strip() for segment_text, _, _ in results if segment_text and segment_text.strip())
+    chunks = [chunk for _, segment_chunks, _ in results for chunk in segment_chunks]
+    
+    # İşlemlerin yardımlı çözümleme istatistiklerini topla
+    assisted_results = [assisted for _, _, assisted in results if assisted]
+    if stats is not None and assisted_results:
+        assisted = AssistedDecodingStats()
+        for item in assisted_results:
+            assisted.merge(item)
+        stats["assisted_decoding"] = dict(assisted.to_dict(), assistant_model=WHISPER_ASSISTANT_MODEL)
+    return text, chunks
+
+def transcribe_audio(audio, job_id, progress_callback=None, model_id=None, precision=None, stats=None, raise_errors=False):
+    # audio: dosya yolu veya decode_audio ile çözülmüş DecodedAudio
+    # model_id/precision: varsayılandan (WHISPER_MODEL_ID, WHISPER_PRECISION) farklı bir Whisper sürümü
+    # stats: verilirse yardımlı çözümleme kabul oranı bu sözlüğe yazılır
+    # raise_errors: hata metni döndürmek yerine hatayı yukarı ilet (iş aşaması hata verir ve kontrol noktası yazılmaz)
+    audio_path = audio.source_path if isinstance(audio, DecodedAudio) else audio
+    try:
+        registry_name = whisper_registry_name(model_id, precision)
         logger.info(f"[{job_id}] Transkripsiyon başlatılıyor: {audio_path}")
         print(f"[{job_id}] Transkripsiyon için ses dosyası: {audio_path}")
         print(f"[{job_id}] Dosya var mı: {os.path.exists(audio_path)}")
         
-        # GPU durumunu kontrol et
-        try:
-            print(f"[{job_id}] GPU kontrolü yapılıyor...")
-            print(f"[{job_id}] CUDA kullanılabilir mi: {torch.cuda.is_available()}")
-            if torch.cuda.is_available():
-                print(f"[{job_id}] Kullanılabilir GPU sayısı: {torch.cuda.device_count()}")
-                print(f"[{job_id}] Aktif GPU: {torch.cuda.get_device_name(0)}")
-                # GPU için belleği temizle
-                torch.cuda.empty_cache()
-                # Veri tipini float32 olarak ayarla (float16 sorunlara neden oluyor)
-                torch.set_default_dtype(torch.float32)
-        except Exception as e:
-            print(f"[{job_id}] GPU kontrolü sırasında hata: {str(e)}")
+        if _use_segmented(audio):
+            try:
+                return _transcribe_segmented(audio, job_id, progress_callback, model_id, precision, stats)
+            except Exception as e:
+                # İşlem havuzu kullanılamazsa tek model örneğiyle devam et
+                print(f"[{job_id}] Parçalı transkripsiyon başarısız, tek pipeline kullanılacak: {str(e)}")
+                logger.warning(f"[{job_id}] Parçalı transkripsiyon hatası: {str(e)}")
         
-        # Modeli yükle
-        print(f"[{job_id}] Whisper modeli yükleniyor...")
+        # Modeli kayıt defterinden al (ilk kullanımda yüklenir, sonraki işlerde tekrar kullanılır)
+        print(f"[{job_id}] Whisper modeli hazırlanıyor...")
         try:
-            device = "cuda:0" if torch.cuda.is_available() else "cpu"
-            print(f"[{job_id}] Cihaz: {device}")
-            
-            model_id = "openai/whisper-large-v3"
-            
-            # Veri tipini belirle - tüm modeller için float32 kullan
-            dtype = torch.float32
-            
-            # Model ve processor'ı yükle
-            model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                model_id, 
-                torch_dtype=dtype,
-                low_cpu_mem_usage=True,
-                use_safetensors=True
-            )
-            model.to(device)
-            
-            processor = AutoProcessor.from_pretrained(model_id)
-            
-            transcriber = pipeline(
-                "automatic-speech-recognition",
-                model=model,
-                tokenizer=processor.tokenizer,
-                feature_extractor=processor.feature_extractor,
-                chunk_length_s=30,
-                device=device,
-                torch_dtype=dtype  # Aynı veri tipini pipeline'da da belirt
-            )
-            print(f"[{job_id}] Whisper modeli başarıyla yüklendi")
-            
+            whisper = model_registry.acquire(registry_name)
+            print(f"[{job_id}] Whisper modeli hazır, cihaz: {whisper['device']}, hassasiyet: {whisper.get('precision')}")
         except Exception as e:
             print(f"[{job_id}] Whisper modeli yükleme hatası: {str(e)}")
             import traceback
             print(f"[{job_id}] Yükleme hata detayları:\n{traceback.format_exc()}")
             raise Exception(f"Whisper modeli yükleme hatası: {str(e)}")
         
-        print(f"[{job_id}] Transkripsiyon işlemi başlıyor...")
         try:
-            result = transcriber(
-                audio_path,
-                return_timestamps=True,
-            )
-            print(f"[{job_id}] Transkripsiyon başarıyla tamamlandı")
-            
-        except Exception as e:
-            print(f"[{job_id}] Transkripsiyon işlemi sırasında hata: {str(e)}")
-            import traceback
-            print(f"[{job_id}] Transkripsiyon hata detayları:\n{traceback.format_exc()}")
-            
-            # GPU hatası alındıysa CPU'ya geçiş yap
-            if torch.cuda.is_available() and "cuda" in str(e).lower():
-                print(f"[{job_id}] GPU hatası tespit edildi, CPU'ya geçiliyor...")
-                try:
-                    # Belleği temizle
-                    torch.cuda.empty_cache()
-                    # Modeli CPU'ya taşı
-                    model.to("cpu")
-                    # Pipeline'ı yeniden oluştur
-                    transcriber = pipeline(
-                        "automatic-speech-recognition",
-                        model=model,
-                        tokenizer=processor.tokenizer,
-                        feature_extractor=processor.feature_extractor,
-                        chunk_length_s=30,
-                        device="cpu"
-                    )
-                    # İşlemi CPU'da tekrar dene
-                    result = transcriber(
-                        audio_path,
-                        return_timestamps=True,
-                    )
-                    print(f"[{job_id}] CPU ile transkripsiyon başarıyla tamamlandı")
-                except Exception as cpu_e:
-                    print(f"[{job_id}] CPU ile de işlem başarısız: {str(cpu_e)}")
-                    raise Exception(f"Transkripsiyon işlemi hatası (GPU ve CPU): {str(e)}")
-            else:
-                raise Exception(f"Transkripsiyon işlemi hatası: {str(e)}")
+            print(f"[{job_id}] Transkripsiyon işlemi başlıyor...")
+            try:
+                result = _run_pipeline(whisper, _pipeline_input(audio), stats)
+                print(f"[{job_id}] Transkripsiyon başarıyla tamamlandı")
+                
+            except Exception as e:
+                print(f"[{job_id}] Transkripsiyon işlemi sırasında hata: {str(e)}")
+                import traceback
+                print(f"[{job_id}] Transkripsiyon hata detayları:\n{traceback.format_exc()}")
+                
+                # GPU hatası alındıysa CPU'ya geçiş yap
+                import torch
+                if torch.cuda.is_available() and "cuda" in str(e).lower():
+                    print(f"[{job_id}] GPU hatası tespit edildi, CPU'ya geçiliyor...")
+                    try:
+                        # Belleği temizle
+                        torch.cuda.empty_cache()
+                        # Paylaşılan modeli CPU'ya taşı ve pipeline'ı yeniden oluştur,
+                        # böylece sonraki işler de CPU pipeline'ını kullanır
+                        whisper["model"].to("cpu")
+                        if whisper.get("assistant") is not None:
+                            whisper["assistant"].to("cpu")
+                        from transformers import pipeline
+                        whisper["pipeline"] = pipeline(
+                            "automatic-speech-recognition",
+                            model=whisper["model"],
+                            tokenizer=whisper["processor"].tokenizer,
+                            feature_extractor=whisper["processor"].feature_extractor,
+                            chunk_length_s=30,
+                            device="cpu",
+                            torch_dtype=whisper.get("dtype", torch.float32)
+                        )
+                        whisper["device"] = "cpu"
+                        # İşlemi CPU'da tekrar dene
+                        result = _run_pipeline(whisper, _pipeline_input(audio), stats)
+                        print(f"[{job_id}] CPU ile transkripsiyon başarıyla tamamlandı")
+                    except Exception as cpu_e:
+                        print(f"[{job_id}] CPU ile de işlem başarısız: {str(cpu_e)}")
+                        raise Exception(f"Transkripsiyon işlemi hatası (GPU ve CPU): {str(e)}")
+                else:
+                    raise Exception(f"Transkripsiyon işlemi hatası: {str(e)}")
+        finally:
+            model_registry.release(registry_name)
         
         return result["text"], result.get("chunks", [])
         
@@ -116,4 +477,6 @@ def transcribe_audio(audio_path, job_id):
         logger.error(f"[{job_id}] Transkripsiyon hatası: {str(e)}")
         import traceback
         logger.error(f"[{job_id}] Transkripsiyon hata detayları:\n{traceback.format_exc()}")
-        return f"Transkripsiyon hatası: {str(e)}", [] 
\ No newline at end of file
+        if raise_errors:
+            raise
+        return f"Transkripsiyon hatası: {str(e)}", []
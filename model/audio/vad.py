@@ -0,0 +1,215 @@
+# Ses etkinliği tespiti (VAD). Çözülmüş sesteki konuşma bölgelerini enerjiye göre bulur, yalnızca konuşma
+# bölgelerini içeren sıkıştırılmış bir ses dosyası üretir ve modellerin zaman damgalarını özgün kayda geri çevirir.
+
+import os
+import uuid
+import logging
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .decoding import DecodedAudio, _audio_cache_dir
+from .segmentation import frame_energy
+
+logger = logging.getLogger(__name__)
+
+# Konuşma bölgesi sayılması için gereken en kısa süre, birleştirilecek en uzun sessizlik ve bölge kenar payı (saniye)
+MIN_SPEECH_SECONDS = 0.25
+PADDING_SECONDS = 0.2
+# Enerji eşiği: gürültü tabanının (en sessiz %10'luk çerçeveler) bu katı, en az MIN_ENERGY
+NOISE_FLOOR_RATIO = 3.0
+MIN_ENERGY = 0.005
+# Konuşma oranı bunun üzerindeyse sıkıştırma yapılmaz (kazanç kopyalama maliyetine değmez)
+MAX_COMPACT_SPEECH_RATIO = 0.9
+
+
+def vad_enabled():
+    return os.getenv("VAD_ENABLED", "1") != "0"
+
+
+class SpeechMap:
+    """
+    Özgün kayıttaki konuşma bölgeleri ve sıkıştırılmış (yalnızca konuşma) zaman ekseni ile özgün zaman ekseni
+    arasındaki eşleme. Bölgeler örnek (sample) cinsinden, sıralı ve örtüşmesizdir.
+    """
+
+    def __init__(self, regions, total_samples, sample_rate):
+        self.regions = regions
+        self.total_samples = total_samples
+        self.sample_rate = sample_rate
+        self.compacted = False
+
+        # Her bölgenin sıkıştırılmış eksendeki başlangıcı (saniye)
+        self._compact_starts = []
+        position = 0
+        for start, end in regions:
+            self._compact_starts.append(position / float(sample_rate))
+            position += end - start
+        self._region_starts = [start / float(sample_rate) for start, _ in regions]
+        self._region_ends = [end / float(sample_rate) for _, end in regions]
+
+    @property
+    def speech_seconds(self):
+        return sum(end - start for start, end in self.regions) / float(self.sample_rate)
+
+    @property
+    def total_seconds(self):
+        return self.total_samples / float(self.sample_rate)
+
+    @property
+    def silence_ratio(self):
+        if not self.total_samples:
+            return 0.0
+        return 1.0 - self.speech_seconds / self.total_seconds
+
+    def to_original(self, seconds, is_end=False):
+        """
+        Sıkıştırılmış eksendeki zamanı özgün kayıttaki zamana çevirir. Bölge sınırına denk gelen bitiş zamanları
+        önceki bölgenin sonuna eşlenir, böylece bir parça aradaki sessizliği kapsayacak şekilde uzamaz.
+        """
+        if seconds is None or not self.compacted or not self.regions:
+            return seconds
+        if is_end:
+            index = bisect_left(self._compact_starts, seconds) - 1
+        else:
+            index = bisect_right(self._compact_starts, seconds) - 1
+        index = max(index, 0)
+        return self._region_starts[index] + (seconds - self._compact_starts[index])
+
+    def remap_chunks(self, chunks):
+        """Whisper parçalarının zaman damgalarını özgün kayda çevirir."""
+        if not self.compacted:
+            return chunks
+        return [
+            dict(chunk, timestamp=(self.to_original(chunk["timestamp"][0]),
+                                   self.to_original(chunk["timestamp"][1], is_end=True)))
+            for chunk in chunks
+        ]
+
+    def remap_segments(self, segments):
+        """Konuşmacı segmentlerinin (start/end) zamanlarını özgün kayda çevirir."""
+        if not self.compacted:
+            return segments
+        return [
+            dict(segment, start=self.to_original(segment["start"]), end=self.to_original(segment["end"], is_end=True))
+            for segment in segments
+        ]
+
+    def silence_within(self, start, end):
+        """[start, end] aralığındaki (saniye, özgün eksen) sessizlik süresi."""
+        if end <= start:
+            return 0.0
+        speech = 0.0
+        first = max(bisect_right(self._region_ends, start), 0)
+        for index in range(first, len(self.regions)):
+            region_start = self._region_starts[index]
+            if region_start >= end:
+                break
+            speech += max(0.0, min(end, self._region_ends[index]) - max(start, region_start))
+        return (end - start) - speech
+
+    def summary(self):
+        return {
+            "total_seconds": round(self.total_seconds, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "silence_seconds": round(self.total_seconds - self.speech_seconds, 3),
+            "silence_ratio": round(self.silence_ratio, 4),
+            "region_count": len(self.regions),
+            "compacted": self.compacted
+        }
+
+    def to_dict(self):
+        data = self.summary()
+        data["regions"] = [[round(start, 3), round(end, 3)] for start, end in zip(self._region_starts, self._region_ends)]
+        return data
+
+    def state(self):
+        """Eşlemeyi yeniden kurmaya yetecek JSON uyumlu durum (kontrol noktaları için)."""
+        return {
+            "regions": [[start, end] for start, end in self.regions],
+            "total_samples": self.total_samples,
+            "sample_rate": self.sample_rate,
+            "compacted": self.compacted
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        speech_map = cls([tuple(region) for region in state["regions"]], state["total_samples"], state["sample_rate"])
+        speech_map.compacted = state["compacted"]
+        return speech_map
+
+    def __repr__(self):
+        return f"SpeechMap({len(self.regions)} bölge, sessizlik %{self.silence_ratio * 100:.1f})"
+
+
+def detect_speech_regions(waveform, sample_rate, min_silence_seconds=None):
+    """
+    Enerji tabanlı konuşma tespiti. Eşik, kaydın gürültü tabanına göre uyarlanır; kısa sessizlikler
+    birleştirilir, çok kısa bölgeler atılır ve bölgelere kenar payı eklenir.
+    Not: Yalnızca enerjiye baktığı için yüksek sesli müzik konuşma olarak sayılır.
+    Returns:
+        list: [(başlangıç örneği, bitiş örneği), ...]
+    """
+    if min_silence_seconds is None:
+        min_silence_seconds = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.5"))
+    energy, frame = frame_energy(waveform, sample_rate)
+    if len(energy) == 0:
+        return []
+
+    threshold = max(MIN_ENERGY, float(np.percentile(energy, 10)) * NOISE_FLOOR_RATIO)
+    active = energy > threshold
+
+    # Etkin çerçeve dizilerinin başlangıç ve bitişleri
+    edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    frame_seconds = frame / float(sample_rate)
+    max_gap = int(round(min_silence_seconds / frame_seconds))
+    padding = int(round(PADDING_SECONDS / frame_seconds))
+    min_frames = int(round(MIN_SPEECH_SECONDS / frame_seconds))
+
+    regions = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        start = max(0, start - padding)
+        end = min(len(energy), end + padding)
+        if regions and start - regions[-1][1] <= max_gap:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+
+    total = len(waveform)
+    return [
+        (start * frame, total if end == len(energy) else end * frame)
+        for start, end in regions if end - start >= min_frames
+    ]
+
+
+def apply_vad(audio, job_id):
+    """
+    Konuşma bölgelerini bulur ve gerekirse yalnızca konuşmayı içeren yeni bir DecodedAudio üretir.
+    Returns:
+        tuple: (modellere verilecek DecodedAudio, SpeechMap)
+    """
+    regions = detect_speech_regions(audio.waveform, audio.sample_rate)
+    speech_map = SpeechMap(regions, audio.num_samples, audio.sample_rate)
+    print(f"[{job_id}] VAD: {len(regions)} konuşma bölgesi, {speech_map.speech_seconds:.1f}/{speech_map.total_seconds:.1f} "
+          f"saniye konuşma (sessizlik %{speech_map.silence_ratio * 100:.1f})")
+
+    speech_ratio = 1.0 - speech_map.silence_ratio
+    if not regions or speech_ratio > MAX_COMPACT_SPEECH_RATIO:
+        # Konuşma bulunamadıysa (ör. çok sessiz kayıt) veya sessizlik azsa modeller kaydın tamamını işler
+        return audio, speech_map
+
+    output_path = os.path.join(_audio_cache_dir(), f"{job_id}_{uuid.uuid4().hex}_speech.f32")
+    waveform = audio.waveform
+    with open(output_path, "wb") as f:
+        for start, end in regions:
+            np.asarray(waveform[start:end], dtype=np.float32).tofile(f)
+    speech_map.compacted = True
+
+    compact = DecodedAudio(output_path, audio.source_path, audio.sample_rate)
+    print(f"[{job_id}] VAD: modellere {compact.duration:.1f} saniyelik konuşma verilecek")
+    return compact, speech_map
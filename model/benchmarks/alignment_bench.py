@@ -0,0 +1,206 @@
+# Konuşmacı eşleştirme algoritmalarını karşılaştıran benchmark. Sentetik parça/segment listeleri üretir,
+# indeksli ve vektörel (NumPy) eşleştirmeyi doğrusal tarama ile karşılaştırır ve konuşmacı atamalarının
+# aynı olduğunu doğrular. --fuzz ile rastgele küçük girdilerde (örtüşen ve sıfır süreli segmentler, sırasız
+# parçalar, kayan nokta hesabında eşit çıkan mesafeler) atamaların doğrusal taramayla aynı olduğu denetlenir.
+#
+# Kullanım: python -m model.benchmarks.alignment_bench --chunks 5000 --segments 3000
+#           python -m model.benchmarks.alignment_bench --chunks 100000 --no-linear
+#           python -m model.benchmarks.alignment_bench --fuzz 5000
+
+import argparse
+import contextlib
+import io
+import math
+import random
+import sys
+import time
+
+from ..text.alignment import (
+    align_transcription_with_speakers,
+    align_transcription_with_speakers_linear,
+    align_transcription_with_speakers_vectorized,
+    SpeakerIndex,
+    VectorizedSpeakerIndex,
+    _assign_speaker_linear,
+)
+
+
+def make_alignment_fixture(chunk_count, segment_count, speaker_count=4, seed=0, long_segment=False):
+    """
+    Belirlenimci (deterministic) sentetik Whisper parçaları ve konuşmacı segmentleri üretir.
+    Segmentler arasında boşluklar ve örtüşmeler bulunur, böylece en yakın konuşmacı yolu da çalışır.
+    long_segment=True ise listenin başına kaydın tamamını kapsayan bir segment eklenir (ör. sürekli arka plan
+    konuşmacısı); indeks bu durumda da her parça için yalnızca örtüşen segmentleri ziyaret etmelidir.
+    """
+    rng = random.Random(seed)
+    duration = max(chunk_count, segment_count) * 3.0
+
+    chunks = []
+    position = 0.0
+    chunk_length = duration / max(chunk_count, 1)
+    for i in range(chunk_count):
+        start = round(position, 2)
+        end = round(position + chunk_length * rng.uniform(0.6, 1.0), 2)
+        chunks.append({"timestamp": (start, end), "text": f" chunk {i} text"})
+        position += chunk_length
+
+    speakers = []
+    position = 0.0
+    segment_length = duration / max(segment_count, 1)
+    for i in range(segment_count):
+        start = position + segment_length * rng.uniform(-0.2, 0.3)
+        end = position + segment_length * rng.uniform(0.5, 1.2)
+        speakers.append({
+            "speaker": f"SPEAKER_{rng.randrange(speaker_count):02d}",
+            "start": max(0.0, start),
+            "end": max(0.0, end)
+        })
+        position += segment_length
+
+    if long_segment:
+        speakers.insert(0, {"speaker": f"SPEAKER_{speaker_count:02d}", "start": 0.0, "end": duration})
+
+    transcription = "".join(chunk["text"] for chunk in chunks)
+    return transcription, chunks, speakers
+
+
+def _near(rng, value):
+    # Aynı zamanın farklı aritmetikle üretilmiş, birkaç ULP farklı karşılıkları (ör. 23.7 ve 23.700000000000003)
+    form = rng.randrange(4)
+    if form == 1:
+        return math.nextafter(value, math.inf)
+    if form == 2:
+        return math.nextafter(value, -math.inf)
+    if form == 3:
+        return round(value * 10) * 0.1
+    return value
+
+
+def make_random_alignment_case(rng):
+    """
+    Eşitlik durumlarını zorlayan küçük rastgele girdi: segment sınırları birkaç zaman noktasının yakın
+    karşılıklarıdır; örtüşen, sıfır süreli ve kaydın tamamını kapsayan uzun segmentler, sıfır süreli ve
+    sırasız parçalar bulunur.
+    Returns:
+        tuple: (konuşmacı segmentleri, [(parça başlangıcı, parça bitişi), ...])
+    """
+    points = [round(rng.uniform(0, 100), 1) for _ in range(rng.randint(1, 6))]
+    speakers = []
+    for _ in range(rng.randint(1, 25)):
+        kind = rng.random()
+        if kind < 0.1:
+            start = end = _near(rng, rng.choice(points))
+        elif kind < 0.15:
+            start, end = 0.0, 10000.0
+        elif kind < 0.6:
+            end = _near(rng, rng.choice(points))
+            start = max(0.0, end - rng.choice([0.1, 0.5, 3.0]))
+        else:
+            start = _near(rng, rng.choice(points))
+            end = start + rng.choice([0.1, 0.5, 3.0])
+        speakers.append({"speaker": f"SPEAKER_{rng.randrange(3):02d}", "start": start, "end": end})
+
+    chunks = []
+    for _ in range(rng.randint(1, 40)):
+        start = rng.choice([_near(rng, rng.choice(points)), round(rng.uniform(0, 200), 1), rng.uniform(0, 200)])
+        chunks.append((start, start + rng.choice([0.0, 0.1, 0.9, 2.5])))
+    rng.shuffle(chunks)
+    return speakers, chunks
+
+
+def check_alignment_equivalence(trials=2000, seed=0):
+    """
+    Rastgele girdilerde indeksli ve vektörel atamaları doğrusal taramayla karşılaştırır. Vektörel yolda
+    küçük blok ve pencere boyutları da denenir, böylece blok sınırları ve satır bazlı yedek de çalışır.
+    Returns:
+        list: Farklı çıkan atamalar (deneme, yol, parça, sonuç, beklenen)
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for trial in range(trials):
+        speakers, chunks = make_random_alignment_case(rng)
+        expected = [_assign_speaker_linear(start, end, speakers) for start, end in chunks]
+        index = SpeakerIndex(speakers)
+        results = {"indexed": [index.assign(start, end) for start, end in chunks]}
+        # Uzun segment ayrımı küçük girdilerde de çalışsın diye sınır düşürülür
+        vectorized = VectorizedSpeakerIndex(speakers, long_segments=rng.choice([0, 2, 64]))
+        results["vectorized"] = vectorized.assign_many(
+            [start for start, _ in chunks], [end for _, end in chunks],
+            block_size=rng.choice([3, 4096]), max_window=rng.choice([1, 4, 256])
+        )
+        for path, assignments in results.items():
+            for chunk, got, want in zip(chunks, assignments, expected):
+                if got != want:
+                    mismatches.append({"trial": trial, "path": path, "chunk": chunk, "got": got, "expected": want})
+    return mismatches
+
+
+def _timed(func, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        # Eşleştirme fonksiyonlarının özet çıktılarını ölçüme katma
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = func(*args)
+            best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run_alignment_benchmark(chunk_count, segment_count, seed=0, repeat=3, include_linear=True, long_segment=False):
+    transcription, chunks, speakers = make_alignment_fixture(chunk_count, segment_count, seed=seed,
+                                                             long_segment=long_segment)
+    report = {"chunks": chunk_count, "segments": segment_count}
+
+    indexed_seconds, indexed = _timed(align_transcription_with_speakers, transcription, chunks, speakers, repeat=repeat)
+    report["indexed_seconds"] = indexed_seconds
+
+    vectorized_seconds, vectorized = _timed(align_transcription_with_speakers_vectorized, transcription, chunks, speakers, repeat=repeat)
+    report["vectorized_seconds"] = vectorized_seconds
+    # Doğrusal tarama yoksa indeksli sonuç referans alınır
+    reference = indexed
+    report["linear_seconds"] = None
+    report["speedup"] = None
+
+    if include_linear:
+        linear_seconds, reference = _timed(align_transcription_with_speakers_linear, transcription, chunks, speakers, repeat=repeat)
+        report["linear_seconds"] = linear_seconds
+        report["speedup"] = linear_seconds / indexed_seconds if indexed_seconds > 0 else None
+
+    report["vectorized_speedup"] = indexed_seconds / vectorized_seconds if vectorized_seconds > 0 else None
+    report["identical"] = indexed == reference and vectorized == reference
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konuşmacı eşleştirme benchmark'ı")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--segments", type=int, default=None, help="Varsayılan: parça sayısının %%60'ı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-linear", action="store_true", help="Çok uzun girdilerde doğrusal taramayı atla")
+    parser.add_argument("--long-segment", action="store_true", help="Kaydın tamamını kapsayan bir segment ekle")
+    parser.add_argument("--fuzz", type=int, default=0, metavar="N", help="N rastgele girdide eşdeğerlik denetimi")
+    args = parser.parse_args()
+
+    if args.fuzz:
+        mismatches = check_alignment_equivalence(args.fuzz, seed=args.seed)
+        for mismatch in mismatches[:10]:
+            print(mismatch)
+        print(f"{args.fuzz} rastgele girdi, {len(mismatches)} farklı atama")
+        return 1 if mismatches else 0
+
+    print(f"{'chunks':>8} {'segments':>9} {'linear(s)':>10} {'indexed(s)':>11} {'vector(s)':>10} "
+          f"{'lin/idx':>8} {'idx/vec':>8} identical")
+    for chunk_count in args.chunks:
+        segment_count = args.segments or max(1, int(chunk_count * 0.6))
+        report = run_alignment_benchmark(chunk_count, segment_count, seed=args.seed, repeat=args.repeat,
+                                         include_linear=not args.no_linear, long_segment=args.long_segment)
+        linear = f"{report['linear_seconds']:>10.4f}" if report["linear_seconds"] is not None else f"{'-':>10}"
+        speedup = f"{report['speedup']:>7.1f}x" if report["speedup"] is not None else f"{'-':>8}"
+        print(f"{report['chunks']:>8} {report['segments']:>9} {linear} {report['indexed_seconds']:>11.4f} "
+              f"{report['vectorized_seconds']:>10.4f} {speedup} {report['vectorized_speedup']:>7.1f}x {report['identical']}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
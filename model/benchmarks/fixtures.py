@@ -0,0 +1,113 @@
+# Benchmark'lar için belirlenimci (deterministic) sentetik toplantı verileri: çok konuşmacılı transkriptler,
+# Whisper parçaları, konuşmacı segmentleri ve konuşma/sessizlik içeren kısa WAV dosyaları.
+# Aynı parametreler ve tohum (seed) her zaman aynı çıktıyı üretir, böylece ölçümler karşılaştırılabilir kalır.
+
+import math
+import random
+import wave
+
+import numpy as np
+
+POSITIVE_WORDS = ("great", "good", "thanks", "success", "agree", "excellent", "happy", "progress")
+NEGATIVE_WORDS = ("problem", "issue", "delay", "risk", "blocked", "worried", "failed", "bad")
+NEUTRAL_WORDS = (
+    "the", "we", "will", "next", "week", "budget", "release", "team", "customer", "plan", "review", "design",
+    "deadline", "report", "meeting", "update", "schedule", "data", "server", "test", "should", "about", "and",
+    "then", "sprint", "roadmap", "backend", "frontend", "migration", "quarter", "feedback", "ticket"
+)
+VOCABULARY = tuple(sorted(set(POSITIVE_WORDS + NEGATIVE_WORDS + NEUTRAL_WORDS)))
+
+
+def _sentence(rng, min_words, max_words):
+    words = []
+    for _ in range(rng.randint(min_words, max_words)):
+        roll = rng.random()
+        if roll < 0.1:
+            words.append(rng.choice(POSITIVE_WORDS))
+        elif roll < 0.17:
+            words.append(rng.choice(NEGATIVE_WORDS))
+        else:
+            words.append(rng.choice(NEUTRAL_WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def make_meeting(segment_count, speaker_count=3, duration=None, seed=0, words_per_segment=(6, 20)):
+    """
+    Sentetik toplantı üretir. Konuşmacı segmentleri Whisper parçalarından biraz kaydırılmıştır ve aralarında
+    kısa sessizlikler vardır, böylece eşleştirme gerçek kayıtlardaki gibi örtüşme hesabı yapar.
+    Args:
+        segment_count (int): Konuşma sırası (turn) sayısı
+        duration (float): Toplantı süresi (saniye); verilmezse segment başına ~4 saniye
+    Returns:
+        dict: transcription, chunks (Whisper biçimi), speakers (diarization biçimi), aligned (eşleştirilmiş
+            transkript biçimi) ve duration
+    """
+    rng = random.Random(seed)
+    segment_count = max(1, int(segment_count))
+    if duration is None:
+        duration = segment_count * 4.0
+    slot = duration / segment_count
+
+    chunks = []
+    speakers = []
+    aligned = []
+    speaker = 0
+    for index in range(segment_count):
+        # Konuşmacı bazen aynı kalır, bazen değişir
+        if index and rng.random() < 0.7:
+            speaker = (speaker + rng.randrange(1, speaker_count)) % speaker_count if speaker_count > 1 else 0
+        label = f"SPEAKER_{speaker:02d}"
+        start = index * slot + rng.uniform(0.0, 0.1) * slot
+        end = (index + 1) * slot - rng.uniform(0.05, 0.2) * slot
+        text = _sentence(rng, *words_per_segment)
+
+        chunks.append({"timestamp": (round(start, 2), round(end, 2)), "text": " " + text})
+        shift = rng.uniform(-0.05, 0.05) * slot
+        speakers.append({"speaker": label, "start": max(0.0, start + shift), "end": min(duration, end + shift)})
+        aligned.append({"speaker": label, "start": round(start, 2), "end": round(end, 2), "text": text})
+
+    return {
+        "transcription": "".join(chunk["text"] for chunk in chunks),
+        "chunks": chunks,
+        "speakers": speakers,
+        "aligned": aligned,
+        "duration": duration
+    }
+
+
+def synthetic_waveform(seconds, sample_rate=16000, seed=0, speech_ratio=0.7):
+    """
+    Konuşma benzeri (genliği modüle edilmiş ton + gürültü) bölgeler ve aralarında sessizlikler içeren mono
+    dalga formu. VAD ve sessizlikten bölme gerçek kayıtlardaki gibi çalışır.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    waveform = rng.normal(0.0, 0.001, total).astype(np.float32)
+    position = 0
+    while position < total:
+        speech = int(rng.uniform(1.0, 6.0) * sample_rate)
+        silence = int(speech * (1.0 - speech_ratio) / max(speech_ratio, 1e-3) * rng.uniform(0.5, 1.5))
+        end = min(total, position + speech)
+        t = np.arange(end - position, dtype=np.float32) / sample_rate
+        pitch = rng.uniform(100.0, 250.0)
+        envelope = 0.5 + 0.5 * np.sin(2 * math.pi * 4.0 * t)
+        waveform[position:end] += (0.3 * envelope * np.sin(2 * math.pi * pitch * t)
+                                   + rng.normal(0.0, 0.02, end - position)).astype(np.float32)
+        position = end + silence
+    return np.clip(waveform, -1.0, 1.0)
+
+
+def write_wav(path, seconds, sample_rate=16000, seed=0):
+    """Sentetik dalga formunu 16 bit PCM WAV olarak yazar ve dosya yolunu döndürür."""
+    samples = (synthetic_waveform(seconds, sample_rate, seed) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return path
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / float(f.getframerate())
@@ -0,0 +1,120 @@
+# Açılış (import) süresi ölçümü. Servisi yeni bir Python sürecinde `-X importtime` ile import eder ve modül
+# başına kendi/kümülatif import süresini raporlar. torch veya transformers gibi ağır bağımlılıkların HTTP
+# katmanının açılış yoluna geri sızması burada görülür; --budget ile süre sınırı aşılırsa çıkış kodu 1 olur.
+#
+# Kullanım: python -m model.benchmarks.import_time
+#           python -m model.benchmarks.import_time --module model.app --top 30 --budget 1.0
+#           python -m model.benchmarks.import_time --json import_times.json
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Açılış yolunda olmaması gereken ağır modüller (yalnızca model yüklenirken import edilmeli)
+HEAVY_MODULES = ("torch", "transformers", "pyannote")
+
+
+def parse_importtime(output):
+    """
+    `-X importtime` çıktısını ayrıştırır.
+    Returns:
+        list: Her import için {"module", "self", "cumulative", "depth"} (süreler saniye)
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            entries.append({
+                "module": name.strip(),
+                "self": int(self_us) / 1e6,
+                "cumulative": int(cumulative_us) / 1e6,
+                # Girinti iç içe import derinliğini gösterir (iki boşluk bir seviye)
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2
+            })
+        except ValueError:
+            continue
+    return entries
+
+
+def measure_import(module="model.app", cwd=None, env=None):
+    """
+    Modülü yeni bir süreçte import eder (önceden yüklenmiş modüller ölçümü bozmasın diye).
+    Returns:
+        dict: Toplam süre, modül listesi ve yüklenen ağır modüller
+    """
+    # Servis modüllerin bulunduğu dizinden bağımsız olarak import edilebilsin
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    env = dict(os.environ if env is None else env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    # Arka plan iş parçacıkları (GPU yapılandırması, model ısınması) torch'u import eder; yalnızca açılış yolu
+    # ölçülsün diye ölçüm sürecinde başlatılmazlar
+    code = f"import threading; threading.Thread.start = lambda self: None; import {module}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    entries = parse_importtime(completed.stderr)
+    top_level = [entry for entry in entries if entry["depth"] == 0]
+    heavy = sorted({entry["module"] for entry in entries if entry["module"].split(".")[0] in HEAVY_MODULES})
+    return {
+        "module": module,
+        "ok": completed.returncode == 0,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode else None,
+        "total_seconds": sum(entry["cumulative"] for entry in top_level),
+        "heavy_modules": heavy,
+        "modules": entries
+    }
+
+
+def summarize_packages(entries):
+    """Kendi sürelerini üst seviye pakete göre toplar (ör. flask, numpy, model)."""
+    packages = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self"]
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servis açılışının import süresi ölçümü")
+    parser.add_argument("--module", default="model.app", help="Import edilecek modül")
+    parser.add_argument("--top", type=int, default=20, help="Gösterilecek en yavaş modül sayısı")
+    parser.add_argument("--budget", type=float, help="Toplam import süresi sınırı (saniye)")
+    parser.add_argument("--json", help="Tüm ölçümlerin yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    report = measure_import(args.module)
+    if not report["ok"]:
+        print(f"{args.module} import edilemedi: {report['error']}")
+        sys.exit(2)
+
+    entries = report["modules"]
+    print(f"{args.module} toplam import süresi: {report['total_seconds'] * 1000:.1f} ms ({len(entries)} modül)")
+
+    print(f"\n{'kümülatif ms':>13} {'kendi ms':>10}  modül")
+    for entry in sorted(entries, key=lambda item: item["cumulative"], reverse=True)[:args.top]:
+        print(f"{entry['cumulative'] * 1000:>13.1f} {entry['self'] * 1000:>10.1f}  {entry['module']}")
+
+    print(f"\n{'kendi ms':>13}  paket")
+    for package, seconds in list(summarize_packages(entries).items())[:args.top]:
+        print(f"{seconds * 1000:>13.1f}  {package}")
+
+    if report["heavy_modules"]:
+        print(f"\nUyarı: açılış yolunda ağır modüller var: {', '.join(report['heavy_modules'][:10])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Ölçümler kaydedildi: {args.json}")
+
+    if args.budget is not None and report["total_seconds"] > args.budget:
+        print(f"Import süresi sınırı aşıldı: {report['total_seconds']:.2f}s > {args.budget:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+# Uçtan uca benchmark paketi. Sentetik toplantılar üzerinde eşleştirme, duygu analizi, konu tespiti,
+# toplantı analizi ve (sahte modellerle) tam process_job yolunu çalıştırır; gecikme yüzdeliklerini ve
+# işlem hızını raporlar. Sonuçlar JSON taban çizgisi (baseline) olarak kaydedilip sonraki çalıştırmalarla
+# karşılaştırılabilir, böylece performans gerilemeleri üretime çıkmadan görülür.
+#
+# Kullanım: python -m model.benchmarks.pipeline_bench --save-baseline baseline.json
+#           python -m model.benchmarks.pipeline_bench --compare baseline.json --tolerance 0.25
+#           python -m model.benchmarks.pipeline_bench --quick --cases align sentiment
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+
+from .fixtures import make_meeting, write_wav
+
+CASES = ("align", "sentiment", "topic", "analyze", "process_job")
+# Ölçülen sentetik boyutlar: metin aşamaları için konuşma sırası sayısı, process_job için kayıt süresi (saniye)
+SIZES = {
+    "full": {"segments": (50, 500, 5000), "audio_seconds": (30, 120, 600)},
+    "quick": {"segments": (50, 500), "audio_seconds": (30,)}
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, point):
+    """Doğrusal ara değerlemeli yüzdelik (numpy'nin varsayılan yöntemiyle aynı)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * point / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(func, repeat=5, warmup=1, units=None, unit=None):
+    """
+    Fonksiyonu warmup + repeat kez çalıştırır (warmup ölçüme katılmaz).
+    Args:
+        units (float): Bir çalıştırmanın işlediği miktar (ör. segment veya kayıt saniyesi), işlem hızı için
+        unit (str): units'in birimi
+    Returns:
+        dict: Yüzdelikler, ortalama, min/max ve saniye başına işlenen miktar
+    """
+    timings = []
+    for iteration in range(warmup + repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        if iteration >= warmup:
+            timings.append(elapsed)
+
+    report = {f"p{point}": percentile(timings, point) for point in PERCENTILES}
+    report.update({
+        "runs": len(timings),
+        "mean": sum(timings) / len(timings),
+        "min": min(timings),
+        "max": max(timings)
+    })
+    if units:
+        report["unit"] = unit
+        report["throughput"] = units / report["p50"] if report["p50"] else None
+    return report
+
+
+def _text_cases(name, segment_count, repeat, warmup):
+    meeting = make_meeting(segment_count, seed=segment_count)
+    if name == "align":
+        from ..text.alignment import align_transcription_with_speakers
+        func = lambda: align_transcription_with_speakers(meeting["transcription"], meeting["chunks"], meeting["speakers"])
+    elif name == "sentiment":
+        from ..analysis.sentiment import analyze_sentiment
+        func = lambda: analyze_sentiment(meeting["aligned"])
+    elif name == "topic":
+        from ..analysis.topic import detect_meeting_topic
+        text = " ".join(segment["text"] for segment in meeting["aligned"])
+        func = lambda: detect_meeting_topic(text, meeting["aligned"], quality="fast")
+    else:
+        from ..analysis.meeting import analyze_meeting
+        func = lambda: analyze_meeting(meeting["aligned"], options={"quality": "fast"})
+    return measure(func, repeat, warmup, units=segment_count, unit="segments")
+
+
+def _process_job_case(audio_seconds, workdir, repeat, warmup):
+    from ..jobs.processor import process_job, results_cache
+
+    audio_path = write_wav(os.path.join(workdir, f"meeting_{audio_seconds}s.wav"), audio_seconds, seed=audio_seconds)
+    failures = []
+
+    def run():
+        job_id = f"bench-{uuid.uuid4().hex[:8]}"
+        process_job(audio_path, job_id, options={"quality": "fast"})
+        record = results_cache.get(job_id) or {}
+        if record.get("status") != "completed":
+            failures.append(record.get("error", "bilinmeyen hata"))
+
+    report = measure(run, repeat, warmup, units=audio_seconds, unit="audio_seconds")
+    if failures:
+        report["errors"] = failures[:3]
+    return report
+
+
+def run_benchmarks(cases=CASES, size="full", repeat=5, warmup=1, workdir=None):
+    """
+    Returns:
+        dict: "<aşama>/<boyut>" -> ölçüm raporu
+    """
+    results = {}
+    for name in cases:
+        if name == "process_job":
+            for audio_seconds in SIZES[size]["audio_seconds"]:
+                key = f"process_job/{audio_seconds}s"
+                # Tam yol uzun sürer, daha az tekrar yeterli
+                results[key] = _process_job_case(audio_seconds, workdir, max(1, repeat // 2), warmup)
+                print(_format_row(key, results[key]))
+        else:
+            for segment_count in SIZES[size]["segments"]:
+                key = f"{name}/{segment_count}"
+                results[key] = _text_cases(name, segment_count, repeat, warmup)
+                print(_format_row(key, results[key]))
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2, min_delta=0.005, metrics=("p50", "p95")):
+    """
+    Sonuçları taban çizgisiyle karşılaştırır. Bir metrik taban değerin (1 + tolerance) katını ve en az min_delta
+    saniye aşarsa gerileme sayılır (milisaniyenin altındaki ölçümlerdeki gürültü gerileme sayılmasın diye).
+    Returns:
+        list: Her ortak durum ve metrik için {"case", "metric", "baseline", "current", "ratio", "regression"}
+    """
+    comparisons = []
+    for key, report in results.items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+        for metric in metrics:
+            if not base.get(metric) or report.get(metric) is None:
+                continue
+            ratio = report[metric] / base[metric]
+            comparisons.append({
+                "case": key,
+                "metric": metric,
+                "baseline": base[metric],
+                "current": report[metric],
+                "ratio": ratio,
+                "regression": ratio > 1.0 + tolerance and report[metric] - base[metric] > min_delta
+            })
+    return comparisons
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def _format_row(key, report):
+    throughput = f"{report['throughput']:.1f} {report['unit']}/s" if report.get("throughput") else "-"
+    errors = f"  HATA: {report['errors'][0]}" if report.get("errors") else ""
+    return (f"{key:>22} {report['p50'] * 1000:>10.1f} {report['p95'] * 1000:>10.1f} {report['p99'] * 1000:>10.1f} "
+            f"{report['mean'] * 1000:>10.1f} {throughput:>24}{errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca benchmark (sahte modellerle)")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--quick", action="store_true", help="Yalnızca küçük boyutlar")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--whisper-rtf", type=float, default=0.0, help="Sahte Whisper'ın kayıt saniyesi başına süresi")
+    parser.add_argument("--diarization-rtf", type=float, default=0.0, help="Sahte pyannote'un kayıt saniyesi başına süresi")
+    parser.add_argument("--seconds-per-token", type=float, default=0.0, help="Sahte metin modellerinin token başına süresi")
+    parser.add_argument("--save-baseline", help="Sonuçların taban çizgisi olarak yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak taban çizgisi JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Gerileme sayılacak göreli yavaşlama (0.2 = %%20)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Gerileme sayılacak en küçük mutlak yavaşlama")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pipeline_bench_")
+    # Sonuç deposu, çözülmüş ses ve analiz çıktıları geçici dizine yazılır; modüller import edilmeden önce ayarlanmalı
+    os.environ.setdefault("RESULT_STORE_PATH", os.path.join(workdir, "results.db"))
+    os.environ.setdefault("AUDIO_CACHE_DIR", os.path.join(workdir, "audio"))
+    # Parçalı transkripsiyonun işlemleri sahte modelleri görmez
+    os.environ["TRANSCRIPTION_MODE"] = "pipeline"
+    os.chdir(workdir)
+
+    from .stubs import install_stub_models
+    with contextlib.redirect_stdout(io.StringIO()):
+        install_stub_models(args.whisper_rtf, args.diarization_rtf, args.seconds_per_token)
+
+    print(f"{'case':>22} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'mean ms':>10} {'throughput':>24}")
+    results = run_benchmarks(args.cases, "quick" if args.quick else "full", args.repeat, args.warmup, workdir)
+
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": _environment(),
+        "settings": {
+            "repeat": args.repeat, "warmup": args.warmup, "quick": args.quick, "whisper_rtf": args.whisper_rtf,
+            "diarization_rtf": args.diarization_rtf, "seconds_per_token": args.seconds_per_token
+        },
+        "results": results
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f"Taban çizgisi kaydedildi: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != document["environment"]:
+            print("Uyarı: taban çizgisi farklı bir ortamda ölçülmüş, karşılaştırma yanıltıcı olabilir")
+        comparisons = compare_to_baseline(results, baseline, args.tolerance, args.min_delta_ms / 1000.0)
+        print(f"\n{'case':>22} {'metric':>6} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+        for item in comparisons:
+            flag = "  GERİLEME" if item["regression"] else ""
+            print(f"{item['case']:>22} {item['metric']:>6} {item['baseline'] * 1000:>12.1f} "
+                  f"{item['current'] * 1000:>12.1f} {item['ratio']:>7.2f}{flag}")
+        regressions = [item for item in comparisons if item["regression"]]
+        if regressions:
+            print(f"{len(regressions)} gerileme bulundu (tolerans %{args.tolerance * 100:.0f})")
+            sys.exit(1)
+        print("Gerileme yok")
+
+
+if __name__ == '__main__':
+    main()
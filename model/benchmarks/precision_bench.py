@@ -0,0 +1,221 @@
+# Çıkarım hassasiyetlerini (float32, bfloat16, int8) sabit bir referans kayıt üzerinde karşılaştıran benchmark.
+# Her hassasiyet için yükleme süresi, bellek, transkripsiyon süresi, gerçek zaman oranı (RTF) ve kelime hata oranı
+# (WER) ölçülür; istenirse Pegasus özetleyicisi için süre ve float32 özetine benzerlik de raporlanır.
+#
+# Kullanım: python -m model.benchmarks.precision_bench --audio ref.wav --reference ref.txt
+#           python -m model.benchmarks.precision_bench --audio ref.wav --summary-text meeting.txt --json out.json
+
+import argparse
+import contextlib
+import io
+import json
+import re
+import time
+
+from ..runtime.precision import PRECISIONS
+from ..runtime.registry import model_registry
+
+
+def normalize_words(text):
+    """WER hesabı için metni küçük harfe çevirip noktalama işaretlerinden arındırır."""
+    return re.sub(r"[^\w\s']", " ", (text or "").lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Kelime düzeyinde Levenshtein mesafesi / referans kelime sayısı.
+    Returns:
+        float: WER (0 = birebir aynı); referans boşsa hipotez de boş değilse 1.0
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,                                # silme
+                current[j - 1] + 1,                             # ekleme
+                previous[j - 1] + (ref_word != hyp_word)        # değiştirme
+            )
+        previous = current
+    return previous[-1] / float(len(ref))
+
+
+def word_overlap_f1(reference, hypothesis):
+    """İki özet arasındaki kelime (unigram) örtüşmesi F1 skoru."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref or not hyp:
+        return 0.0
+    remaining = {}
+    for word in ref:
+        remaining[word] = remaining.get(word, 0) + 1
+    common = 0
+    for word in hyp:
+        if remaining.get(word, 0) > 0:
+            remaining[word] -= 1
+            common += 1
+    if common == 0:
+        return 0.0
+    precision = common / float(len(hyp))
+    recall = common / float(len(ref))
+    return 2 * precision * recall / (precision + recall)
+
+
+def _load_stats(registry_name):
+    # Modeli yükle (ölçüme dahil olmaması için ayrı) ve kayıt defterinin yükleme istatistiklerini döndür
+    with contextlib.redirect_stdout(io.StringIO()):
+        model_registry.acquire(registry_name)
+    model_registry.release(registry_name)
+    stats = model_registry.stats()[registry_name]
+    return {
+        "load_seconds": stats["load_seconds"],
+        "param_bytes": stats["param_bytes"],
+        "rss_delta_bytes": stats["rss_delta_bytes"]
+    }
+
+
+def benchmark_whisper(audio, precisions, reference_text=None, repeat=1):
+    """
+    Args:
+        audio (DecodedAudio): Referans kayıt
+        reference_text (str): Doğru transkript; verilmezse WER float32 çıktısına göre hesaplanır
+    Returns:
+        list: Hassasiyet başına ölçüm sözlükleri
+    """
+    from ..audio.transcription import transcribe_audio, whisper_registry_name
+
+    reports = []
+    for precision in precisions:
+        registry_name = whisper_registry_name(precision=precision)
+        report = {"model": "whisper", "precision": precision}
+        try:
+            report.update(_load_stats(registry_name))
+            report["applied_precision"] = model_registry.acquire(registry_name).get("precision")
+            model_registry.release(registry_name)
+
+            best = float('inf')
+            text, chunks = "", []
+            for _ in range(repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    text, chunks = transcribe_audio(audio, "precision-bench", precision=precision)
+                    best = min(best, time.perf_counter() - started)
+            if not chunks and text.startswith("Transkripsiyon hatası"):
+                raise RuntimeError(text)
+            report["seconds"] = best
+            report["rtf"] = best / audio.duration if audio.duration else None
+            report["text"] = text
+        except Exception as e:
+            report["error"] = str(e)
+        finally:
+            model_registry.unload(registry_name, force=True)
+        reports.append(report)
+
+    baseline = next((r.get("text") for r in reports if r["precision"] == "float32" and "text" in r), None)
+    reference = reference_text if reference_text is not None else baseline
+    for report in reports:
+        if "text" in report and reference is not None:
+            report["wer"] = word_error_rate(reference, report["text"])
+            report["wer_reference"] = "reference" if reference_text is not None else "float32"
+        if "seconds" in report:
+            float32 = next((r for r in reports if r["precision"] == "float32" and "seconds" in r), None)
+            report["speedup"] = float32["seconds"] / report["seconds"] if float32 and report["seconds"] else None
+    return reports
+
+
+def benchmark_summarizer(text, precisions, quality="balanced", repeat=1):
+    """Pegasus özetleyicisini her hassasiyette çalıştırır; benzerlik float32 özetine göre ölçülür."""
+    from ..analysis.topic import hierarchical_summary, summarizer_registry_name
+
+    reports = []
+    for precision in precisions:
+        registry_name = summarizer_registry_name(precision)
+        report = {"model": "summarizer", "precision": precision}
+        try:
+            report.update(_load_stats(registry_name))
+            best = float('inf')
+            with model_registry.use(registry_name) as summarizer:
+                report["applied_precision"] = summarizer.get("precision")
+                for _ in range(repeat):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        started = time.perf_counter()
+                        summary, _ = hierarchical_summary(summarizer, [text], quality=quality)
+                        best = min(best, time.perf_counter() - started)
+            report["seconds"] = best
+            report["text"] = summary
+        except Exception as e:
+            report["error"] = str(e)
+        finally:
+            model_registry.unload(registry_name, force=True)
+        reports.append(report)
+
+    float32 = next((r for r in reports if r["precision"] == "float32" and "text" in r), None)
+    for report in reports:
+        if float32 and "text" in report:
+            report["overlap_f1"] = word_overlap_f1(float32["text"], report["text"])
+            report["speedup"] = float32["seconds"] / report["seconds"] if report["seconds"] else None
+    return reports
+
+
+def _format_row(report):
+    def value(key, pattern):
+        return pattern.format(report[key]) if report.get(key) is not None else "-"
+    quality = value("wer", "{:.3f}") if report["model"] == "whisper" else value("overlap_f1", "{:.3f}")
+    megabytes = "{:.0f}".format(report["param_bytes"] / 1048576.0) if report.get("param_bytes") else "-"
+    return (f"{report['model']:>10} {report['precision']:>9} {report.get('applied_precision') or '-':>9} "
+            f"{value('load_seconds', '{:.1f}'):>7} {megabytes:>8} {value('seconds', '{:.2f}'):>8} "
+            f"{value('rtf', '{:.3f}'):>6} {value('speedup', '{:.2f}x'):>8} {quality:>8} {report.get('error', '')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çıkarım hassasiyeti benchmark'ı (hız ve doğruluk)")
+    parser.add_argument("--audio", help="Sabit referans ses kaydı")
+    parser.add_argument("--reference", help="Referans kaydın doğru transkripti (metin dosyası)")
+    parser.add_argument("--summary-text", help="Özetleyici için metin dosyası")
+    parser.add_argument("--quality", default="balanced", help="Özetleyici kalite seviyesi")
+    parser.add_argument("--precisions", nargs="+", default=list(PRECISIONS), choices=PRECISIONS)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    # float32 her zaman ilk ölçülür, diğerleri ona göre karşılaştırılır
+    precisions = ["float32"] + [p for p in args.precisions if p != "float32"]
+    reports = []
+
+    if args.audio:
+        from ..audio.decoding import decode_audio
+
+        reference_text = None
+        if args.reference:
+            with open(args.reference, encoding="utf-8") as f:
+                reference_text = f.read()
+        with contextlib.redirect_stdout(io.StringIO()):
+            audio = decode_audio(args.audio, "precision-bench")
+        try:
+            reports += benchmark_whisper(audio, precisions, reference_text, repeat=args.repeat)
+        finally:
+            audio.close()
+
+    if args.summary_text:
+        with open(args.summary_text, encoding="utf-8") as f:
+            reports += benchmark_summarizer(f.read(), precisions, quality=args.quality, repeat=args.repeat)
+
+    if not reports:
+        parser.error("--audio veya --summary-text gerekli")
+
+    print(f"{'model':>10} {'precision':>9} {'applied':>9} {'load(s)':>7} {'param MB':>8} {'time(s)':>8} "
+          f"{'rtf':>6} {'speedup':>8} {'wer/f1':>8}")
+    for report in reports:
+        print(_format_row(report))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# Benchmark'lar için hafif sahte (stub) modeller. Whisper, pyannote, Pegasus ve DistilBERT yerine kayıt
+# defterine kaydedilir; gerçek modellerle aynı arayüzü sağlar ve sentetik toplantı verisinden belirlenimci çıktı
+# üretir. İsteğe bağlı gecikme ile ağır aşamaların süresi taklit edilebilir, böylece ölçülen süre modelden
+# bağımsız olarak hattın (decode, VAD, eşleştirme, analiz, kaydetme) kendi maliyetini gösterir.
+
+import os
+import time
+
+import torch
+
+from ..runtime.registry import model_registry
+from .fixtures import VOCABULARY, POSITIVE_WORDS, NEGATIVE_WORDS, make_meeting, wav_duration
+
+PAD_ID, EOS_ID, UNK_ID = 0, 1, 2
+# Sahte Whisper/pyannote çıktısında konuşma sırası başına süre (saniye)
+SECONDS_PER_TURN = 4.0
+
+
+class _Config:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class StubTokenizer:
+    """Kelime düzeyinde, sabit sözlüklü tokenizer (HF tokenizer arayüzünün kullanılan kısmı)."""
+
+    model_max_length = 512
+
+    def __init__(self):
+        self.vocab = {word: index + 3 for index, word in enumerate(VOCABULARY)}
+        self.words = {index: word for word, index in self.vocab.items()}
+
+    def _encode(self, text):
+        return [self.vocab.get(word.strip(".,").lower(), UNK_ID) for word in text.split()]
+
+    def __call__(self, texts, add_special_tokens=True, return_tensors=None, truncation=False):
+        single = isinstance(texts, str)
+        encoded = [self._encode(text) for text in ([texts] if single else texts)]
+        if add_special_tokens:
+            encoded = [self.build_inputs_with_special_tokens(ids) for ids in encoded]
+        if truncation:
+            encoded = [ids[:self.model_max_length] for ids in encoded]
+        if return_tensors == "pt":
+            return self.pad({"input_ids": encoded}, return_tensors="pt")
+        return {"input_ids": encoded[0] if single else encoded}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 1
+
+    def build_inputs_with_special_tokens(self, ids):
+        return list(ids) + [EOS_ID]
+
+    def pad(self, encoded, return_tensors="pt"):
+        rows = encoded["input_ids"]
+        width = max((len(ids) for ids in rows), default=0)
+        input_ids = torch.full((len(rows), width), PAD_ID, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for row, ids in enumerate(rows):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    def decode(self, ids, skip_special_tokens=True):
+        ids = ids.tolist() if hasattr(ids, "tolist") else ids
+        return " ".join(self.words[i] for i in ids if i in self.words)
+
+    def batch_decode(self, rows, skip_special_tokens=True):
+        return [self.decode(ids, skip_special_tokens) for ids in rows]
+
+
+class _Output:
+    def __init__(self, logits):
+        self.logits = logits
+
+
+class StubSentimentModel:
+    """Olumlu/olumsuz sözcük sayısından logit üreten sınıflandırıcı."""
+
+    def __init__(self, tokenizer, seconds_per_token=0.0):
+        self.config = _Config(label2id={"NEGATIVE": 0, "POSITIVE": 1}, max_position_embeddings=512)
+        self.seconds_per_token = seconds_per_token
+        self._positive = torch.tensor([tokenizer.vocab[word] for word in POSITIVE_WORDS])
+        self._negative = torch.tensor([tokenizer.vocab[word] for word in NEGATIVE_WORDS])
+
+    def __call__(self, input_ids, attention_mask=None):
+        if self.seconds_per_token:
+            time.sleep(self.seconds_per_token * input_ids.numel())
+        positive = torch.isin(input_ids, self._positive).sum(dim=1).float()
+        negative = torch.isin(input_ids, self._negative).sum(dim=1).float()
+        return _Output(torch.stack([negative, positive], dim=1))
+
+
+class StubSummarizerModel:
+    """Girdinin ilk max_length tokenini "özet" olarak döndüren seq2seq modeli."""
+
+    device = "cpu"
+
+    def __init__(self, seconds_per_token=0.0):
+        self.config = _Config(max_position_embeddings=1024)
+        self.seconds_per_token = seconds_per_token
+
+    def generate(self, input_ids, attention_mask=None, max_length=64, **generation_kwargs):
+        if self.seconds_per_token:
+            time.sleep(self.seconds_per_token * input_ids.shape[0] * max_length)
+        return input_ids[:, :max_length]
+
+
+def _input_duration(pipeline_input):
+    # Çözülmüş ses sözlüğü, pyannote tensörü veya (çözme başarısızsa) dosya yolu
+    if isinstance(pipeline_input, dict):
+        if "raw" in pipeline_input:
+            return len(pipeline_input["raw"]) / float(pipeline_input["sampling_rate"])
+        return pipeline_input["waveform"].shape[-1] / float(pipeline_input["sample_rate"])
+    if isinstance(pipeline_input, str) and pipeline_input.lower().endswith(".wav") and os.path.exists(pipeline_input):
+        return wav_duration(pipeline_input)
+    return 60.0
+
+
+def _meeting_for(duration):
+    # Aynı süre için Whisper ve pyannote aynı toplantıyı "duyar"
+    return make_meeting(max(1, int(duration / SECONDS_PER_TURN)), duration=duration, seed=int(duration * 1000))
+
+
+def _load_stub_whisper(rtf=0.0):
+    def transcribe(pipeline_input, return_timestamps=True, generate_kwargs=None):
+        duration = _input_duration(pipeline_input)
+        if rtf:
+            time.sleep(duration * rtf)
+        meeting = _meeting_for(duration)
+        return {"text": meeting["transcription"], "chunks": meeting["chunks"]}
+    return {"pipeline": transcribe, "model": None, "processor": None, "device": "cpu",
+            "model_id": "stub", "precision": "float32", "assistant": None}
+
+
+class _Turn:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class _Annotation:
+    def __init__(self, segments):
+        self.segments = segments
+
+    def itertracks(self, yield_label=True):
+        for segment in self.segments:
+            yield _Turn(segment["start"], segment["end"]), None, segment["speaker"]
+
+
+def _load_stub_diarization(rtf=0.0):
+    def diarize(pipeline_input):
+        duration = _input_duration(pipeline_input)
+        if rtf:
+            time.sleep(duration * rtf)
+        return _Annotation(_meeting_for(duration)["speakers"])
+    return {"pipeline": diarize, "use_gpu": False}
+
+
+def install_stub_models(whisper_rtf=0.0, diarization_rtf=0.0, seconds_per_token=0.0):
+    """
+    Tüm model kayıtlarını sahte yükleyicilerle değiştirir. Gerçek modeller yüklenmişse bellekten çıkarılır.
+    Args:
+        whisper_rtf / diarization_rtf (float): Kayıt saniyesi başına taklit edilen işlem süresi
+        seconds_per_token (float): Özetleme ve duygu analizinde token başına taklit edilen süre
+    """
+    from ..audio.transcription import WHISPER_MODELS, whisper_registry_name
+    from ..audio.diarization import DIARIZATION_REGISTRY_NAME
+    from ..analysis.topic import SUMMARIZER_REGISTRY_NAME
+    from ..analysis.sentiment import SENTIMENT_REGISTRY_NAME
+
+    tokenizer = StubTokenizer()
+    loaders = {
+        DIARIZATION_REGISTRY_NAME: lambda: _load_stub_diarization(diarization_rtf),
+        SUMMARIZER_REGISTRY_NAME: lambda: {"tokenizer": tokenizer, "model": StubSummarizerModel(seconds_per_token),
+                                           "precision": "float32"},
+        SENTIMENT_REGISTRY_NAME: lambda: {"tokenizer": tokenizer, "model": StubSentimentModel(tokenizer, seconds_per_token),
+                                          "device": "cpu"},
+    }
+    for model_id in WHISPER_MODELS:
+        loaders[whisper_registry_name(model_id)] = lambda: _load_stub_whisper(whisper_rtf)
+
+    for name, loader in loaders.items():
+        model_registry.register(name, loader)
+        model_registry.unload(name, force=True)
+    return sorted(loaders)
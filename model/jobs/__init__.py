@@ -1 +1,2 @@
-from .processor import process_job, results_cache 
\ No newline at end of file
+from .processor import process_job, reanalyze_job, results_cache 
+from .scheduler import job_scheduler, QueueFullError
@@ -0,0 +1,149 @@
+# Aşama kontrol noktaları (checkpoint). Pahalı aşamaların (transkripsiyon, konuşmacı ayrıştırma, eşleştirme,
+# analiz) çıktıları iş kimliği ve girdi özeti ile SQLite'a yazılır; hata veren iş yeniden başlatıldığında
+# tamamlanmış aşamalar tekrar çalıştırılmaz, yalnızca hatalı aşama ve ona bağlı aşamalar çalışır.
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoints_enabled():
+    return os.getenv("CHECKPOINTS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+class CheckpointStore:
+    """
+    İş başına aşama çıktıları ve işin girdileri (yeniden başlatma için ses/metin dosyası yolu ve ayarlar).
+    Kontrol noktaları girdi özetiyle (input_hash) saklanır; özet değişmişse eski çıktılar kullanılmaz.
+    Args:
+        db_path (str): SQLite veritabanı dosyası
+        ttl_seconds (float): Bu süreden eski kontrol noktaları silinir
+    """
+
+    def __init__(self, db_path, ttl_seconds=48 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        # Çağıran self._lock'u tutuyor olmalı; bağlantı ilk kullanımda açılır
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint_jobs ("
+                "job_id TEXT PRIMARY KEY, input_hash TEXT NOT NULL, audio_path TEXT, text_file_path TEXT, "
+                "options TEXT, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "job_id TEXT NOT NULL, stage TEXT NOT NULL, input_hash TEXT NOT NULL, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (job_id, stage))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoint_jobs_created_at ON checkpoint_jobs (created_at)")
+            self._conn.commit()
+        return self._conn
+
+    def register_job(self, job_id, input_hash, audio_path, text_file_path=None, options=None):
+        """İşin girdilerini kaydeder; girdi özeti değiştiyse işin eski kontrol noktaları silinir."""
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM checkpoints WHERE job_id = ? AND input_hash != ?", (job_id, input_hash))
+                db.execute(
+                    "INSERT OR REPLACE INTO checkpoint_jobs (job_id, input_hash, audio_path, text_file_path, options, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, input_hash, audio_path, text_file_path, json.dumps(options or {}), now)
+                )
+                # Süresi dolan işlerin kontrol noktalarını temizle
+                if self.ttl_seconds is not None:
+                    cutoff = now - self.ttl_seconds
+                    db.execute("DELETE FROM checkpoints WHERE created_at < ?", (cutoff,))
+                    db.execute("DELETE FROM checkpoint_jobs WHERE created_at < ?", (cutoff,))
+                db.commit()
+            except Exception as e:
+                logger.error(f"[{job_id}] İş girdileri kaydedilemedi: {str(e)}")
+
+    def job_inputs(self, job_id):
+        """Yeniden başlatma için işin girdilerini döndürür, kayıt yoksa None."""
+        with self._lock:
+            try:
+                row = self._db().execute(
+                    "SELECT input_hash, audio_path, text_file_path, options FROM checkpoint_jobs WHERE job_id = ?",
+                    (job_id,)
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"[{job_id}] İş girdileri okunamadı: {str(e)}")
+                row = None
+        if row is None:
+            return None
+        return {
+            "input_hash": row[0],
+            "audio_path": row[1],
+            "text_file_path": row[2],
+            "options": json.loads(row[3]) if row[3] else {}
+        }
+
+    def save(self, job_id, stage, input_hash, payload):
+        data = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO checkpoints (job_id, stage, input_hash, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, stage, input_hash, data, time.time())
+                )
+                db.commit()
+            except Exception as e:
+                # Kontrol noktası yazılamazsa iş devam eder, yalnızca yeniden başlatmada aşama tekrar çalışır
+                logger.error(f"[{job_id}] '{stage}' kontrol noktası yazılamadı: {str(e)}")
+
+    def load(self, job_id, input_hash):
+        """
+        Returns:
+            dict: Aşama adı -> kaydedilmiş çıktı (yalnızca girdi özeti eşleşenler)
+        """
+        with self._lock:
+            try:
+                rows = self._db().execute(
+                    "SELECT stage, payload FROM checkpoints WHERE job_id = ? AND input_hash = ?", (job_id, input_hash)
+                ).fetchall()
+            except Exception as e:
+                logger.error(f"[{job_id}] Kontrol noktaları okunamadı: {str(e)}")
+                rows = []
+        return {stage: json.loads(payload) for stage, payload in rows}
+
+    def stages(self, job_id):
+        with self._lock:
+            try:
+                rows = self._db().execute("SELECT stage FROM checkpoints WHERE job_id = ?", (job_id,)).fetchall()
+            except Exception as e:
+                logger.error(f"[{job_id}] Kontrol noktaları okunamadı: {str(e)}")
+                rows = []
+        return sorted(row[0] for row in rows)
+
+    def clear(self, job_id):
+        """İş başarıyla tamamlandığında kontrol noktalarını ve girdileri siler."""
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+                db.execute("DELETE FROM checkpoint_jobs WHERE job_id = ?", (job_id,))
+                db.commit()
+            except Exception as e:
+                logger.error(f"[{job_id}] Kontrol noktaları silinemedi: {str(e)}")
+
+
+checkpoint_store = CheckpointStore(
+    os.getenv("CHECKPOINT_STORE_PATH", "meeting_checkpoints.db"),
+    ttl_seconds=float(os.getenv("CHECKPOINT_TTL_HOURS", "48")) * 3600
+)
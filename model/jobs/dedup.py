@@ -0,0 +1,100 @@
+# Aynı içerikli yüklemelerin tekrar işlenmesini önler. Ses dosyası, isteğe bağlı metin dosyası ve model
+# sürümlerinden bir içerik anahtarı üretir ve bu anahtarı işleyen/işlemiş iş ile eşleştirir.
+
+import hashlib
+import json
+import logging
+import threading
+
+from ..audio.transcription import WHISPER_MODEL_ID, WHISPER_MODELS
+from ..audio.diarization import DIARIZATION_MODEL_ID
+from ..analysis.topic import SUMMARIZER_MODEL_ID
+from ..analysis.sentiment import SENTIMENT_MODEL_ID
+from ..runtime.precision import model_precision
+from ..serving.ipc import shared_object
+
+logger = logging.getLogger(__name__)
+
+# İşleme mantığı sonuçları etkileyecek şekilde değiştiğinde artırılmalı, eski önbellek kayıtları geçersiz olur
+PIPELINE_VERSION = 2
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_versions():
+    return {
+        "pipeline": PIPELINE_VERSION,
+        "whisper": WHISPER_MODEL_ID,
+        "whisper_candidates": WHISPER_MODELS,
+        "diarization": DIARIZATION_MODEL_ID,
+        "summarizer": SUMMARIZER_MODEL_ID,
+        "sentiment": SENTIMENT_MODEL_ID,
+        # Düşük hassasiyet sonuçları değiştirebilir
+        "whisper_precision": model_precision("whisper"),
+        "summarizer_precision": model_precision("summarizer")
+    }
+
+
+def content_key(audio_path, text_file_path=None, options=None):
+    """
+    Ses dosyası özeti, metin dosyası özeti, model sürümleri ve sonucu etkileyen iş ayarlarından
+    (ör. kalite seviyesi) içerik anahtarı üretir.
+    """
+    key_data = {
+        "audio": file_sha256(audio_path),
+        "text": file_sha256(text_file_path) if text_file_path else None,
+        "models": model_versions(),
+        "options": options or {}
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def reanalysis_key(source_job_id, text_file_path=None, options=None):
+    """Tamamlanmış bir işin transkriptinin yeni metin dosyası ve ayarlarla yeniden analizi için içerik anahtarı."""
+    key_data = {
+        "source_job": source_job_id,
+        "text": file_sha256(text_file_path) if text_file_path else None,
+        "models": model_versions(),
+        "options": options or {}
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ContentIndex:
+    """
+    İçerik anahtarı -> iş kimliği eşlemesi. Yalnızca kuyruktaki ve çalışan işleri kapsar; iş bitince anahtar
+    bırakılır. Tamamlanan işler ResultStore.find_by_content_key ile bulunur, böylece dizin süren iş sayısıyla
+    sınırlı kalır ve deponun sildiği (süresi dolan ya da sınırı aşan) sonuçları göstermez.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def claim(self, key, job_id):
+        """Anahtar boştaysa iş kimliğini kaydeder ve None döndürür, doluysa mevcut iş kimliğini döndürür."""
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None:
+                return existing
+            self._jobs[key] = job_id
+            return None
+
+    def forget(self, key, job_id=None):
+        with self._lock:
+            if job_id is None or self._jobs.get(key) == job_id:
+                self._jobs.pop(key, None)
+
+
+# Çok süreçli modda dizin başlatıcı süreçtedir, aynı içerik farklı HTTP işçilerine gelse de bir kez işlenir
+content_index = shared_object("content_index", ContentIndex)
@@ -5,20 +5,72 @@ import os
 import logging
 import time
 import traceback
-from threading import Thread
+from threading import Thread, Semaphore
 
 # Modülleri import et
-from ..audio.transcription import transcribe_audio
+from ..audio.transcription import transcribe_audio, route_whisper_model
 from ..audio.diarization import diarize_audio
-from ..text.alignment import align_transcription_with_speakers
+from ..audio.decoding import decode_audio, DecodedAudio
+from ..audio.vad import apply_vad, vad_enabled, SpeechMap
+from ..text.alignment import select_alignment_function
 from ..analysis.meeting import analyze_meeting
+from ..runtime.metrics import stage_timer, job_results
+from ..serving.ipc import shared_object
+from .stages import Stage, run_stages
+from .dedup import content_index, content_key as compute_content_key
+from .checkpoints import checkpoint_store, checkpoints_enabled
+from .store import ResultStore
+from .progress import JobProgress, progress_broker
 
 logger = logging.getLogger(__name__)
 
 # Global değişkenler
-results_cache = {}  # Tamamlanan işleri önbelleğe almak için
+# İş durumları ve sonuçları: çalışan işler bellekte, tamamlananlar sınırlı LRU önbellekte ve SQLite'ta tutulur.
+# Çok süreçli modda depo başlatıcı süreçtedir, işçiler vekil üzerinden erişir.
+results_cache = shared_object("results", lambda: ResultStore(
+    os.getenv("RESULT_STORE_PATH", "meeting_results.db"),
+    max_memory_items=int(os.getenv("RESULT_CACHE_SIZE", "32")),
+    max_memory_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024,
+    ttl_seconds=float(os.getenv("RESULT_TTL_HOURS", "168")) * 3600,
+    max_disk_items=int(os.getenv("RESULT_STORE_MAX_JOBS", "1000"))
+))
 
-def process_job(audio_path, job_id, text_file_path=None):
+# Kontrol noktası olarak saklanan aşamalar. Çözülmüş ses geçici bir dosya olduğu için saklanmaz, VAD için
+# yalnızca konuşma bölgesi eşlemesi saklanır.
+CHECKPOINT_STAGES = ("vad", "transcription", "diarization", "alignment", "analysis")
+
+def _checkpoint_payload(stage, result, routing):
+    if stage == "vad":
+        speech_map = result[1]
+        return speech_map.state() if speech_map is not None else None
+    if stage == "transcription":
+        transcription, chunks = result
+        return {"transcription": transcription, "chunks": chunks, "whisper": routing.get("whisper")}
+    return result
+
+def _reusable_stages(checkpoints):
+    # Bir aşama, ancak bağlı olduğu aşamalar da kontrol noktasından geliyorsa yeniden kullanılır;
+    # yeniden çalışan bir aşamadan sonraki tüm aşamalar da yeniden çalışır
+    reusable = {stage for stage in ("transcription", "diarization") if stage in checkpoints}
+    if "alignment" in checkpoints and {"transcription", "diarization"} <= reusable:
+        reusable.add("alignment")
+    if "analysis" in checkpoints and "alignment" in reusable:
+        reusable.add("analysis")
+    return reusable
+
+def _input_hash(audio_path, text_file_path, options, content_key=None):
+    # Kontrol noktaları işin girdilerine bağlıdır; içerik anahtarı verilmemişse burada hesaplanır
+    if content_key:
+        return content_key
+    try:
+        return compute_content_key(audio_path, text_file_path, {k: v for k, v in options.items() if k != "priority"})
+    except Exception as e:
+        logger.warning(f"Girdi özeti hesaplanamadı, kontrol noktaları kullanılmayacak: {str(e)}")
+        return None
+
+def process_job(audio_path, job_id, text_file_path=None, content_key=None, options=None):
+    # options: isteğe bağlı iş ayarları, ör. {"quality": "fast"}
+    options = options or {}
     try:
         print(f"[{job_id}] İşlem başlatılıyor: {audio_path}")
         logger.info(f"[{job_id}] İşlem başlatılıyor: {audio_path}")
@@ -27,39 +79,206 @@ def process_job(audio_path, job_id, text_file_path=None):
             print(f"[{job_id}] Metin dosyası kullanılacak: {text_file_path}")
             logger.info(f"[{job_id}] Metin dosyası kullanılacak: {text_file_path}")
         
-        # İşlem başladığını results_cache'e kaydet
-        results_cache[job_id] = {"status": "processing"}
+        # İşlem başladığını results_cache'e kaydet, aşama ilerlemesi her değişiklikte güncellenir
+        queued_record = results_cache.get(job_id) or {}
+        progress = JobProgress(job_id, results_cache, queued_at=queued_record.get("queued_at"))
+        progress.publish()
         print(f"[{job_id}] Durum 'processing' olarak ayarlandı")
         
+        # Önceki (hatalı) çalıştırmadan kalan aşama çıktıları: /api/resume ile yeniden başlatılan iş bunları kullanır
+        input_hash = _input_hash(audio_path, text_file_path, options, content_key) if checkpoints_enabled() else None
+        checkpoints = {}
+        if input_hash:
+            checkpoint_store.register_job(job_id, input_hash, audio_path, text_file_path, options)
+            checkpoints = checkpoint_store.load(job_id, input_hash)
+        reused = _reusable_stages(checkpoints)
+        if reused:
+            print(f"[{job_id}] Kontrol noktasından yüklenecek aşamalar: {sorted(reused)}")
+        
         try:
-            # 1. Transkripsiyon
-            print(f"[{job_id}] Transkripsiyon başlatılıyor...")
-            transcription, chunks = transcribe_audio(audio_path, job_id)
-            print(f"[{job_id}] Transkripsiyon tamamlandı. Metin uzunluğu: {len(transcription)}, Segment sayısı: {len(chunks) if chunks else 0}")
+            # 0. Ses dosyasını bir kez 16 kHz mono float32 olarak çöz, tüm aşamalar aynı tamponu kullanır
+            def run_decode(results):
+                try:
+                    decoded = decode_audio(audio_path, job_id)
+                    job_audio["seconds"] = decoded.duration
+                    return decoded
+                except Exception as e:
+                    # Çözme başarısız olursa modeller dosyayı eskisi gibi kendileri okur
+                    print(f"[{job_id}] Ses önceden çözülemedi, dosya yolu kullanılacak: {str(e)}")
+                    logger.warning(f"[{job_id}] Ses çözme hatası: {str(e)}")
+                    return audio_path
+            
+            # Sessiz bölgeleri atla: modeller yalnızca konuşma bölgelerini işler, zamanlar sonra özgün kayda çevrilir
+            def run_vad(results):
+                decoded = results["decode"]
+                if not isinstance(decoded, DecodedAudio) or not vad_enabled():
+                    return decoded, None
+                try:
+                    return apply_vad(decoded, job_id)
+                except Exception as e:
+                    print(f"[{job_id}] VAD uygulanamadı, kaydın tamamı işlenecek: {str(e)}")
+                    logger.warning(f"[{job_id}] VAD hatası: {str(e)}")
+                    return decoded, None
+            
+            # 1-2. Transkripsiyon ve konuşmacı ayrıştırma birbirinden bağımsızdır, paralel çalıştırılır
+            def run_transcription(results):
+                print(f"[{job_id}] Transkripsiyon başlatılıyor...")
+                audio, speech_map = results["vad"]
+                # Kayıt süresi, kuyruk yoğunluğu, öncelik ve istekteki ipucuna göre Whisper boyutunu seç
+                from .scheduler import job_scheduler
+                whisper_model, reason = route_whisper_model(
+                    duration=audio.duration if isinstance(audio, DecodedAudio) else None,
+                    queue_depth=job_scheduler.depth(),
+                    hint=options.get("whisper_model"),
+                    priority=options.get("priority", "normal")
+                )
+                routing["whisper"] = {"model": whisper_model, "reason": reason}
+                print(f"[{job_id}] Whisper modeli seçildi: {whisper_model} ({reason})")
+                transcription, chunks = transcribe_audio(
+                    audio, job_id,
+                    progress_callback=lambda fraction: progress.stage_progress("transcription", fraction),
+                    model_id=whisper_model,
+                    stats=routing["whisper"],
+                    # Hata metni transkript gibi kaydedilmesin: aşama hata verir, diğer aşamaların kontrol noktaları kalır
+                    raise_errors=True
+                )
+                assisted = routing["whisper"].get("assisted_decoding")
+                if assisted:
+                    print(f"[{job_id}] Yardımlı çözümleme kabul oranı: {assisted['acceptance_rate']}")
+                if speech_map is not None and chunks:
+                    chunks = speech_map.remap_chunks(chunks)
+                print(f"[{job_id}] Transkripsiyon tamamlandı. Metin uzunluğu: {len(transcription)}, Segment sayısı: {len(chunks) if chunks else 0}")
+                return transcription, chunks
             
-            # 2. Konuşmacı ayrıştırma
-            print(f"[{job_id}] Konuşmacı ayrıştırma başlatılıyor...")
-            speakers = diarize_audio(audio_path, job_id)
-            print(f"[{job_id}] Konuşmacı ayrıştırma tamamlandı. Segment sayısı: {len(speakers)}")
+            def run_diarization(results):
+                print(f"[{job_id}] Konuşmacı ayrıştırma başlatılıyor...")
+                audio, speech_map = results["vad"]
+                speakers = diarize_audio(audio, job_id)
+                if speech_map is not None:
+                    speakers = speech_map.remap_segments(speakers)
+                print(f"[{job_id}] Konuşmacı ayrıştırma tamamlandı. Segment sayısı: {len(speakers)}")
+                return speakers
             
-            # 3. Transkripsiyon ve konuşmacı bilgisini birleştir
-            print(f"[{job_id}] Transkripsiyon ve konuşmacı eşleştirme başlatılıyor...")
-            aligned_transcript = align_transcription_with_speakers(transcription, chunks, speakers)
-            print(f"[{job_id}] Eşleştirme tamamlandı. Eşleştirilmiş segment sayısı: {len(aligned_transcript) if isinstance(aligned_transcript, list) else 'Hata'}")
+            # 3. Transkripsiyon ve konuşmacı bilgisini birleştir (her iki aşamayı da bekler)
+            def run_alignment(results):
+                transcription, chunks = results["transcription"]
+                print(f"[{job_id}] Transkripsiyon ve konuşmacı eşleştirme başlatılıyor...")
+                # ALIGNMENT_MODE=auto: uzun transkriptlerde vektörel, diğerlerinde indeksli eşleştirme
+                align = select_alignment_function(os.getenv("ALIGNMENT_MODE", "auto"), len(chunks) if chunks else 0)
+                aligned_transcript = align(transcription, chunks, results["diarization"], speech_map=results["vad"][1])
+                print(f"[{job_id}] Eşleştirme tamamlandı. Eşleştirilmiş segment sayısı: {len(aligned_transcript) if isinstance(aligned_transcript, list) else 'Hata'}")
+                return aligned_transcript
             
             # 4. Toplantı analizi
-            print(f"[{job_id}] Toplantı analizi başlatılıyor...")
-            analysis = analyze_meeting(aligned_transcript, text_file_path)
-            print(f"[{job_id}] Toplantı analizi tamamlandı")
+            def run_analysis(results):
+                print(f"[{job_id}] Toplantı analizi başlatılıyor...")
+                analysis = analyze_meeting(
+                    results["alignment"], text_file_path,
+                    progress_callback=lambda fraction: progress.stage_progress("analysis", fraction),
+                    options=options,
+                    speech_map=stage_results["vad"][1],
+                    audio_seconds=job_audio.get("seconds"),
+                    stage_metrics=stage_metrics,
+                    raise_errors=True
+                )
+                print(f"[{job_id}] Toplantı analizi tamamlandı")
+                return analysis
             
-            # Sonuçları önbelleğe al
-            results_cache[job_id] = {
-                "status": "completed",
+            # Her aşamanın süre, CPU, tepe bellek ve RTF ölçümü (/api/metrics histogramlarına da eklenir)
+            def timed(name, func):
+                def run(results):
+                    with stage_timer(name, job_audio.get("seconds"), report=stage_metrics) as timer:
+                        result = func(results)
+                        # Çözme aşamasında kayıt süresi aşama bittikten sonra belli olur
+                        timer.audio_seconds = job_audio.get("seconds")
+                        return result
+                return run
+            
+            def restored(name):
+                payload = checkpoints[name]
+                def run(results):
+                    print(f"[{job_id}] '{name}' aşaması kontrol noktasından yüklendi")
+                    if name == "transcription":
+                        if payload.get("whisper"):
+                            routing["whisper"] = payload["whisper"]
+                        return payload["transcription"], payload["chunks"]
+                    return payload
+                return run
+            
+            def restored_vad(results):
+                # Transkripsiyon ve konuşmacı ayrıştırma kontrol noktasından geliyorsa ses çözülmez
+                state = checkpoints.get("vad")
+                return None, SpeechMap.from_state(state) if state else None
+            
+            def on_stage_end(stage, elapsed):
+                progress.stage_finished(stage, elapsed)
+                if input_hash and stage in CHECKPOINT_STAGES and stage not in reused:
+                    payload = _checkpoint_payload(stage, stage_results[stage], routing)
+                    if payload is not None:
+                        checkpoint_store.save(job_id, stage, input_hash, payload)
+                # Çözülmüş ses dosyasına ihtiyaç kalmadığında hemen serbest bırak
+                if stage == "alignment":
+                    release_decoded_audio()
+            
+            def release_decoded_audio():
+                decoded = stage_results.get("decode")
+                if isinstance(decoded, DecodedAudio):
+                    decoded.close()
+                # VAD'in ürettiği yalnızca-konuşma dosyası
+                compact = stage_results.get("vad", (None, None))[0]
+                if isinstance(compact, DecodedAudio) and compact is not decoded:
+                    compact.close()
+            
+            stage_results = {}
+            stage_metrics = {}
+            routing = {}
+            job_audio = {}
+            stages = [
+                Stage("decode", timed("decode", run_decode)),
+                Stage("vad", timed("vad", run_vad), depends_on=("decode",)),
+                Stage("transcription", timed("transcription", run_transcription), depends_on=("vad",)),
+                Stage("diarization", timed("diarization", run_diarization), depends_on=("vad",)),
+                Stage("alignment", timed("alignment", run_alignment), depends_on=("transcription", "diarization")),
+                Stage("analysis", timed("analysis", run_analysis), depends_on=("alignment",)),
+            ]
+            for stage in stages:
+                if stage.name in reused:
+                    stage.func = restored(stage.name)
+            if {"transcription", "diarization"} <= reused:
+                stages = [Stage("vad", restored_vad)] + [stage for stage in stages if stage.name not in ("decode", "vad")]
+            try:
+                run_stages(stages, job_id, results=stage_results,
+                   on_stage_start=progress.stage_started, on_stage_end=on_stage_end)
+            finally:
+                release_decoded_audio()
+            
+            transcription, chunks = stage_results["transcription"]
+            progress.finish()
+            
+            # Sonuçları depoya kaydet; içerik anahtarı aynı yüklemenin tekrarında bu sonucu bulmak için saklanır.
+            # Buraya yalnızca tüm aşamaları gerçek çıktı üreten işler gelir (yedek sonuç döndüren aşamalar hata verir),
+            # hatalı çalıştırma içerik anahtarıyla önbelleğe girmez
+            completed_record = progress.snapshot(status="completed")
+            speech_map = stage_results["vad"][1]
+            completed_record.update({
+                "options": options,
+                "speech_regions": speech_map.to_dict() if speech_map is not None else None,
+                "models": routing,
+                "metrics": stage_metrics,
                 "transcription": transcription,
-                "aligned_transcript": aligned_transcript,
-                "speakers": speakers,
-                "analysis": analysis
-            }
+                "aligned_transcript": stage_results["alignment"],
+                "speakers": stage_results["diarization"],
+                "analysis": stage_results["analysis"]
+            })
+            results_cache.put(job_id, completed_record, content_key=content_key)
+            # Tamamlanan iş bundan sonra depodan (find_by_content_key) bulunur; dizin yalnızca süren işleri tutar,
+            # böylece depo sonucu silse de dizinde eskimiş kayıt kalmaz
+            if content_key:
+                content_index.forget(content_key, job_id)
+            progress.publish_final(completed_record)
+            job_results.inc(status="completed")
+            if input_hash:
+                checkpoint_store.clear(job_id)
             
             print(f"[{job_id}] Sonuçlar cache'e kaydedildi, durum 'completed' olarak ayarlandı")
             logger.info(f"[{job_id}] İşlem tamamlandı")
@@ -71,12 +290,21 @@ def process_job(audio_path, job_id, text_file_path=None):
             logger.error(f"[{job_id}] İşlem hatası: {str(e)}")
             logger.error(f"[{job_id}] Hata detayları:\n{error_traceback}")
             
-            # Hata durumunu cache'e kaydet
-            results_cache[job_id] = {
-                "status": "error",
+            # Hata durumunu cache'e kaydet (hangi aşamada kaldığı bilgisiyle)
+            progress.finish()
+            error_record = progress.snapshot(status="error")
+            error_record.update({
                 "error": str(e),
-                "traceback": error_traceback
-            }
+                "traceback": error_traceback,
+                # /api/resume/<job_id> tamamlanan aşamaları tekrar çalıştırmaz
+                "checkpoints": checkpoint_store.stages(job_id) if input_hash else []
+            })
+            results_cache[job_id] = error_record
+            progress.publish_final(error_record)
+            job_results.inc(status="error")
+            # Aynı içerik tekrar gönderilirse yeniden işlenebilsin
+            if content_key:
+                content_index.forget(content_key, job_id)
             print(f"[{job_id}] Hata durumu cache'e kaydedildi")
         
     except Exception as e:
@@ -93,6 +321,83 @@ def process_job(audio_path, job_id, text_file_path=None):
                 "error": f"Kritik hata: {str(e)}",
                 "traceback": error_traceback
             }
+            if content_key:
+                content_index.forget(content_key, job_id)
+            progress_broker.publish(job_id, {"event": "error", "status": "error", "error": f"Kritik hata: {str(e)}"})
             print(f"[{job_id}] Kritik hata durumu cache'e kaydedildi")
         except:
-            print(f"[{job_id}] Cache'e yazma sırasında bile hata oluştu!") 
\ No newline at end of file
+            print(f"[{job_id}] Cache'e yazma sırasında bile hata oluştu!") 
+
+# Yeniden analiz işleri kuyruğu beklemez (ses işlenmediği için kısa sürer), aynı anda çalışan sayısı sınırlıdır
+_reanalysis_slots = Semaphore(max(1, int(os.getenv("MAX_CONCURRENT_REANALYSES", "2"))))
+
+def reanalyze_job(source_job_id, job_id, text_file_path=None, content_key=None, options=None):
+    """
+    Tamamlanmış bir işin eşleştirilmiş transkriptini yeni ek metin dosyası ve ayarlarla yeniden analiz eder.
+    Ses çözme, transkripsiyon, konuşmacı ayrıştırma ve eşleştirme çalışmaz; sonuç yeni iş kimliğiyle saklanır.
+    """
+    options = options or {}
+    with _reanalysis_slots:
+        queued_record = results_cache.get(job_id) or {}
+        progress = JobProgress(job_id, results_cache, queued_at=queued_record.get("queued_at"), stages=("analysis",))
+        progress.publish()
+        print(f"[{job_id}] Yeniden analiz başlatılıyor, kaynak iş: {source_job_id}")
+        try:
+            source = results_cache.get(source_job_id)
+            if not source or source.get("status") != "completed":
+                raise ValueError(f"Kaynak iş tamamlanmamış veya bulunamadı: {source_job_id}")
+            aligned_transcript = source["aligned_transcript"]
+            
+            stage_metrics = {}
+            progress.stage_started("analysis")
+            started = time.perf_counter()
+            with stage_timer("analysis", report=stage_metrics):
+                analysis = analyze_meeting(
+                    aligned_transcript, text_file_path,
+                    progress_callback=lambda fraction: progress.stage_progress("analysis", fraction),
+                    options=options,
+                    stage_metrics=stage_metrics,
+                    raise_errors=True
+                )
+            progress.stage_finished("analysis", time.perf_counter() - started)
+            # Sessizlik bilgisi ses kaydına bağlıdır, metin dosyasından etkilenmez
+            if source.get("analysis", {}).get("silence") is not None:
+                analysis["silence"] = source["analysis"]["silence"]
+            progress.finish()
+            
+            completed_record = progress.snapshot(status="completed")
+            completed_record.update({
+                "source_job_id": source_job_id,
+                "options": options,
+                "speech_regions": source.get("speech_regions"),
+                "models": source.get("models"),
+                "metrics": stage_metrics,
+                "transcription": source.get("transcription"),
+                "aligned_transcript": aligned_transcript,
+                "speakers": source.get("speakers"),
+                "analysis": analysis
+            })
+            # Analiz yedek sonuç döndürmek yerine hata verdiği için yeniden analiz anahtarı yalnızca gerçek sonuçla saklanır
+            results_cache.put(job_id, completed_record, content_key=content_key)
+            if content_key:
+                content_index.forget(content_key, job_id)
+            progress.publish_final(completed_record)
+            job_results.inc(status="completed")
+            print(f"[{job_id}] Yeniden analiz tamamlandı")
+            
+        except Exception as e:
+            error_traceback = traceback.format_exc()
+            print(f"[{job_id}] Yeniden analiz hatası: {str(e)}")
+            logger.error(f"[{job_id}] Yeniden analiz hatası: {str(e)}\n{error_traceback}")
+            progress.finish()
+            error_record = progress.snapshot(status="error")
+            error_record.update({
+                "source_job_id": source_job_id,
+                "error": str(e),
+                "traceback": error_traceback
+            })
+            results_cache[job_id] = error_record
+            progress.publish_final(error_record)
+            job_results.inc(status="error")
+            if content_key:
+                content_index.forget(content_key, job_id)
@@ -0,0 +1,187 @@
+# İşlerin hangi aşamada olduğunu, yüzde ilerlemeyi ve aşama sürelerini takip eder. Durum endpoint'i
+# tam sonuç yerine buradaki kısa özeti döndürür.
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+
+from ..serving.ipc import shared_object
+
+# Aşama adı -> durum yanıtında görünen etiket
+STAGE_LABELS = {
+    "decode": "decoding",
+    "vad": "detecting_speech",
+    "transcription": "transcribing",
+    "diarization": "diarizing",
+    "alignment": "aligning",
+    "analysis": "analyzing"
+}
+
+# Aşamaların toplam süreye yaklaşık katkısı (yüzde ilerleme hesabı için)
+STAGE_WEIGHTS = {
+    "decode": 5,
+    "vad": 2,
+    "transcription": 45,
+    "diarization": 30,
+    "alignment": 5,
+    "analysis": 15
+}
+
+# Durum yanıtında yer alan alanlar; tam sonuç yalnızca /api/result ile alınır
+STATUS_FIELDS = (
+    "status", "stage", "running_stages", "progress", "timings", "error",
+    "cached", "queue_position", "queue_depth", "estimated_start_seconds", "checkpoints"
+)
+
+
+# Bu durumlardan sonra iş için yeni olay gelmez
+FINAL_STATUSES = ("completed", "error")
+
+
+class ProgressBroker:
+    """
+    İş ilerleme olaylarını yayınlar. SSE ve long-poll istemcileri wait() ile yeni olayları bekler.
+    Her iş için son max_events olay, en fazla max_jobs iş için tutulur.
+    """
+
+    def __init__(self, max_events=100, max_jobs=1000):
+        self.max_events = max_events
+        self.max_jobs = max_jobs
+        self._cond = threading.Condition()
+        self._events = OrderedDict()
+        self._seq = itertools.count(1)
+
+    def publish(self, job_id, event):
+        with self._cond:
+            seq = next(self._seq)
+            events = self._events.get(job_id)
+            if events is None:
+                events = deque(maxlen=self.max_events)
+                self._events[job_id] = events
+                while len(self._events) > self.max_jobs:
+                    self._events.popitem(last=False)
+            else:
+                self._events.move_to_end(job_id)
+            events.append((seq, dict(event, seq=seq)))
+            self._cond.notify_all()
+            return seq
+
+    def events_since(self, job_id, since=0):
+        with self._cond:
+            return [event for seq, event in self._events.get(job_id, ()) if seq > since]
+
+    def last_seq(self, job_id):
+        with self._cond:
+            events = self._events.get(job_id)
+            return events[-1][0] if events else 0
+
+    def wait(self, job_id, since=0, timeout=30.0):
+        """since'den sonraki olayları döndürür; yoksa timeout saniyeye kadar yeni olay bekler."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                events = [event for seq, event in self._events.get(job_id, ()) if seq > since]
+                remaining = deadline - time.time()
+                if events or remaining <= 0:
+                    return events
+                self._cond.wait(remaining)
+
+
+# Süreç genelinde ilerleme olayı yayıncısı (çok süreçli modda başlatıcıdaki yayıncının vekili)
+progress_broker = shared_object("progress", ProgressBroker)
+
+
+class JobProgress:
+    """
+    Tek bir işin aşama ilerlemesini tutar, her değişiklikte durum kaydını depoya yazar ve olay yayınlar.
+    Args:
+        stages (tuple): İşte çalışacak aşamalar (ör. yeniden analizde yalnızca "analysis"); verilmezse tüm aşamalar
+    """
+
+    def __init__(self, job_id, store, queued_at=None, broker=None, stages=None):
+        self.job_id = job_id
+        self.weights = {stage: STAGE_WEIGHTS.get(stage, 0) for stage in stages} if stages else STAGE_WEIGHTS
+        self.store = store
+        self.broker = broker or progress_broker
+        self.queued_at = queued_at
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._running = []
+        self._stage_seconds = {}
+        self._partial = {}
+        self._last_stage = None
+
+    def stage_started(self, stage):
+        with self._lock:
+            self._running.append(stage)
+            self._last_stage = stage
+        self.publish(event="stage_started", stage=STAGE_LABELS.get(stage, stage))
+
+    def stage_finished(self, stage, elapsed):
+        with self._lock:
+            if stage in self._running:
+                self._running.remove(stage)
+            self._stage_seconds[stage] = elapsed
+        self.publish(event="stage_finished", stage=STAGE_LABELS.get(stage, stage), seconds=elapsed)
+
+    def stage_progress(self, stage, fraction):
+        """Uzun süren bir aşamanın kısmi ilerlemesini (0-1) bildirir."""
+        with self._lock:
+            self._partial[stage] = max(0.0, min(1.0, fraction))
+        self.publish(event="stage_progress", stage=STAGE_LABELS.get(stage, stage), fraction=fraction)
+
+    def progress(self):
+        total = sum(self.weights.values()) or 1
+        done = sum(self.weights.get(stage, 0) for stage in self._stage_seconds)
+        # Devam eden aşamaların kısmi ilerlemesini de ekle
+        done += sum(self.weights.get(stage, 0) * fraction for stage, fraction in self._partial.items()
+                    if stage not in self._stage_seconds)
+        return min(100, int(round(100.0 * done / total)))
+
+    def timings(self):
+        now = self.finished_at or time.time()
+        return {
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": (self.started_at - self.queued_at) if self.queued_at else None,
+            "elapsed_seconds": now - self.started_at,
+            "stages": dict(self._stage_seconds)
+        }
+
+    def current_stage(self):
+        # Paralel çalışan aşamalar varsa en son başlayanı göster
+        stage = self._running[-1] if self._running else self._last_stage
+        return STAGE_LABELS.get(stage, stage)
+
+    def snapshot(self, status="processing"):
+        with self._lock:
+            return {
+                "status": status,
+                "stage": self.current_stage(),
+                "running_stages": [STAGE_LABELS.get(stage, stage) for stage in self._running],
+                "progress": 100 if status == "completed" else self.progress(),
+                "timings": self.timings()
+            }
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def publish(self, event="status", **fields):
+        snapshot = self.snapshot()
+        self.store[self.job_id] = snapshot
+        self.broker.publish(self.job_id, dict(snapshot, event=event, **fields))
+
+    def publish_final(self, record):
+        """Tamamlanma veya hata kaydını olay olarak yayınlar (tam sonuç değil, kısa özet)."""
+        self.broker.publish(self.job_id, dict(compact_status(record), event=record.get("status")))
+
+
+def compact_status(record):
+    """Depodaki kayıttan yalnızca durum, aşama, ilerleme ve süre bilgisini içeren kısa yanıtı üretir."""
+    status = {field: record[field] for field in STATUS_FIELDS if field in record}
+    if status.get("status") == "completed":
+        status["progress"] = 100
+    return status
@@ -0,0 +1,160 @@
+# İş kuyruğunu ve işçi havuzunu yönetir. Gelen işler sınırlı, öncelikli bir kuyrukta bekler ve
+# yapılandırılabilir sayıda işçi iş parçacığı tarafından sırayla işlenir.
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from .processor import process_job, results_cache
+from .progress import progress_broker
+from ..serving.ipc import shared_object
+
+logger = logging.getLogger(__name__)
+
+# Öncelik adları -> sıralama değeri (küçük değer önce işlenir)
+PRIORITIES = {
+    "high": 0,
+    "normal": 1,
+    "low": 2
+}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _priority_value(priority):
+    if priority is None:
+        return PRIORITIES["normal"]
+    if isinstance(priority, int):
+        return priority
+    if priority not in PRIORITIES:
+        raise ValueError(f"Geçersiz öncelik: {priority}. Seçenekler: {', '.join(PRIORITIES)}")
+    return PRIORITIES[priority]
+
+
+class JobScheduler:
+    """
+    Sınırlı ve öncelikli iş kuyruğu ile sabit boyutlu işçi havuzu.
+    Args:
+        runner (callable): Her iş için çağrılacak fonksiyon, runner(*args) şeklinde çalıştırılır
+        worker_count (int): Aynı anda çalışacak iş sayısı
+        max_queue_size (int): Bekleyebilecek en fazla iş sayısı (çalışanlar hariç)
+        default_duration (float): Henüz iş tamamlanmamışken başlangıç tahmini için kullanılan süre (saniye)
+    """
+
+    def __init__(self, runner, worker_count=1, max_queue_size=10, default_duration=300.0):
+        self.runner = runner
+        self.worker_count = max(1, worker_count)
+        self.max_queue_size = max(0, max_queue_size)
+        self.default_duration = default_duration
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._running = {}
+        self._durations = deque(maxlen=20)
+        self._workers = []
+
+    def _ensure_workers(self):
+        # Çağıran self._cond'u tutuyor olmalı; işçiler ilk iş geldiğinde başlatılır
+        while len(self._workers) < self.worker_count:
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{len(self._workers)}")
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, job_id, args, priority="normal"):
+        """İşi kuyruğa ekler ve kuyruktaki sırasını (1'den başlar) döndürür. Kuyruk doluysa QueueFullError fırlatır."""
+        priority_value = _priority_value(priority)
+        with self._cond:
+            if len(self._heap) >= self.max_queue_size:
+                raise QueueFullError(f"İş kuyruğu dolu ({len(self._heap)}/{self.max_queue_size})")
+            heapq.heappush(self._heap, (priority_value, next(self._counter), job_id, args))
+            results_cache[job_id] = {"status": "queued", "queued_at": time.time()}
+            self._ensure_workers()
+            self._cond.notify()
+            position = self._position_locked(job_id)
+        progress_broker.publish(job_id, {"event": "queued", "status": "queued", "queue_position": position})
+        return position
+
+    def _position_locked(self, job_id):
+        for index, item in enumerate(sorted(self._heap)):
+            if item[2] == job_id:
+                return index + 1
+        return None
+
+    def position(self, job_id):
+        with self._cond:
+            return self._position_locked(job_id)
+
+    def depth(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _average_duration(self):
+        if not self._durations:
+            return self.default_duration
+        return sum(self._durations) / len(self._durations)
+
+    def _estimate_start_locked(self, position):
+        # Her işçinin ne zaman boşalacağını tahmin et, önümüzdeki işleri en erken boşalan işçiye sırayla dağıt
+        average = self._average_duration()
+        now = time.time()
+        free_at = [max(average - (now - started), 0.0) for started in self._running.values()]
+        free_at += [0.0] * (self.worker_count - len(free_at))
+        heapq.heapify(free_at)
+        for _ in range(position - 1):
+            heapq.heappush(free_at, heapq.heappop(free_at) + average)
+        return free_at[0]
+
+    def estimated_start(self, job_id):
+        """Kuyruktaki iş için tahmini başlama süresini (saniye) döndürür; iş kuyrukta değilse None."""
+        with self._cond:
+            position = self._position_locked(job_id)
+            if position is None:
+                return None
+            return self._estimate_start_locked(position)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self.worker_count,
+                "running": len(self._running),
+                "queue_depth": len(self._heap),
+                "max_queue_size": self.max_queue_size,
+                "average_job_seconds": self._average_duration(),
+                "estimated_wait_seconds": self._estimate_start_locked(len(self._heap) + 1)
+            }
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job_id, args = heapq.heappop(self._heap)
+                started = time.time()
+                self._running[job_id] = started
+            
+            print(f"[{job_id}] İşçi işi aldı: {threading.current_thread().name}")
+            try:
+                self.runner(*args)
+            except Exception as e:
+                # process_job hataları kendisi kaydeder, buraya yalnızca beklenmeyen hatalar düşer
+                logger.error(f"[{job_id}] İşçi hatası: {str(e)}")
+            finally:
+                with self._cond:
+                    self._running.pop(job_id, None)
+                    self._durations.append(time.time() - started)
+
+
+# Süreç genelinde iş zamanlayıcısı. Çok süreçli modda kuyruk başlatıcı süreçtedir ve işler çıkarım işçilerinde
+# çalışır; MAX_CONCURRENT_JOBS o zaman çıkarım işçisi başına eşzamanlı iş sayısıdır.
+job_scheduler = shared_object("scheduler", lambda: JobScheduler(
+    process_job,
+    worker_count=int(os.getenv("MAX_CONCURRENT_JOBS", "1")),
+    max_queue_size=int(os.getenv("JOB_QUEUE_SIZE", "10"))
+))
@@ -0,0 +1,97 @@
+# İş aşamalarını bağımlılıklarına göre çalıştıran zamanlayıcıyı içerir. Birbirine bağımlı olmayan aşamalar
+# (ör. transkripsiyon ve konuşmacı ayrıştırma) ayrı iş parçacıklarında paralel çalışır, bağımlı aşamalar bunları bekler.
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    Bir iş aşaması.
+    Args:
+        name (str): Aşama adı, sonuç sözlüğünde anahtar olarak kullanılır
+        func (callable): Önceki aşamaların sonuç sözlüğünü alıp bu aşamanın sonucunu döndüren fonksiyon
+        depends_on (tuple): Bu aşamadan önce tamamlanması gereken aşama adları
+    """
+
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+def parallel_stages_enabled():
+    return os.getenv("PARALLEL_STAGES", "1").lower() not in ("0", "false", "no")
+
+
+def run_stages(stages, job_id, max_workers=None, on_stage_start=None, on_stage_end=None, results=None):
+    """
+    Aşamaları bağımlılık sırasına göre çalıştırır; hazır olan bağımsız aşamalar aynı anda başlatılır.
+    Bir aşama hata verirse henüz başlamamış aşamalar iptal edilir, çalışanlar beklenir ve hata yukarı iletilir.
+    Args:
+        results (dict): Verilirse sonuçlar bu sözlüğe yazılır; hata durumunda tamamlanan aşamaların
+            sonuçlarına (ör. temizlik için) erişmeyi sağlar
+    Returns:
+        dict: Aşama adı -> aşama sonucu
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dep in stage.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"'{stage.name}' aşaması bilinmeyen aşamaya bağlı: {dep}")
+    
+    if max_workers is None:
+        max_workers = len(stages) if parallel_stages_enabled() else 1
+    
+    if results is None:
+        results = {}
+    started = {}
+    timings = {}
+    pending = list(stages)
+    running = {}
+    error = None
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=f"stage-{job_id}") as executor:
+        while pending or running:
+            # Bağımlılıkları tamamlanmış aşamaları başlat
+            if error is None:
+                for stage in list(pending):
+                    if all(dep in results for dep in stage.depends_on):
+                        pending.remove(stage)
+                        print(f"[{job_id}] Aşama başlatılıyor: {stage.name}")
+                        if on_stage_start:
+                            on_stage_start(stage.name)
+                        started[stage.name] = time.perf_counter()
+                        running[executor.submit(stage.func, results)] = stage
+            else:
+                pending = []
+            
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Aşama bağımlılıkları çözülemedi: {[stage.name for stage in pending]}")
+                break
+            
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                elapsed = time.perf_counter() - started[stage.name]
+                timings[stage.name] = elapsed
+                try:
+                    results[stage.name] = future.result()
+                    print(f"[{job_id}] Aşama tamamlandı: {stage.name} ({elapsed:.2f}s)")
+                    if on_stage_end:
+                        on_stage_end(stage.name, elapsed)
+                except Exception as e:
+                    logger.error(f"[{job_id}] '{stage.name}' aşamasında hata: {str(e)}")
+                    if error is None:
+                        error = e
+    
+    if error is not None:
+        raise error
+    
+    logger.info(f"[{job_id}] Aşama süreleri: {timings}")
+    return results
@@ -0,0 +1,202 @@
+# İş sonuçlarını saklayan kalıcı ve sınırlı depo. Tamamlanan işler bellekte küçük bir LRU önbellekte ve
+# diskte SQLite veritabanında tutulur; süreç yeniden başlasa da sonuçlar korunur, bellek kullanımı sabit kalır.
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .progress import compact_status
+
+logger = logging.getLogger(__name__)
+
+# Bu durumlara ulaşan işler kalıcı depoya yazılır; diğerleri (queued, processing) yalnızca bellekte tutulur
+TERMINAL_STATUSES = ("completed", "error")
+
+
+class ResultStore:
+    """
+    Sözlük benzeri arayüze sahip sonuç deposu (store[job_id], job_id in store, store.get(job_id)).
+    Args:
+        db_path (str): SQLite veritabanı dosyası
+        max_memory_items (int): Bellekte tutulacak en fazla tamamlanmış iş sayısı
+        max_memory_bytes (int): Bellekteki tamamlanmış işlerin toplam (JSON) boyut sınırı
+        ttl_seconds (float): Bu süreden eski sonuçlar silinir
+        max_disk_items (int): Diskte tutulacak en fazla iş sayısı, aşılırsa en eskiler silinir
+    """
+
+    def __init__(self, db_path, max_memory_items=32, max_memory_bytes=256 * 1024 * 1024,
+                 ttl_seconds=7 * 24 * 3600, max_disk_items=1000):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_items = max_disk_items
+        self._lock = threading.RLock()
+        self._active = {}
+        self._lru = OrderedDict()
+        self._memory_bytes = 0
+        self._db_lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        # Çağıran self._db_lock'u tutuyor olmalı; bağlantı ilk kullanımda açılır
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, content_key TEXT, "
+                "payload TEXT NOT NULL, created_at REAL NOT NULL, status_payload TEXT)"
+            )
+            # Eski veritabanlarında kısa durum sütunu yoksa ekle
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+            if "status_payload" not in columns:
+                self._conn.execute("ALTER TABLE results ADD COLUMN status_payload TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_content_key ON results (content_key)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_created_at ON results (created_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and created_at < time.time() - self.ttl_seconds
+
+    def _remember(self, job_id, record, size, created_at):
+        # Çağıran self._lock'u tutuyor olmalı
+        old = self._lru.pop(job_id, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+        self._lru[job_id] = (record, size, created_at)
+        self._memory_bytes += size
+        while self._lru and (len(self._lru) > self.max_memory_items or self._memory_bytes > self.max_memory_bytes):
+            _, (_, evicted_size, _) = self._lru.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def put(self, job_id, record, content_key=None):
+        status = record.get("status")
+        if status not in TERMINAL_STATUSES:
+            with self._lock:
+                self._active[job_id] = record
+            return
+        
+        payload = json.dumps(record, ensure_ascii=False)
+        status_payload = json.dumps(compact_status(record), ensure_ascii=False)
+        created_at = time.time()
+        with self._db_lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (job_id, status, content_key, payload, created_at, status_payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, status, content_key, payload, created_at, status_payload)
+                )
+                # Süresi dolan ve sınırı aşan eski kayıtları temizle
+                if self.ttl_seconds is not None:
+                    db.execute("DELETE FROM results WHERE created_at < ?", (created_at - self.ttl_seconds,))
+                db.execute(
+                    "DELETE FROM results WHERE job_id NOT IN (SELECT job_id FROM results ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_disk_items,)
+                )
+                db.commit()
+            except Exception as e:
+                # Disk hatası sonucu kaybettirmesin, en azından bellekte tut
+                logger.error(f"[{job_id}] Sonuç diske yazılamadı: {str(e)}")
+        
+        with self._lock:
+            self._active.pop(job_id, None)
+            self._remember(job_id, record, len(payload), created_at)
+
+    def get(self, job_id, default=None):
+        with self._lock:
+            if job_id in self._active:
+                return self._active[job_id]
+            cached = self._lru.get(job_id)
+            if cached is not None:
+                record, _, created_at = cached
+                if not self._expired(created_at):
+                    self._lru.move_to_end(job_id)
+                    return record
+                self._memory_bytes -= self._lru.pop(job_id)[1]
+        
+        with self._db_lock:
+            try:
+                row = self._db().execute(
+                    "SELECT payload, created_at FROM results WHERE job_id = ?", (job_id,)
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"[{job_id}] Sonuç diskten okunamadı: {str(e)}")
+                row = None
+        if row is None or self._expired(row[1]):
+            return default
+        
+        record = json.loads(row[0])
+        with self._lock:
+            self._remember(job_id, record, len(row[0]), row[1])
+        return record
+
+    def get_status(self, job_id):
+        """İşin kısa durum özetini döndürür; diskteki tamamlanmış işler için tam sonucu okumaz."""
+        with self._lock:
+            if job_id in self._active:
+                return compact_status(self._active[job_id])
+            cached = self._lru.get(job_id)
+            if cached is not None and not self._expired(cached[2]):
+                return compact_status(cached[0])
+        
+        with self._db_lock:
+            try:
+                row = self._db().execute(
+                    "SELECT status_payload, status, created_at FROM results WHERE job_id = ?", (job_id,)
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"[{job_id}] Durum diskten okunamadı: {str(e)}")
+                row = None
+        if row is None or self._expired(row[2]):
+            return None
+        return json.loads(row[0]) if row[0] else {"status": row[1]}
+
+    def find_by_content_key(self, content_key):
+        """Aynı içerik anahtarıyla en son tamamlanan işin kimliğini döndürür."""
+        with self._db_lock:
+            try:
+                row = self._db().execute(
+                    "SELECT job_id, created_at FROM results WHERE content_key = ? AND status = 'completed' "
+                    "ORDER BY created_at DESC LIMIT 1", (content_key,)
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"İçerik anahtarı sorgulanamadı: {str(e)}")
+                row = None
+        if row is None or self._expired(row[1]):
+            return None
+        return row[0]
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "active_jobs": len(self._active),
+                "memory_items": len(self._lru),
+                "memory_bytes": self._memory_bytes
+            }
+        with self._db_lock:
+            try:
+                stats["disk_items"] = self._db().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            except Exception:
+                stats["disk_items"] = None
+        return stats
+
+    def __getitem__(self, job_id):
+        record = self.get(job_id)
+        if record is None:
+            raise KeyError(job_id)
+        return record
+
+    def __setitem__(self, job_id, record):
+        self.put(job_id, record)
+
+    def __contains__(self, job_id):
+        return self.get(job_id) is not None
@@ -0,0 +1 @@
+from .registry import model_registry, ModelRegistry
@@ -0,0 +1,28 @@
+# GPU yapılandırması. torch'un import edilmesi birkaç saniye sürdüğü için HTTP katmanının açılışında değil,
+# modelleri tutan süreçte arka plandaki ısınma iş parçacığında çalışır.
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# GPU kullanımını optimize etmek için ayarlar
+def configure_gpu():
+    import torch
+    if torch.cuda.is_available():
+        # GPU kullanımını optimize et
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cudnn.deterministic = False
+
+        # Bellek kullanımını optimize et
+        torch.cuda.empty_cache()
+
+        # Veri tipi tutarlılığı için float32 kullan
+        torch.set_default_dtype(torch.float32)
+
+        logger.info(f"GPU yapılandırıldı: {torch.cuda.get_device_name(0)} (GPU sayısı: {torch.cuda.device_count()})")
+        print(f"GPU yapılandırıldı: {torch.cuda.get_device_name(0)}")
+        logger.info("GPU kullanımı etkinleştirildi")
+        return True
+    logger.info("GPU bulunamadı, CPU kullanılacak")
+    return False
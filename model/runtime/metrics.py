@@ -0,0 +1,351 @@
+# İş aşamaları için ölçüm altyapısı. Her aşamanın duvar saati süresi, CPU süresi, tepe bellek (RSS), gerçek zaman
+# oranı (RTF) ve model yükleme süreleri histogramlarda toplanır ve Prometheus metin formatında dışa verilir.
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from .registry import _current_rss
+
+# Histogram kova sınırları
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+BYTES_BUCKETS = tuple(2 ** power for power in range(26, 36))  # 64 MB - 32 GB
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+
+# Aşama çalışırken RSS'in örneklenme aralığı (saniye)
+RSS_SAMPLE_SECONDS = 0.1
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} etiketleri {self.label_names} olmalı, verilen: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _header(self, kind):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {kind}"]
+
+    def export(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, values):
+        """Başka bir süreçteki aynı metriğin export() değerlerini ekler."""
+        with self._lock:
+            for key, value in values:
+                self._merge_value(tuple(key), value)
+
+    def _merge_value(self, key, value):
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Counter(_Metric):
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header("counter") + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _merge_value(self, key, value):
+        # Anlık değerler toplanmaz, son birleştirilen süreçteki değer geçerlidir
+        self._values[key] = value
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header("gauge") + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in values if value is not None
+        ]
+
+
+class Histogram(_Metric):
+    def __init__(self, name, documentation, label_names=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        if value is None:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def export(self):
+        with self._lock:
+            return [[list(key), dict(state, counts=list(state["counts"]))] for key, state in self._values.items()]
+
+    def _merge_value(self, key, value):
+        state = self._values.get(key)
+        if state is None:
+            self._values[key] = dict(value, counts=list(value["counts"]))
+            return
+        state["counts"] = [a + b for a, b in zip(state["counts"], value["counts"])]
+        state["sum"] += value["sum"]
+        state["count"] += value["count"]
+
+    def snapshot(self, **labels):
+        """Tek bir etiket kombinasyonunun toplamı ve sayısı (ör. API yanıtları için)."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return {"sum": state["sum"], "count": state["count"]} if state else {"sum": 0.0, "count": 0}
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, dict(state, counts=list(state["counts"]))) for key, state in self._values.items())
+        lines = self._header("histogram")
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, extra=("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """İsimle kaydedilen metrikleri tutar; aynı isim tekrar istenirse mevcut metrik döndürülür."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, documentation, label_names, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, label_names, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} metriği farklı bir türle kayıtlı")
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=SECONDS_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def export(self):
+        """
+        Metriklerin tanımı ve değerleri (pickle/JSON uyumlu). Çok süreçli modda çıkarım işçileri bunu gönderir,
+        HTTP işçisi merge() ile kendi değerleriyle birleştirip tek bir çıktı üretir.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        exported = {}
+        for metric in metrics:
+            exported[metric.name] = {
+                "type": type(metric).__name__,
+                "documentation": metric.documentation,
+                "label_names": list(metric.label_names),
+                "buckets": list(metric.buckets[:-1]) if isinstance(metric, Histogram) else None,
+                "values": metric.export()
+            }
+        return exported
+
+    def merge(self, exported):
+        """export() çıktısını ekler: sayaçlar ve histogramlar toplanır, göstergelerde son değer geçerlidir."""
+        kinds = {"Counter": self.counter, "Gauge": self.gauge}
+        for name, data in exported.items():
+            if data["type"] == "Histogram":
+                metric = self.histogram(name, data["documentation"], data["label_names"], buckets=data["buckets"])
+            else:
+                metric = kinds[data["type"]](name, data["documentation"], data["label_names"])
+            metric.merge(data["values"])
+
+    def render(self):
+        """Tüm metrikleri Prometheus metin formatında (0.0.4) döndürür."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Süreç genelinde tek metrik kayıt defteri
+metrics = MetricsRegistry()
+
+stage_wall_seconds = metrics.histogram(
+    "meeting_stage_wall_seconds", "Aşamanın duvar saati süresi (saniye)", ("stage",))
+stage_cpu_seconds = metrics.histogram(
+    "meeting_stage_cpu_seconds",
+    "Aşama süresince sürecin harcadığı CPU süresi (saniye); paralel çalışan aşamalar birbirinin CPU'sunu da içerir",
+    ("stage",))
+stage_peak_rss_bytes = metrics.histogram(
+    "meeting_stage_peak_rss_bytes", "Aşama süresince gözlenen en yüksek süreç RSS'i (byte)", ("stage",),
+    buckets=BYTES_BUCKETS)
+stage_real_time_factor = metrics.histogram(
+    "meeting_stage_real_time_factor", "Aşama süresi / kayıt süresi", ("stage",), buckets=RTF_BUCKETS)
+model_load_seconds = metrics.histogram(
+    "meeting_model_load_seconds", "Model yükleme süresi (saniye)", ("model",))
+stage_failures = metrics.counter(
+    "meeting_stage_failures_total", "Hata ile biten aşama sayısı", ("stage",))
+job_results = metrics.counter(
+    "meeting_jobs_total", "Sonuçlanan iş sayısı", ("status",))
+
+
+class _RssSampler:
+    """
+    Ölçülen en az bir aşama varken RSS'i arka planda örnekler ve her etkin ölçümün tepe değerini günceller.
+    Aşama bitince son bir örnek alınır, böylece çok kısa aşamalar da en az iki örnek içerir.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._timers = set()
+        self._thread = None
+        self._disabled = False
+
+    def add(self, timer):
+        with self._cond:
+            if self._disabled:
+                return
+            self._timers.add(timer)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def remove(self, timer):
+        with self._cond:
+            self._timers.discard(timer)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._timers:
+                    self._cond.wait()
+                timers = list(self._timers)
+            rss = _current_rss()
+            if rss is None:
+                # Bellek ölçülemiyorsa örneklemeyi durdur
+                with self._cond:
+                    self._disabled = True
+                    self._timers.clear()
+                return
+            for timer in timers:
+                timer.sample_rss(rss)
+            time.sleep(self.interval)
+
+
+_rss_sampler = _RssSampler()
+
+
+class StageTimer:
+    """
+    Tek bir aşama çalışmasının ölçümü. Kayıt süresi aşama başında bilinmiyorsa (ör. çözme aşaması)
+    aşama içinde audio_seconds sonradan atanabilir.
+    """
+
+    def __init__(self, stage, audio_seconds=None):
+        self.stage = stage
+        self.audio_seconds = audio_seconds
+        self.result = {}
+        self._peak_rss = None
+
+    def sample_rss(self, rss):
+        if rss is not None and (self._peak_rss is None or rss > self._peak_rss):
+            self._peak_rss = rss
+
+    def __enter__(self):
+        self.sample_rss(_current_rss())
+        _rss_sampler.add(self)
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall_started
+        cpu = time.process_time() - self._cpu_started
+        _rss_sampler.remove(self)
+        self.sample_rss(_current_rss())
+        rtf = wall / self.audio_seconds if self.audio_seconds else None
+
+        stage_wall_seconds.observe(wall, stage=self.stage)
+        stage_cpu_seconds.observe(cpu, stage=self.stage)
+        stage_peak_rss_bytes.observe(self._peak_rss, stage=self.stage)
+        stage_real_time_factor.observe(rtf, stage=self.stage)
+        if exc_type is not None:
+            stage_failures.inc(stage=self.stage)
+
+        self.result = {
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "peak_rss_bytes": self._peak_rss,
+            "rtf": round(rtf, 4) if rtf is not None else None
+        }
+        return False
+
+
+@contextmanager
+def stage_timer(stage, audio_seconds=None, report=None):
+    """
+    Aşamayı ölçer ve histogramlara ekler.
+    Args:
+        stage (str): Aşama adı (metrik etiketi)
+        audio_seconds (float): Kayıt süresi, RTF hesabı için
+        report (dict): Verilirse aşamanın ölçümleri report[stage] altına yazılır
+    """
+    timer = StageTimer(stage, audio_seconds)
+    try:
+        with timer:
+            yield timer
+    finally:
+        if report is not None:
+            report[stage] = timer.result
@@ -0,0 +1,84 @@
+# Model çıkarım hassasiyeti (precision) ayarları. Model başına float32 (varsayılan), bfloat16 veya int8
+# (Linear katmanlarında dinamik kuantizasyon) seçilebilir; desteklenmeyen seçimler float32'ye düşer.
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("float32", "bfloat16", "int8")
+DEFAULT_PRECISION = "float32"
+
+
+def model_precision(name):
+    """
+    Model için ortam değişkeninden hassasiyeti okur, ör. WHISPER_PRECISION, SUMMARIZER_PRECISION.
+    Raises:
+        ValueError: Bilinmeyen hassasiyet
+    """
+    precision = (os.getenv(f"{name.upper()}_PRECISION") or DEFAULT_PRECISION).lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"Geçersiz {name.upper()}_PRECISION: {precision} (seçenekler: {', '.join(PRECISIONS)})")
+    return precision
+
+
+def _cpu_flags():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def bf16_supported(device="cpu"):
+    """Cihazın bfloat16 hesaplamayı donanımda desteklenip desteklemediğini döndürür."""
+    import torch
+
+    if str(device).startswith("cuda"):
+        return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+    try:
+        # oneDNN'in bf16 desteği (AVX512-BF16 / AMX) varsa
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return bool(_cpu_flags() & {"avx512_bf16", "amx_bf16"})
+
+
+def resolve_precision(precision, device="cpu"):
+    """
+    İstenen hassasiyeti cihaza göre uygulanabilir olana indirger: int8 dinamik kuantizasyon yalnızca CPU'da,
+    bfloat16 yalnızca donanım desteği varsa kullanılır.
+    """
+    if precision == "int8" and str(device).startswith("cuda"):
+        logger.warning("int8 dinamik kuantizasyon yalnızca CPU'da desteklenir, float32 kullanılacak")
+        return "float32"
+    if precision == "bfloat16" and not bf16_supported(device):
+        logger.warning(f"{device} bfloat16 desteklemiyor, float32 kullanılacak")
+        return "float32"
+    return precision
+
+
+def torch_dtype(precision):
+    """Modelin girdi/ağırlık veri tipi (int8'de aktivasyonlar float32 kalır)."""
+    import torch
+
+    return torch.bfloat16 if precision == "bfloat16" else torch.float32
+
+
+def apply_precision(model, precision, device="cpu"):
+    """
+    Modeli istenen hassasiyete çevirir.
+    Returns:
+        tuple: (model, uygulanan hassasiyet)
+    """
+    import torch
+
+    precision = resolve_precision(precision, device)
+    if precision == "int8":
+        # Linear katmanlarının ağırlıkları int8'e çevrilir, aktivasyonlar çalışma anında kuantize edilir
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif precision == "bfloat16":
+        model = model.to(torch.bfloat16)
+    return model, precision
@@ -0,0 +1,253 @@
+# Süreç boyunca paylaşılan model kayıt defteri. Whisper, pyannote, Pegasus ve DistilBERT gibi modelleri
+# bir kez yükler, iş parçacıkları arasında güvenli şekilde paylaştırır ve yükleme süresi/bellek bilgisini raporlar.
+
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:  # psutil yoksa bellek ölçümü devre dışı kalır
+    psutil = None
+
+
+def _current_rss():
+    """Sürecin o anki resident bellek kullanımını (byte) döndürür, ölçülemiyorsa None."""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(os.getpid()).memory_info().rss
+    except Exception:
+        return None
+
+
+def _tensor_bytes(value, seen):
+    # int8 kuantize Linear katmanlarının ağırlıkları parametre değil, (ağırlık, bias) demeti olarak tutulur
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item, seen) for item in value)
+    if not hasattr(value, "element_size"):
+        return 0
+    try:
+        key = value.data_ptr()
+    except Exception:
+        key = id(value)
+    if key in seen:
+        return 0
+    seen.add(key)
+    return value.numel() * value.element_size()
+
+
+def _parameter_bytes(obj):
+    """Model (veya model içeren sözlük/pipeline) parametrelerinin kapladığı byte miktarını tahmin eder."""
+    if obj is None:
+        return 0
+    if isinstance(obj, dict):
+        # Aynı model birden fazla anahtarda (ör. model ve pipeline.model) yer alabilir, tekrar sayma
+        seen = {}
+        for value in obj.values():
+            module = getattr(value, "model", value)
+            if hasattr(module, "parameters"):
+                seen[id(module)] = module
+        return sum(_parameter_bytes(module) for module in seen.values())
+    module = getattr(obj, "model", obj)
+    if not hasattr(module, "parameters"):
+        return 0
+    try:
+        # state_dict paylaşılan (tied) ağırlıkları ve kuantize ağırlıkları da içerir, aynı bellek bir kez sayılır
+        seen = set()
+        return sum(_tensor_bytes(value, seen) for value in module.state_dict(keep_vars=True).values())
+    except Exception:
+        try:
+            return sum(p.numel() * p.element_size() for p in module.parameters())
+        except Exception:
+            return 0
+
+
+class _ModelEntry:
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.lock = threading.Lock()
+        self.model = None
+        self.refcount = 0
+        self.load_count = 0
+        self.load_seconds = None
+        self.rss_delta_bytes = None
+        self.param_bytes = None
+        self.last_used = None
+        self.error = None
+        self.warmed = False
+        self.warmup_seconds = None
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+
+class ModelRegistry:
+    """
+    Modelleri süreç ömrü boyunca tutan, iş parçacığı güvenli kayıt defteri.
+    Her model bir isim ve yükleyici fonksiyon ile kaydedilir; ilk acquire() çağrısında
+    (veya preload() ile önceden) yüklenir ve referans sayacı ile takip edilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def register(self, name, loader, warmup=None):
+        """
+        Args:
+            warmup (callable): İsteğe bağlı, yüklenen modeli alıp küçük bir sahte çıkarım yapan fonksiyon
+                (ilk işin kernel/önbellek hazırlığı maliyetini servis başlangıcına taşır)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                # Yükleyici yeniden kaydedilirse sonraki yüklemede kullanılır
+                entry.loader = loader
+                if warmup is not None:
+                    entry.warmup = warmup
+                return
+            self._entries[name] = _ModelEntry(name, loader, warmup)
+
+    def is_registered(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def _get_entry(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Kayıtlı olmayan model: {name}")
+        return entry
+
+    def _load(self, entry):
+        # Çağıran entry.lock'u tutuyor olmalı
+        print(f"[registry] '{entry.name}' modeli yükleniyor...")
+        rss_before = _current_rss()
+        started = time.perf_counter()
+        try:
+            model = entry.loader()
+        except Exception as e:
+            entry.error = str(e)
+            logger.error(f"[registry] '{entry.name}' modeli yüklenemedi: {str(e)}")
+            raise
+        entry.load_seconds = time.perf_counter() - started
+        from .metrics import model_load_seconds
+        model_load_seconds.observe(entry.load_seconds, model=entry.name)
+        rss_after = _current_rss()
+        entry.rss_delta_bytes = (rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+        entry.param_bytes = _parameter_bytes(model)
+        entry.model = model
+        entry.load_count += 1
+        entry.error = None
+        print(f"[registry] '{entry.name}' modeli {entry.load_seconds:.2f} saniyede yüklendi")
+        logger.info(f"[registry] '{entry.name}' yüklendi: {entry.load_seconds:.2f}s, rss_delta={entry.rss_delta_bytes}, params={entry.param_bytes}")
+
+    def acquire(self, name):
+        """Modeli (gerekirse yükleyerek) döndürür ve referans sayacını artırır."""
+        entry = self._get_entry(name)
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.refcount += 1
+            entry.last_used = time.time()
+            return entry.model
+
+    def release(self, name):
+        entry = self._get_entry(name)
+        with entry.lock:
+            if entry.refcount > 0:
+                entry.refcount -= 1
+
+    @contextmanager
+    def use(self, name):
+        model = self.acquire(name)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    def preload(self, names):
+        """Verilen modelleri hemen yükler (eager loading). Hata alan modeller loglanır, diğerleri yüklenmeye devam eder."""
+        loaded = []
+        for name in names:
+            try:
+                entry = self._get_entry(name)
+                with entry.lock:
+                    if entry.model is None:
+                        self._load(entry)
+                loaded.append(name)
+            except Exception as e:
+                logger.error(f"[registry] '{name}' ön yüklemesi başarısız: {str(e)}")
+        return loaded
+
+    def warm(self, name):
+        """
+        Modeli (gerekirse yükleyerek) alır ve kayıtlı ısınma fonksiyonuyla sahte bir çıkarım yapar.
+        Returns:
+            float: Isınma süresi (saniye); ısınma fonksiyonu yoksa None
+        """
+        entry = self._get_entry(name)
+        with self.use(name) as model:
+            if entry.warmup is None:
+                entry.warmed = True
+                return None
+            started = time.perf_counter()
+            entry.warmup(model)
+            entry.warmup_seconds = time.perf_counter() - started
+            entry.warmed = True
+        logger.info(f"[registry] '{name}' ısındı: {entry.warmup_seconds:.2f}s")
+        return entry.warmup_seconds
+
+    def unload(self, name, force=False):
+        """Modeli bellekten çıkarır. Kullanımda olan model force=True verilmedikçe bırakılmaz."""
+        entry = self._get_entry(name)
+        with entry.lock:
+            if entry.model is None:
+                return True
+            if entry.refcount > 0 and not force:
+                return False
+            entry.model = None
+            entry.refcount = 0
+            entry.warmed = False
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        logger.info(f"[registry] '{name}' bellekten çıkarıldı")
+        return True
+
+    def stats(self):
+        """Her model için yüklenme durumu, referans sayısı, yükleme süresi ve bellek bilgisini döndürür."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            entry.name: {
+                "loaded": entry.loaded,
+                "refcount": entry.refcount,
+                "load_count": entry.load_count,
+                "load_seconds": entry.load_seconds,
+                "rss_delta_bytes": entry.rss_delta_bytes,
+                "param_bytes": entry.param_bytes,
+                "last_used": entry.last_used,
+                "error": entry.error,
+                "warmed": entry.warmed,
+                "warmup_seconds": entry.warmup_seconds,
+            }
+            for entry in entries
+        }
+
+
+# Süreç genelinde tek kayıt defteri
+model_registry = ModelRegistry()
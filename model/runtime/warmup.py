@@ -0,0 +1,161 @@
+# Servis başlangıcında modelleri ısıtır. Seçilen modeller önceden yüklenir ve her biri küçük bir sahte çıkarımdan
+# geçirilir; böylece ilk iş model indirme, yükleme ve ilk çıkarımın kernel hazırlığı maliyetini ödemez.
+# /api/ready her modelin ve modellerden önceki hazırlık adımının (torch/GPU yapılandırması) hazır olup olmadığını
+# bu modüldeki durumdan raporlar.
+
+import logging
+import os
+import threading
+import time
+
+from .registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Model ısınma durumları
+PENDING, LOADING, WARMING, READY, FAILED = "pending", "loading", "warming", "ready", "failed"
+
+
+def warmup_models_from_env():
+    """PRELOAD_MODELS ile seçilen modeller, ör. "whisper,diarization"."""
+    return [name.strip() for name in os.getenv("PRELOAD_MODELS", "").split(",") if name.strip()]
+
+
+def warmup_inference_enabled():
+    return os.getenv("WARMUP_INFERENCE", "1").lower() not in ("0", "false", "no")
+
+
+class WarmupState:
+    """
+    Isınma sürecinin model bazında durumu: bekliyor, yükleniyor, ısınıyor, hazır veya başarısız. Hazırlık adımı
+    varsa onun durumu da (bekliyor, hazır, başarısız) ayrıca tutulur; yoksa None.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models = {}
+        self.prepare = None
+        self.started_at = None
+        self.finished_at = None
+
+    def reset(self, names, prepare=False):
+        with self._lock:
+            self.models = {name: {"state": PENDING} for name in names}
+            self.prepare = {"state": PENDING} if prepare else None
+            self.started_at = time.time()
+            self.finished_at = None
+
+    def update(self, name, **fields):
+        with self._lock:
+            self.models.setdefault(name, {}).update(fields)
+
+    def update_prepare(self, **fields):
+        with self._lock:
+            self.prepare = dict(self.prepare or {}, **fields)
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "models": {name: dict(info) for name, info in self.models.items()},
+                "prepare": dict(self.prepare) if self.prepare is not None else None,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+warmup_state = WarmupState()
+
+
+def warmup_models(names, inference=True):
+    """
+    Modelleri sırayla yükler ve (inference=True ise) sahte çıkarımla ısıtır. Hata alan model başarısız
+    olarak işaretlenir, diğerleri ısınmaya devam eder.
+    Returns:
+        dict: Model adı -> son durum
+    """
+    warmup_state.reset(names)
+    _warm(names, inference)
+    warmup_state.finish()
+    return {name: info["state"] for name, info in warmup_state.snapshot()["models"].items()}
+
+
+def _warm(names, inference):
+    for name in names:
+        try:
+            warmup_state.update(name, state=LOADING)
+            model_registry.acquire(name)
+            model_registry.release(name)
+            load_seconds = model_registry.stats()[name]["load_seconds"]
+            warmup_state.update(name, state=WARMING, load_seconds=load_seconds)
+            warmup_seconds = model_registry.warm(name) if inference else None
+            warmup_state.update(name, state=READY, warmup_seconds=warmup_seconds)
+            print(f"[warmup] '{name}' hazır (yükleme {load_seconds or 0:.2f}s, ısınma {warmup_seconds or 0:.2f}s)")
+        except Exception as e:
+            warmup_state.update(name, state=FAILED, error=str(e))
+            logger.error(f"[warmup] '{name}' ısıtılamadı: {str(e)}")
+
+
+def _prepare_and_warm(prepare, names, inference):
+    # Durum start_warmup içinde sıfırlandı; bitiş zamanı hazırlık veya modeller başarısız olsa da yazılır
+    try:
+        if prepare is not None:
+            started = time.perf_counter()
+            try:
+                prepare()
+                warmup_state.update_prepare(state=READY, seconds=round(time.perf_counter() - started, 3))
+            except Exception as e:
+                warmup_state.update_prepare(state=FAILED, error=str(e))
+                logger.error(f"[warmup] Hazırlık adımı başarısız: {str(e)}")
+        _warm(names, inference)
+    finally:
+        warmup_state.finish()
+
+
+def start_warmup(names=None, inference=None, prepare=None):
+    """
+    Isınmayı arka plan iş parçacığında başlatır; HTTP katmanı beklemeden istek kabul eder.
+    Args:
+        prepare (callable): Modellerden önce çalışacak ağır hazırlık adımı (ör. torch import edip GPU'yu yapılandırmak)
+    """
+    names = warmup_models_from_env() if names is None else names
+    inference = warmup_inference_enabled() if inference is None else inference
+    if not names and prepare is None:
+        return None
+    # İş parçacığı başlamadan önce durum "pending" olmalı, yoksa /api/ready ısınma bitmiş sanır
+    warmup_state.reset(names, prepare=prepare is not None)
+    if names:
+        logger.info(f"Modeller ısıtılıyor: {names}")
+    thread = threading.Thread(target=_prepare_and_warm, args=(prepare, names, inference), name="model-warmup")
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def readiness():
+    """
+    Her ısıtılan modelin ve hazırlık adımının durumu, servisin iş almaya hazır olup olmadığı. Hazırlık adımı
+    bitmeden veya başarısız olduysa servis hazır değildir. Isınma sonrası bellekten çıkarılan (unload) bir model
+    tekrar hazır sayılmaz.
+    """
+    snapshot = warmup_state.snapshot()
+    registry_stats = model_registry.stats()
+    models = snapshot["models"]
+    for name, info in models.items():
+        stats = registry_stats.get(name, {})
+        if info.get("state") == READY and not stats.get("loaded"):
+            info["state"] = "unloaded"
+        info["loaded"] = stats.get("loaded", False)
+        info["warmed"] = stats.get("warmed", False)
+    prepare = snapshot["prepare"]
+    return {
+        "ready": (prepare is None or prepare.get("state") == READY)
+                 and all(info.get("state") == READY for info in models.values()),
+        "models": models,
+        "prepare": prepare,
+        "started_at": snapshot["started_at"],
+        "finished_at": snapshot["finished_at"]
+    }
@@ -0,0 +1 @@
+from .ipc import serving_role, shared_object, inference_dispatcher, HTTP_ROLE, INFERENCE_ROLE
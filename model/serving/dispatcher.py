@@ -0,0 +1,146 @@
+# Çok süreçli sunumda işleri çıkarım işçisi süreçlerine dağıtır. Başlatıcı süreçte çalışır: iş zamanlayıcısının
+# öncelikli kuyruğunda sırası gelen iş yerel IPC kuyruğuna konur, boştaki çıkarım işçisi alır ve bitirince haber
+# verir. Yeniden analizler ayrı kuyruktan, işçilerin ayrı iş parçacıklarında çalışır; zamanlayıcının saydığı iş
+# yerlerini kullanmazlar ve tüm işçilerde aynı anda en fazla MAX_CONCURRENT_REANALYSES kadar çalışırlar. İşçiler
+# modellerin ve ölçümlerin durumunu düzenli olarak bildirir; sonlanan bir işçinin üzerindeki işler hata olarak
+# kaydedilir (tamamlanan aşamalar /api/resume ile tekrar çalıştırılmadan sürdürülebilir).
+
+import logging
+import queue
+import threading
+import time
+
+from ..jobs.checkpoints import checkpoint_store
+from ..jobs.progress import compact_status, FINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Görev türleri: zamanlayıcıdan gelen tam işler ve kuyruğu beklemeyen yeniden analizler
+PROCESS_TASK = "process"
+REANALYZE_TASK = "reanalyze"
+
+
+class InferenceDispatcher:
+    """
+    Çıkarım işçilerine iş dağıtımı ve işçi durumları.
+    Args:
+        store: Sonuç deposu (başlatıcıdaki results_cache)
+        broker: İlerleme olayı yayıncısı
+        index: İçerik dizini; sonlanan işçideki işin anahtarı serbest bırakılır
+        max_reanalyses (int): Tüm çıkarım işçilerinde aynı anda çalışabilecek yeniden analiz sayısı
+    """
+
+    def __init__(self, store, broker, index, max_reanalyses=2):
+        self.store = store
+        self.broker = broker
+        self.index = index
+        self._tasks = {PROCESS_TASK: queue.Queue(), REANALYZE_TASK: queue.Queue()}
+        self._reanalysis_slots = threading.Semaphore(max(1, max_reanalyses))
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._assigned = {}
+        self._workers = {}
+
+    def process_job(self, audio_path, job_id, text_file_path=None, content_key=None, options=None):
+        """İş zamanlayıcısının çalıştırıcısı: işi çıkarım işçilerine verir ve iş bitene kadar bekler."""
+        done = threading.Event()
+        with self._lock:
+            self._pending[job_id] = done
+        self.dispatch(job_id, PROCESS_TASK, (audio_path, job_id, text_file_path, content_key, options), content_key)
+        done.wait()
+
+    def dispatch(self, job_id, kind, args, content_key=None):
+        """İşi türünün kuyruğuna koyar ve beklemeden döner (ör. iş kuyruğunu beklemeyen yeniden analizler)."""
+        self._tasks[kind].put({"job_id": job_id, "kind": kind, "args": args, "content_key": content_key})
+
+    def next_task(self, worker_id, timeout=1.0, kind=PROCESS_TASK):
+        """
+        Çıkarım işçisinin verilen türdeki sıradaki işi; timeout saniye içinde iş gelmezse None.
+        Yeniden analiz yalnızca genel sınırın altındayken verilir, yer task_done veya worker_lost ile boşalır.
+        """
+        if kind == REANALYZE_TASK and not self._reanalysis_slots.acquire(timeout=timeout):
+            return None
+        try:
+            task = self._tasks[kind].get(timeout=timeout)
+        except queue.Empty:
+            if kind == REANALYZE_TASK:
+                self._reanalysis_slots.release()
+            return None
+        with self._lock:
+            self._assigned[task["job_id"]] = (worker_id, task)
+        return task
+
+    def _finished(self, task):
+        if task["kind"] == REANALYZE_TASK:
+            self._reanalysis_slots.release()
+
+    def task_done(self, worker_id, job_id):
+        with self._lock:
+            assigned = self._assigned.pop(job_id, None)
+            done = self._pending.pop(job_id, None)
+        if assigned is not None:
+            self._finished(assigned[1])
+        if done is not None:
+            done.set()
+
+    def worker_lost(self, worker_id):
+        """
+        Sonlanan işçinin üzerindeki işleri hata olarak kaydeder ve zamanlayıcıdaki yerlerini boşaltır.
+        Returns:
+            list: Etkilenen iş kimlikleri
+        """
+        with self._lock:
+            lost = [task for owner, task in self._assigned.values() if owner == worker_id]
+            for task in lost:
+                self._assigned.pop(task["job_id"], None)
+            self._workers.pop(worker_id, None)
+
+        for task in lost:
+            job_id = task["job_id"]
+            self._finished(task)
+            try:
+                record = self.store.get(job_id) or {}
+                if record.get("status") not in FINAL_STATUSES:
+                    error_record = dict(record, status="error", running_stages=[],
+                                        error=f"Çıkarım işçisi iş sırasında sonlandı ({worker_id})",
+                                        checkpoints=checkpoint_store.stages(job_id))
+                    self.store[job_id] = error_record
+                    self.broker.publish(job_id, dict(compact_status(error_record), event="error"))
+                # İşçi sonucu kaydettikten sonra, anahtarı bırakmadan sonlanmış olabilir
+                if task["content_key"]:
+                    self.index.forget(task["content_key"], job_id)
+            except Exception as e:
+                logger.error(f"[{job_id}] Sonlanan işçinin işi kaydedilemedi: {str(e)}")
+            with self._lock:
+                done = self._pending.pop(job_id, None)
+            if done is not None:
+                done.set()
+        return [task["job_id"] for task in lost]
+
+    def report(self, worker_id, status):
+        """İşçinin düzenli durum bildirimi: pid, hazırlık, model istatistikleri ve ölçümler."""
+        with self._lock:
+            self._workers[worker_id] = dict(status, updated_at=time.time())
+
+    def _worker_status(self):
+        with self._lock:
+            return {worker_id: dict(status) for worker_id, status in self._workers.items()}
+
+    def readiness(self):
+        """En az bir çıkarım işçisinin modelleri hazırsa servis iş almaya hazırdır."""
+        workers = {
+            worker_id: dict(status.get("readiness") or {"ready": False}, pid=status.get("pid"), running=status.get("running"))
+            for worker_id, status in self._worker_status().items()
+        }
+        return {
+            "ready": any(worker["ready"] for worker in workers.values()),
+            "workers": workers
+        }
+
+    def model_stats(self):
+        """İşçi kimliği -> o işçideki model kayıt defterinin istatistikleri."""
+        return {worker_id: status.get("models", {}) for worker_id, status in self._worker_status().items()}
+
+    def worker_metrics(self):
+        """Her işçinin MetricsRegistry.export() çıktısı."""
+        return [status["metrics"] for status in self._worker_status().values() if status.get("metrics")]
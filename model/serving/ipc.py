@@ -0,0 +1,95 @@
+# Çok süreçli sunumda süreçler arası paylaşılan nesneler. Başlatıcı süreç iş kuyruğunu, sonuç deposunu, ilerleme
+# olaylarını, içerik dizinini ve çıkarım dağıtıcısını tutar; HTTP ve çıkarım işçileri bunlara yerel bir soket
+# üzerinden (multiprocessing.managers) vekil nesnelerle erişir. Tek süreçli modda modüller yerel nesneleri kullanır.
+
+import os
+import threading
+from multiprocessing.managers import BaseManager
+
+# Süreç rolleri; tek süreçli modda ve başlatıcıda rol yoktur
+HTTP_ROLE = "http"
+INFERENCE_ROLE = "inference"
+
+# Paylaşılan nesne adı -> vekil üzerinden çağrılabilen metotlar
+SHARED_TYPES = {
+    "results": ("put", "get", "get_status", "find_by_content_key", "stats",
+                "__getitem__", "__setitem__", "__contains__"),
+    "progress": ("publish", "events_since", "last_seq", "wait"),
+    "content_index": ("get", "claim", "forget"),
+    "scheduler": ("submit", "position", "depth", "estimated_start", "stats"),
+    "dispatcher": ("dispatch", "next_task", "task_done", "report", "readiness", "model_stats", "worker_metrics")
+}
+
+
+class ServingManager(BaseManager):
+    """İşçi süreçlerinin başlatıcıdaki paylaşılan nesnelere bağlandığı yönetici."""
+
+
+for _typeid, _exposed in SHARED_TYPES.items():
+    ServingManager.register(_typeid, exposed=_exposed)
+
+
+def server_manager(objects, address, authkey):
+    """
+    Başlatıcı süreçte paylaşılan nesneleri sunan yönetici.
+    Args:
+        objects (dict): SHARED_TYPES adı -> yerel nesne
+        address (tuple): (host, port); port 0 ise boş bir port seçilir
+        authkey (bytes): İşçilerin bağlanırken kullandığı anahtar
+    """
+    class _ServerManager(ServingManager):
+        pass
+
+    for typeid, obj in objects.items():
+        _ServerManager.register(typeid, callable=lambda obj=obj: obj, exposed=SHARED_TYPES[typeid])
+    return _ServerManager(address=address, authkey=authkey)
+
+
+def serving_role():
+    """Bu sürecin çok süreçli moddaki rolü ("http", "inference"), diğer durumlarda None."""
+    return os.getenv("SERVING_ROLE") or None
+
+
+def manager_address():
+    host, port = os.environ["SERVING_MANAGER_ADDRESS"].rsplit(":", 1)
+    return host, int(port)
+
+
+_client = None
+_client_lock = threading.Lock()
+_dispatcher = None
+
+
+def _connect():
+    global _client
+    with _client_lock:
+        if _client is None:
+            manager = ServingManager(address=manager_address(), authkey=bytes.fromhex(os.environ["SERVING_AUTHKEY"]))
+            manager.connect()
+            _client = manager
+        return _client
+
+
+def shared_object(typeid, factory):
+    """
+    İşçi süreçlerinde başlatıcıdaki paylaşılan nesnenin vekilini, diğer durumlarda factory() ile oluşturulan
+    yerel nesneyi döndürür. Vekil iş parçacıkları arasında paylaşılabilir (her iş parçacığı kendi bağlantısını açar).
+    """
+    if serving_role() in (HTTP_ROLE, INFERENCE_ROLE):
+        return getattr(_connect(), typeid)()
+    return factory()
+
+
+def inference_dispatcher():
+    """İşçi süreçlerinde çıkarım dağıtıcısının vekili; tek süreçli modda None."""
+    global _dispatcher
+    if serving_role() not in (HTTP_ROLE, INFERENCE_ROLE):
+        return None
+    with _client_lock:
+        dispatcher = _dispatcher
+    if dispatcher is None:
+        dispatcher = _connect().dispatcher()
+        with _client_lock:
+            _dispatcher = _dispatcher or dispatcher
+            dispatcher = _dispatcher
+    return dispatcher
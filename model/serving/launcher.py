@@ -0,0 +1,146 @@
+# Çok süreçli sunum başlatıcısı. Paylaşılan iş kuyruğunu, sonuç deposunu ve ilerleme olaylarını tutar, bunları
+# yerel bir sokette (yalnızca 127.0.0.1, rastgele anahtarla) işçilere sunar; HTTP işçi havuzunu ve modelleri tutan
+# çıkarım işçi havuzunu başlatır ve sonlanan işçileri yeniden başlatır. HTTP işçileri model yüklemediği için
+# çıkarım çekirdekleri doldururken API yanıt vermeye devam eder.
+#
+# Kullanım: SERVING_MODE=multiprocess python run.py
+#           HTTP_WORKERS=4 INFERENCE_WORKERS=2 python -m model.serving.launcher
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+# Çevre değişkenlerini yükle (işçiler başlatıcının ortamını devralır)
+load_dotenv()
+
+from .ipc import server_manager
+from .workers import http_worker, inference_worker, _configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Bu süreden kısa yaşayan işçi yeniden başlatılmadan önce beklenir (ör. açılışta hata veren işçi döngüye girmesin)
+MIN_WORKER_LIFETIME_SECONDS = 5.0
+RESTART_DELAY_SECONDS = 5.0
+
+
+def serving_mode():
+    """SERVING_MODE: single (Flask geliştirme sunucusu, varsayılan) veya multiprocess."""
+    mode = os.getenv("SERVING_MODE", "single").lower()
+    if mode not in ("single", "multiprocess"):
+        raise ValueError(f"Geçersiz SERVING_MODE: {mode} (seçenekler: single, multiprocess)")
+    return mode
+
+
+def serve(host="0.0.0.0", port=5000, http_workers=None, inference_workers=None):
+    """
+    HTTP ve çıkarım işçi havuzlarını başlatır, Ctrl+C veya SIGTERM gelene kadar işçileri izler.
+    Args:
+        http_workers (int): HTTP işçi süreci sayısı (HTTP_WORKERS, varsayılan 4)
+        inference_workers (int): Çıkarım işçi süreci sayısı (INFERENCE_WORKERS, varsayılan 1); her biri modelleri
+            ayrı yükler, bellek (ve GPU belleği) buna göre planlanmalı
+    """
+    _configure_logging()
+    http_workers = max(1, http_workers or int(os.getenv("HTTP_WORKERS", "4")))
+    inference_workers = max(1, inference_workers or int(os.getenv("INFERENCE_WORKERS", "1")))
+    jobs_per_worker = max(1, int(os.getenv("MAX_CONCURRENT_JOBS", "1")))
+    # Genel yeniden analiz sınırı dağıtıcıda uygulanır; her işçi bu kadar ayrı iş parçacığıyla yeniden analiz alabilir
+    max_reanalyses = max(1, int(os.getenv("MAX_CONCURRENT_REANALYSES", "2")))
+
+    # Paylaşılan nesneler bu süreçte yerel olarak oluşturulur (SERVING_ROLE ayarlı değil)
+    from ..jobs.processor import results_cache
+    from ..jobs.progress import progress_broker
+    from ..jobs.dedup import content_index
+    from ..jobs.scheduler import job_scheduler
+    from .dispatcher import InferenceDispatcher
+
+    dispatcher = InferenceDispatcher(results_cache, progress_broker, content_index, max_reanalyses=max_reanalyses)
+    # Zamanlayıcı önceliği, sıra ve bekleme tahminlerini yönetmeye devam eder; sırası gelen işi çıkarım işçisine verir
+    job_scheduler.runner = dispatcher.process_job
+    job_scheduler.worker_count = inference_workers * jobs_per_worker
+
+    authkey = os.urandom(32)
+    manager = server_manager({
+        "results": results_cache,
+        "progress": progress_broker,
+        "content_index": content_index,
+        "scheduler": job_scheduler,
+        "dispatcher": dispatcher
+    }, ("127.0.0.1", 0), authkey)
+    manager_server = manager.get_server()
+    threading.Thread(target=manager_server.serve_forever, name="serving-manager", daemon=True).start()
+    os.environ["SERVING_MANAGER_ADDRESS"] = f"{manager_server.address[0]}:{manager_server.address[1]}"
+    os.environ["SERVING_AUTHKEY"] = authkey.hex()
+
+    # Tüm HTTP işçileri aynı soketten bağlantı kabul eder
+    listener = socket.create_server((host, port), backlog=128)
+
+    context = multiprocessing.get_context("spawn")
+    specs = {f"inference-{index}": (inference_worker, (f"inference-{index}", jobs_per_worker, max_reanalyses))
+             for index in range(inference_workers)}
+    specs.update({f"http-{index}": (http_worker, (listener, host, port)) for index in range(http_workers)})
+    processes = {}
+    started_at = {}
+    restart_at = {}
+
+    def start(name):
+        target, args = specs[name]
+        # İşçiler kendi alt süreçlerini (ör. parçalı transkripsiyon havuzu) açabilsin diye daemon değil
+        process = context.Process(target=target, args=args, name=name)
+        process.start()
+        processes[name] = process
+        started_at[name] = time.time()
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    for name in specs:
+        start(name)
+    print(f"Çok süreçli sunum başladı: http://{host}:{port}, {http_workers} HTTP işçisi, "
+          f"{inference_workers} çıkarım işçisi (işçi başına {jobs_per_worker} iş)")
+    logger.info(f"Çok süreçli sunum: {http_workers} HTTP, {inference_workers} çıkarım işçisi")
+
+    try:
+        while True:
+            time.sleep(1.0)
+            now = time.time()
+            for name, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                if name not in restart_at:
+                    logger.error(f"'{name}' işçisi sonlandı (çıkış kodu {process.exitcode})")
+                    if name.startswith("inference"):
+                        lost = dispatcher.worker_lost(name)
+                        if lost:
+                            logger.error(f"'{name}' üzerindeki işler hata olarak kaydedildi: {lost}")
+                    short_lived = now - started_at[name] < MIN_WORKER_LIFETIME_SECONDS
+                    restart_at[name] = now + (RESTART_DELAY_SECONDS if short_lived else 0.0)
+                if now >= restart_at[name]:
+                    del restart_at[name]
+                    print(f"'{name}' işçisi yeniden başlatılıyor")
+                    start(name)
+    except (KeyboardInterrupt, SystemExit):
+        print("Çok süreçli sunum kapatılıyor...")
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join(timeout=10)
+        listener.close()
+        manager_server.stop_event.set()
+
+
+def main():
+    serve(port=int(os.getenv("PORT", "5000")))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
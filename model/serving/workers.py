@@ -0,0 +1,133 @@
+# Çok süreçli sunumun işçi süreçleri. HTTP işçileri başlatıcının açtığı ortak soketten istek kabul eder ve model
+# yüklemez; çıkarım işçileri modelleri bir kez yükleyip tutar ve işleri dağıtıcının kuyruğundan alır. Her iki tür de
+# "spawn" ile başlatılır, bu modül üst düzeyde ağır modül import etmez.
+
+import logging
+import os
+import threading
+import time
+import traceback
+
+from .ipc import HTTP_ROLE, INFERENCE_ROLE
+
+logger = logging.getLogger(__name__)
+
+# Çıkarım işçisinin durum bildirimi aralığı (saniye)
+HEARTBEAT_SECONDS = 5.0
+
+
+def _configure_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("model_service.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def http_worker(listener, host, port):
+    """
+    Flask uygulamasını çok iş parçacıklı WSGI sunucusuyla ortak dinleme soketinde çalıştırır.
+    Args:
+        listener (socket.socket): Başlatıcının açtığı dinleme soketi; bağlantıları işletim sistemi işçilere dağıtır
+    """
+    # Rol, paylaşılan nesneler import sırasında oluşturulduğu için app import edilmeden önce ayarlanmalı
+    os.environ["SERVING_ROLE"] = HTTP_ROLE
+    from werkzeug.serving import make_server
+    from ..app import app
+
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    print(f"HTTP işçisi hazır (pid {os.getpid()})")
+    server.serve_forever()
+
+
+def _worker_status(running):
+    from ..runtime.registry import model_registry
+    from ..runtime.metrics import metrics
+    from ..runtime.warmup import readiness
+
+    return {
+        "pid": os.getpid(),
+        "running": len(running),
+        "readiness": readiness(),
+        "models": model_registry.stats(),
+        "metrics": metrics.export()
+    }
+
+
+def inference_worker(worker_id, concurrency, reanalyses=1):
+    """
+    Modelleri tutan çıkarım işçisi. concurrency kadar iş parçacığı dağıtıcıdan iş, reanalyses kadar ayrı iş
+    parçacığı yeniden analiz alır; modeller süreç içindeki kayıt defterinde bir kez yüklenir ve tüm işler
+    tarafından paylaşılır.
+    """
+    # Ortam değişkenleri (.env dahil) başlatıcıdan devralınır
+    os.environ["SERVING_ROLE"] = INFERENCE_ROLE
+    _configure_logging()
+
+    from ..jobs.processor import process_job, reanalyze_job
+    from ..runtime.gpu import configure_gpu
+    from ..runtime.warmup import start_warmup
+    from .ipc import inference_dispatcher
+    from .dispatcher import PROCESS_TASK, REANALYZE_TASK
+
+    dispatcher = inference_dispatcher()
+    runners = {PROCESS_TASK: process_job, REANALYZE_TASK: reanalyze_job}
+    running = set()
+    running_lock = threading.Lock()
+
+    # GPU yapılandırması ve PRELOAD_MODELS ile seçilen modellerin ısınması arka planda; işler bu sırada da alınır
+    start_warmup(prepare=configure_gpu)
+
+    def report():
+        with running_lock:
+            current = set(running)
+        try:
+            dispatcher.report(worker_id, _worker_status(current))
+        except Exception as e:
+            logger.warning(f"[{worker_id}] Durum bildirilemedi: {str(e)}")
+
+    def heartbeat():
+        while True:
+            report()
+            time.sleep(HEARTBEAT_SECONDS)
+
+    def task_loop(kind):
+        while True:
+            try:
+                task = dispatcher.next_task(worker_id, HEARTBEAT_SECONDS, kind)
+            except (EOFError, OSError) as e:
+                # Başlatıcı kapandı, işçi de sonlanır
+                logger.error(f"[{worker_id}] Dağıtıcı bağlantısı koptu: {str(e)}")
+                return
+            if task is None:
+                continue
+            job_id = task["job_id"]
+            with running_lock:
+                running.add(job_id)
+            print(f"[{job_id}] Çıkarım işçisi işi aldı: {worker_id} (pid {os.getpid()})")
+            try:
+                runners[task["kind"]](*task["args"])
+            except Exception as e:
+                # process_job hataları kendisi kaydeder, buraya yalnızca beklenmeyen hatalar düşer
+                logger.error(f"[{job_id}] Çıkarım işçisi hatası: {str(e)}\n{traceback.format_exc()}")
+            finally:
+                with running_lock:
+                    running.discard(job_id)
+                dispatcher.task_done(worker_id, job_id)
+                report()
+
+    threading.Thread(target=heartbeat, name=f"{worker_id}-heartbeat", daemon=True).start()
+    # Yeniden analizler iş parçacıklarını zamanlayıcının saydığı iş yerleriyle paylaşmaz
+    loops = [threading.Thread(target=task_loop, args=(PROCESS_TASK,), name=f"{worker_id}-job-{index}")
+             for index in range(max(1, concurrency))]
+    loops += [threading.Thread(target=task_loop, args=(REANALYZE_TASK,), name=f"{worker_id}-reanalysis-{index}")
+              for index in range(max(1, reanalyses))]
+    for loop in loops:
+        loop.start()
+    print(f"Çıkarım işçisi hazır: {worker_id} (pid {os.getpid()}, eşzamanlı iş: {max(1, concurrency)}, "
+          f"yeniden analiz: {max(1, reanalyses)})")
+    for loop in loops:
+        loop.join()
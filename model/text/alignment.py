@@ -1,129 +1,550 @@
 # Transkripsiyon ve konuşmacı verilerini eşleştiren fonksiyonları içerir. Her metin parçasını ilgili konuşmacıyla ilişkilendirir.
 
 import logging
+from bisect import bisect_left, bisect_right
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-def align_transcription_with_speakers(transcription, chunks, speakers):
-    try:
-        print(f"Transkripsiyon ve konuşmacı birleştirme başlatılıyor")
-        print(f"Transkripsiyon: {transcription[:100]}...")
-        print(f"Chunk sayısı: {len(chunks) if chunks else 0}")
-        print(f"Konuşmacı segment sayısı: {len(speakers)}")
-        
-        if not chunks or not speakers:
-            print(f"Chunk veya speaker verisi eksik. Birleştirme yapılamıyor.")
-            if not chunks and transcription:
-                # Eğer chunk yok ama transkripsiyon varsa, tüm transkripsiyon için default speaker ata
-                print(f"Chunk yok ama transkripsiyon var. Tüm metni SPEAKER_01'e atıyorum.")
-                return [{
-                    "speaker": "SPEAKER_01",
-                    "text": transcription,
-                    "start": 0.0,
-                    "end": 60.0  # Varsayılan bir süre
-                }]
-            return []
-        
-        aligned_text = []
-        
-        # Eğer transkripsiyon boş ama chunk varsa işleme devam et
-        if not transcription and chunks:
-            print(f"Transkripsiyon metni boş ama {len(chunks)} chunk mevcut.")
-        
-        for chunk in chunks:
-            try:
-                chunk_start = chunk["timestamp"][0]
-                chunk_end = chunk["timestamp"][1]
-                chunk_text = chunk["text"].strip()
-                
-                print(f"Segment işleniyor: {chunk_start:.2f}-{chunk_end:.2f}, Metin: {chunk_text[:30]}...")
-                
-                # Belirli bir zaman aralığıyla en çok örtüşen konuşmacıyı bul
-                max_overlap = 0
-                best_speaker = None
-                
-                for speaker_segment in speakers:
-                    s_start = speaker_segment["start"]
-                    s_end = speaker_segment["end"]
-                    
-                    # Zaman aralıkları arasındaki örtüşmeyi hesapla
-                    overlap_start = max(chunk_start, s_start)
-                    overlap_end = min(chunk_end, s_end)
-                    overlap = max(0, overlap_end - overlap_start)
-                    
-                    if overlap > max_overlap:
-                        max_overlap = overlap
-                        best_speaker = speaker_segment["speaker"]
-                
-                # Eğer eşleşme bulunamasa bile, varsayılan olarak en yakın konuşmacıyı bul
-                if not best_speaker and speakers:
-                    # En yakın konuşmacıyı bul (zaman mesafesine göre)
-                    min_distance = float('inf')
-                    for speaker_segment in speakers:
-                        s_start = speaker_segment["start"]
-                        s_end = speaker_segment["end"]
-                        
-                        # Segment öncesindeyse başlangıç mesafesini al
-                        if chunk_end <= s_start:
-                            distance = s_start - chunk_end
-                        # Segment sonrasındaysa bitiş mesafesini al
-                        elif chunk_start >= s_end:
-                            distance = chunk_start - s_end
-                        # Örtüşme varsa mesafe 0
-                        else:
-                            distance = 0
-                        
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_speaker = speaker_segment["speaker"]
-                    
-                    print(f"Direkt eşleşme bulunamadı, en yakın konuşmacı: {best_speaker}, Mesafe: {min_distance:.2f}s")
-                
-                # Varsayılan olarak ilk konuşmacıyı kullan eğer hala eşleşme yoksa
-                if not best_speaker and speakers:
-                    best_speaker = speakers[0]["speaker"]
-                    print(f"Yakınlık eşleşmesi de bulunamadı, varsayılan konuşmacı: {best_speaker}")
-                
-                # Metin boş olsa bile segment ekle (sadece zaman bilgisi için)
-                if best_speaker:
-                    text_to_use = chunk_text if chunk_text else "[sessiz segment]"
-                    aligned_text.append({
-                        "speaker": best_speaker,
-                        "text": text_to_use,
-                        "start": chunk_start,
-                        "end": chunk_end
-                    })
-                    print(f"Segment eklendi: {best_speaker}, Metin: {text_to_use[:20]}...")
+# Bu sayıdan fazla parça içeren transkriptlerde (ALIGNMENT_MODE=auto) vektörel eşleştirme kullanılır
+VECTORIZED_ALIGNMENT_MIN_CHUNKS = 2000
+
+def _chunk_bounds(chunk):
+    chunk_start = chunk["timestamp"][0]
+    chunk_end = chunk["timestamp"][1]
+    # Whisper son parçada bitiş zamanını None döndürebilir; bu parçalar eşleştirilemez
+    if chunk_start is None or chunk_end is None:
+        raise ValueError(f"Eksik zaman damgası: {chunk['timestamp']}")
+    return chunk_start, chunk_end, chunk["text"].strip()
+
+def _assign_speaker_linear(chunk_start, chunk_end, speakers):
+    """
+    Tüm konuşmacı segmentlerini tarayarak parçaya en çok örtüşen konuşmacıyı, örtüşme yoksa en yakın
+    konuşmacıyı bulur. O(segment sayısı); referans davranış budur.
+    Returns:
+        tuple: (segment indeksi veya None, örtüşme süresi)
+    """
+    # Belirli bir zaman aralığıyla en çok örtüşen konuşmacıyı bul
+    max_overlap = 0
+    best_index = None
+
+    for index, speaker_segment in enumerate(speakers):
+        s_start = speaker_segment["start"]
+        s_end = speaker_segment["end"]
+
+        # Zaman aralıkları arasındaki örtüşmeyi hesapla
+        overlap_start = max(chunk_start, s_start)
+        overlap_end = min(chunk_end, s_end)
+        overlap = max(0, overlap_end - overlap_start)
+
+        if overlap > max_overlap:
+            max_overlap = overlap
+            best_index = index
+
+    if best_index is not None:
+        return best_index, max_overlap
+
+    # Eğer eşleşme bulunamasa bile, varsayılan olarak en yakın konuşmacıyı bul (zaman mesafesine göre)
+    min_distance = float('inf')
+    for index, speaker_segment in enumerate(speakers):
+        s_start = speaker_segment["start"]
+        s_end = speaker_segment["end"]
+
+        # Segment öncesindeyse başlangıç mesafesini al
+        if chunk_end <= s_start:
+            distance = s_start - chunk_end
+        # Segment sonrasındaysa bitiş mesafesini al
+        elif chunk_start >= s_end:
+            distance = chunk_start - s_end
+        # Örtüşme varsa mesafe 0
+        else:
+            distance = 0
+
+        if distance < min_distance:
+            min_distance = distance
+            best_index = index
+
+    return best_index, 0
+
+
+class _RangeMin:
+    """Sabit bir dizide [lo, hi] aralığının en küçük değeri (sparse table): O(m log m) kurulum, O(1) sorgu."""
+
+    def __init__(self, values):
+        self.levels = [list(values)]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append([min(previous[i], previous[i + width]) for i in range(len(previous) - width)])
+            width *= 2
+
+    def query(self, lo, hi):
+        level = (hi - lo + 1).bit_length() - 1
+        row = self.levels[level]
+        return min(row[lo], row[hi - (1 << level) + 1])
+
+
+class _IntervalNode:
+    """
+    Merkezli aralık ağacı düğümü: merkez noktayı içeren segmentler başlangıca göre artan ve bitişe göre azalan
+    sırada tutulur; merkezin tamamen solunda/sağında kalanlar alt ağaçlardadır.
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, items):
+        endpoints = sorted(value for start, end, _ in items for value in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        here = [item for item in items if item[0] <= self.center <= item[1]]
+        left = [item for item in items if item[1] < self.center]
+        right = [item for item in items if item[0] > self.center]
+        self.by_start = sorted(here, key=lambda item: item[0])
+        self.by_end = sorted(here, key=lambda item: item[1], reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+
+class SpeakerIndex:
+    """
+    Konuşmacı segmentleri üzerinde indeks; sonuçlar _assign_speaker_linear ile birebir aynıdır.
+    Örtüşen segmentler merkezli aralık ağacıyla bulunur, her parça için yalnızca gerçekten örtüşen segmentler
+    ziyaret edilir (O(log m + k)); erken başlayıp çok uzun süren bir segment diğer sorguları yavaşlatmaz.
+    En yakın segment araması sıralı başlangıç/bitiş dizilerinde ikili arama ile yapılır. Mesafeler doğrusal
+    taramadaki ifadeyle hesaplanır; kayan nokta hesabında eşit çıkan tüm mesafeler arasından listede önce
+    gelen segment aralık minimumu ile seçilir.
+    """
+
+    def __init__(self, speakers):
+        self.speakers = speakers
+        # Süresi negatif segment varsa indeksin varsayımları geçersizdir
+        self.valid = all(segment["end"] >= segment["start"] for segment in speakers)
+
+        # Sıfır süreli segmentler hiçbir parçayla örtüşmez; yalnızca en yakın segment aramasında kullanılır
+        items = [(segment["start"], segment["end"], index) for index, segment in enumerate(speakers)]
+        positive = [item for item in items if item[1] > item[0]]
+        self.tree = _IntervalNode(positive) if positive and self.valid else None
+
+        order = sorted(range(len(speakers)), key=lambda i: speakers[i]["start"])
+        self.starts = [speakers[i]["start"] for i in order]
+        end_order = sorted(range(len(speakers)), key=lambda i: speakers[i]["end"])
+        self.sorted_ends = [speakers[i]["end"] for i in end_order]
+        zero_order = sorted((item for item in items if item[1] == item[0]), key=lambda item: item[0])
+        self.zero_starts = [start for start, _, _ in zero_order]
+
+        # Sıralı dizilerin bir aralığındaki en küçük özgün liste indeksi
+        self.min_index_by_start = _RangeMin(order) if order else None
+        self.min_index_by_end = _RangeMin(end_order) if end_order else None
+        self.min_index_zero = _RangeMin([index for _, _, index in zero_order]) if zero_order else None
+
+    def _best_overlap(self, chunk_start, chunk_end):
+        best_index = None
+        max_overlap = 0
+        nodes = [self.tree] if self.tree is not None else []
+        while nodes:
+            node = nodes.pop()
+            if chunk_end <= node.center:
+                # Sorgu merkezin solunda: merkezdeki segmentlerden parça bitişinden önce başlayanlar örtüşür
+                candidates = []
+                for item in node.by_start:
+                    if item[0] >= chunk_end:
+                        break
+                    candidates.append(item)
+                children = (node.left,)
+            elif chunk_start >= node.center:
+                # Sorgu merkezin sağında: parça başlangıcından sonra bitenler örtüşür
+                candidates = []
+                for item in node.by_end:
+                    if item[1] <= chunk_start:
+                        break
+                    candidates.append(item)
+                children = (node.right,)
+            else:
+                # Merkez parçanın içinde: merkezdeki tüm segmentler örtüşür
+                candidates = node.by_start
+                children = (node.left, node.right)
+            for s_start, s_end, index in candidates:
+                overlap = min(chunk_end, s_end) - max(chunk_start, s_start)
+                if overlap > max_overlap or (overlap == max_overlap and overlap > 0 and index < best_index):
+                    max_overlap = overlap
+                    best_index = index
+            nodes.extend(child for child in children if child is not None)
+        return best_index, max_overlap
+
+    def _nearest(self, chunk_start, chunk_end):
+        # Her gruptaki en küçük mesafe ve o mesafeyi veren segmentlerden listede önce gelen
+        candidates = []
+
+        # Parçanın içinde kalan sıfır süreli segmentler: örtüşme yok ama mesafe 0
+        lo = bisect_right(self.zero_starts, chunk_start)
+        hi = bisect_left(self.zero_starts, chunk_end) - 1
+        if lo <= hi:
+            candidates.append((0, self.min_index_zero.query(lo, hi)))
+
+        # Parçadan sonra başlayanlar: mesafe başlangıçla birlikte artar, eşit mesafeliler ardışık bir aralıktır
+        after = bisect_left(self.starts, chunk_end)
+        if after < len(self.starts):
+            distance = self.starts[after] - chunk_end
+            lo, hi = after, len(self.starts) - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self.starts[mid] - chunk_end == distance:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            candidates.append((distance, self.min_index_by_start.query(after, lo)))
+
+        # Parçadan önce bitenler: mesafe bitiş geriye gittikçe artar
+        before = bisect_right(self.sorted_ends, chunk_start) - 1
+        if before >= 0:
+            distance = chunk_start - self.sorted_ends[before]
+            lo, hi = 0, before
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if chunk_start - self.sorted_ends[mid] == distance:
+                    hi = mid
                 else:
-                    print(f"Eşleşme bulunamadı, segment atlanıyor")
-            except Exception as e:
-                print(f"Segment işleme hatası: {str(e)}")
-                import traceback
-                print(f"Segment hata detayları:\n{traceback.format_exc()}")
-        
-        # Sonuç boşsa ve tam transkripsiyon varsa, tüm metni tek bir segmente dönüştür
-        if not aligned_text and transcription:
-            print(f"Eşleştirilmiş segment oluşturulamadı, tüm transkripsiyon metni tek segment olarak ekleniyor")
-            aligned_text.append({
-                "speaker": "SPEAKER_01",
-                "text": transcription,
-                "start": 0.0,
-                "end": 60.0  # Varsayılan bir süre
-            })
-        
-        print(f"Birleştirme tamamlandı. Toplam {len(aligned_text)} segment oluşturuldu.")
-        return aligned_text
-    
+                    lo = mid + 1
+            candidates.append((distance, self.min_index_by_end.query(lo, before)))
+
+        if not candidates:
+            return None
+        min_distance = min(distance for distance, _ in candidates)
+        return min(index for distance, index in candidates if distance == min_distance)
+
+    def assign(self, chunk_start, chunk_end):
+        """
+        Returns:
+            tuple: (segment indeksi veya None, örtüşme süresi) - _assign_speaker_linear ile aynı sonuç
+        """
+        if not self.valid or not chunk_end > chunk_start:
+            # Sıfır/negatif süreli parçalar nadirdir, referans tarama ile işlenir
+            return _assign_speaker_linear(chunk_start, chunk_end, self.speakers)
+
+        best_index, max_overlap = self._best_overlap(chunk_start, chunk_end)
+        if best_index is not None:
+            return best_index, max_overlap
+        return self._nearest(chunk_start, chunk_end), 0
+
+
+class _VectorRangeMin:
+    """_RangeMin'in NumPy karşılığı; birçok [lo, hi] aralığı tek çağrıda sorgulanır."""
+
+    def __init__(self, values):
+        self.levels = [np.asarray(values, dtype=np.int64)]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(np.minimum(previous[:-width], previous[width:]))
+            width *= 2
+
+    def query(self, lo, hi):
+        result = np.empty(len(lo), dtype=np.int64)
+        # Aralık uzunluğunun log2 tabanı; her seviye ayrı sorgulanır (en fazla log m seviye)
+        level = np.frexp((hi - lo + 1).astype(np.float64))[1] - 1
+        for value in np.unique(level).tolist():
+            rows = level == value
+            row = self.levels[value]
+            result[rows] = np.minimum(row[lo[rows]], row[hi[rows] - (1 << value) + 1])
+        return result
+
+
+class VectorizedSpeakerIndex:
+    """
+    SpeakerIndex'in NumPy karşılığı; sonuçlar _assign_speaker_linear ile birebir aynıdır. Segment
+    başlangıç/bitişleri bitişik float64 dizilerde tutulur. En uzun long_segments segment ayrı tutulur ve her
+    parçayla doğrudan karşılaştırılır; kalanlar için her parça bloğunun aday penceresi searchsorted ile bulunur,
+    böylece erken başlayan uzun bir segment pencereleri genişletmez. Örtüşmeler (parça x aday) matrisinde toplu
+    hesaplanır ve satır bazında en büyük örtüşme seçilir. Penceresi max_window'dan geniş parçalar SpeakerIndex
+    ile tam olarak eşleştirilir. En yakın konuşmacı yedeği SpeakerIndex ile aynı şekilde (eşit mesafeli
+    aralık + aralık minimumu) vektörel yapılır. Eşitlikte listede önce gelen segment seçilir.
+    """
+
+    def __init__(self, speakers, long_segments=64):
+        self.speakers = speakers
+        starts = np.array([segment["start"] for segment in speakers], dtype=np.float64)
+        ends = np.array([segment["end"] for segment in speakers], dtype=np.float64)
+        self.valid = bool(np.all(ends >= starts))
+
+        # En uzun segmentler pencere dışında tutulur
+        durations = ends - starts
+        is_long = np.zeros(len(starts), dtype=bool)
+        if self.valid and len(starts) > long_segments:
+            threshold = np.sort(durations)[len(starts) - long_segments - 1]
+            is_long = durations > threshold
+        self.long_index = np.flatnonzero(is_long)
+        self.long_starts = starts[self.long_index]
+        self.long_ends = ends[self.long_index]
+
+        short_index = np.flatnonzero(~is_long)
+        self.order = short_index[np.argsort(starts[short_index], kind="stable")]
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.prefix_max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+        # En yakın segment araması tüm segmentler üzerinde yapılır
+        start_order = np.argsort(starts, kind="stable")
+        self.all_starts = starts[start_order]
+        end_order = np.argsort(ends, kind="stable")
+        self.sorted_ends = ends[end_order]
+        self.min_index_by_start = _VectorRangeMin(start_order) if len(starts) else None
+        self.min_index_by_end = _VectorRangeMin(end_order) if len(ends) else None
+
+        # Dizilerle hesaplanamayan parçalar için (ör. sıfır süreli) satır bazlı yedek, gerektiğinde oluşturulur
+        self._fallback = None
+
+    def _nearest(self, row_starts, row_ends, row_zero, no_index):
+        segment_count = len(self.all_starts)
+
+        # Parçadan sonra başlayanlar: eşit mesafeliler ardışık bir aralıktır, aralığın sonu ikili aramayla bulunur
+        after = np.searchsorted(self.all_starts, row_ends, side="left")
+        has_after = after < segment_count
+        after = np.minimum(after, segment_count - 1)
+        after_distance = np.where(has_after, self.all_starts[after] - row_ends, np.inf)
+        lo, hi = after.copy(), np.where(has_after, segment_count - 1, after)
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi + 1) // 2
+            equal = (self.all_starts[mid] - row_ends) == after_distance
+            lo = np.where(active & equal, mid, lo)
+            hi = np.where(active & ~equal, mid - 1, hi)
+        after_index = np.where(has_after, self.min_index_by_start.query(after, lo), no_index)
+
+        # Parçadan önce bitenler: aralığın başı ikili aramayla bulunur
+        before = np.searchsorted(self.sorted_ends, row_starts, side="right") - 1
+        has_before = before >= 0
+        before = np.maximum(before, 0)
+        before_distance = np.where(has_before, row_starts - self.sorted_ends[before], np.inf)
+        lo, hi = np.zeros_like(before), before.copy()
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            equal = (row_starts - self.sorted_ends[mid]) == before_distance
+            hi = np.where(active & equal, mid, hi)
+            lo = np.where(active & ~equal, mid + 1, lo)
+        before_index = np.where(has_before, self.min_index_by_end.query(lo, before), no_index)
+
+        zero_distance = np.where(row_zero != no_index, 0.0, np.inf)
+        distances = np.vstack([zero_distance, after_distance, before_distance])
+        indices = np.vstack([row_zero, after_index, before_index])
+        min_distance = distances.min(axis=0)
+        winner = np.where(distances == min_distance, indices, no_index).min(axis=0)
+        return np.where(winner == no_index, -1, winner)
+
+    def assign_many(self, chunk_starts, chunk_ends, block_size=4096, max_window=256):
+        chunk_starts = np.asarray(chunk_starts, dtype=np.float64)
+        chunk_ends = np.asarray(chunk_ends, dtype=np.float64)
+        count = len(chunk_starts)
+        best = np.full(count, -1, dtype=np.int64)
+        overlaps = np.zeros(count, dtype=np.float64)
+        if count == 0 or len(self.speakers) == 0:
+            return [(None, 0)] * count
+
+        segment_count = len(self.starts)
+        no_index = np.iinfo(np.int64).max
+
+        # Aday pencere: başlangıcı parça bitişinden önce, bitişi parça başlangıcından sonra olabilecek segmentler
+        hi = np.searchsorted(self.starts, chunk_ends, side="left")
+        lo = np.searchsorted(self.prefix_max_end, chunk_starts, side="right")
+        window = np.maximum(hi - lo, 0)
+
+        fast = (chunk_ends > chunk_starts) & (window <= max_window) if self.valid else np.zeros(count, dtype=bool)
+        zero_index = np.full(count, no_index, dtype=np.int64)
+
+        for block_start in range(0, count, block_size):
+            rows = np.arange(block_start, min(block_start + block_size, count))
+            rows = rows[fast[rows]]
+            if len(rows) == 0:
+                continue
+            width = int(window[rows].max())
+            positions = lo[rows, None] + np.arange(width)[None, :]
+            in_window = positions < hi[rows, None]
+            positions = np.clip(positions, 0, max(segment_count - 1, 0))
+
+            # Penceredeki segmentlerin yanına uzun segmentler eklenir (her satır için hepsi aday)
+            long_count = len(self.long_index)
+            seg_starts = np.hstack([self.starts[positions], np.broadcast_to(self.long_starts, (len(rows), long_count))])
+            seg_ends = np.hstack([self.ends[positions], np.broadcast_to(self.long_ends, (len(rows), long_count))])
+            seg_index = np.hstack([self.order[positions], np.broadcast_to(self.long_index, (len(rows), long_count))])
+            in_window = np.hstack([in_window, np.ones((len(rows), long_count), dtype=bool)])
+            if seg_index.shape[1] == 0:
+                continue
+            block_starts = chunk_starts[rows, None]
+            block_ends = chunk_ends[rows, None]
+
+            overlap = np.minimum(block_ends, seg_ends) - np.maximum(block_starts, seg_starts)
+            overlap = np.where(in_window, overlap, -np.inf)
+            row_max = overlap.max(axis=1)
+            has_overlap = row_max > 0
+
+            # En büyük örtüşmeye sahip segmentlerden listede önce geleni
+            is_best = (overlap == row_max[:, None]) & has_overlap[:, None]
+            block_best = np.where(is_best, seg_index, no_index).min(axis=1)
+            best[rows[has_overlap]] = block_best[has_overlap]
+            overlaps[rows[has_overlap]] = row_max[has_overlap]
+
+            # Parçanın içinde kalan sıfır süreli segmentler: örtüşme yok ama mesafe 0
+            is_zero = in_window & (overlap <= 0) & (seg_starts < block_ends) & (seg_ends > block_starts)
+            zero_index[rows] = np.where(is_zero, seg_index, no_index).min(axis=1)
+
+        # Örtüşme bulunamayan hızlı satırlar için en yakın segment
+        nearest_rows = np.flatnonzero(fast & (best < 0))
+        if len(nearest_rows):
+            best[nearest_rows] = self._nearest(chunk_starts[nearest_rows], chunk_ends[nearest_rows],
+                                               zero_index[nearest_rows], no_index)
+
+        assignments = [
+            (index, overlap) if index >= 0 else (None, 0)
+            for index, overlap in zip(best.tolist(), overlaps.tolist())
+        ]
+        # Geçersiz segmentler, sıfır süreli parçalar veya çok geniş pencereler satır bazında tam olarak işlenir
+        slow_rows = np.flatnonzero(~fast)
+        if len(slow_rows):
+            if self._fallback is None:
+                self._fallback = SpeakerIndex(self.speakers)
+            for row in slow_rows.tolist():
+                assignments[row] = self._fallback.assign(chunk_starts[row].item(), chunk_ends[row].item())
+        return assignments
+
+
+def _aligned_segment(speaker, chunk_text, chunk_start, chunk_end, overlap):
+    # Metin boş olsa bile segment ekle (sadece zaman bilgisi için)
+    duration = chunk_end - chunk_start
+    return {
+        "speaker": speaker,
+        "text": chunk_text if chunk_text else "[sessiz segment]",
+        "start": chunk_start,
+        "end": chunk_end,
+        # Parça süresinin atanan konuşmacıyla örtüşen oranı (en yakın konuşmacı ataması için 0)
+        "overlap_ratio": overlap / duration if duration > 0 else 0.0
+    }
+
+def _fallback_alignment(transcription, end=60.0):
+    return [{
+        "speaker": "SPEAKER_01",
+        "text": transcription,
+        "start": 0.0,
+        "end": end  # Varsayılan bir süre
+    }]
+
+def _align(transcription, chunks, speakers, assign_many, speech_map=None):
+    print(f"Transkripsiyon ve konuşmacı birleştirme başlatılıyor")
+    print(f"Transkripsiyon: {transcription[:100]}...")
+    print(f"Chunk sayısı: {len(chunks) if chunks else 0}")
+    print(f"Konuşmacı segment sayısı: {len(speakers)}")
+
+    if not chunks or not speakers:
+        print(f"Chunk veya speaker verisi eksik. Birleştirme yapılamıyor.")
+        if not chunks and transcription:
+            # Eğer chunk yok ama transkripsiyon varsa, tüm transkripsiyon için default speaker ata
+            print(f"Chunk yok ama transkripsiyon var. Tüm metni SPEAKER_01'e atıyorum.")
+            return _fallback_alignment(transcription)
+        return []
+
+    # Eğer transkripsiyon boş ama chunk varsa işleme devam et
+    if not transcription and chunks:
+        print(f"Transkripsiyon metni boş ama {len(chunks)} chunk mevcut.")
+
+    # Zaman damgası geçersiz parçalar atlanır
+    parsed = []
+    skipped = 0
+    for chunk in chunks:
+        try:
+            parsed.append(_chunk_bounds(chunk))
+        except Exception as e:
+            skipped += 1
+            logger.warning(f"Segment işleme hatası: {str(e)}")
+
+    # Tüm parçaların konuşmacı atamasını tek seferde yap: [(segment indeksi, örtüşme), ...]
+    assignments = assign_many([bounds[0] for bounds in parsed], [bounds[1] for bounds in parsed]) if parsed else []
+
+    aligned_text = []
+    nearest_matches = 0
+    for (chunk_start, chunk_end, chunk_text), (best_index, overlap) in zip(parsed, assignments):
+        best_speaker = speakers[best_index]["speaker"] if best_index is not None else None
+        if best_speaker and not overlap:
+            nearest_matches += 1
+
+        # Varsayılan olarak ilk konuşmacıyı kullan eğer hala eşleşme yoksa
+        if not best_speaker:
+            best_speaker = speakers[0]["speaker"]
+
+        if best_speaker:
+            aligned_text.append(_aligned_segment(best_speaker, chunk_text, chunk_start, chunk_end, overlap))
+        else:
+            skipped += 1
+
+    if nearest_matches:
+        print(f"{nearest_matches} segment için direkt eşleşme bulunamadı, en yakın konuşmacı atandı")
+    if skipped:
+        print(f"{skipped} segment eşleştirilemedi ve atlandı")
+
+    # Sonuç boşsa ve tam transkripsiyon varsa, tüm metni tek bir segmente dönüştür
+    if not aligned_text and transcription:
+        print(f"Eşleştirilmiş segment oluşturulamadı, tüm transkripsiyon metni tek segment olarak ekleniyor")
+        return _fallback_alignment(transcription)
+
+    print(f"Birleştirme tamamlandı. Toplam {len(aligned_text)} segment oluşturuldu.")
+    if speech_map is not None:
+        # VAD bölgeleri verildiyse eşleştirilen segmentlerin kapsadığı sessizliği de raporla
+        covered_silence = sum(speech_map.silence_within(segment["start"], segment["end"]) for segment in aligned_text)
+        print(f"Kayıttaki sessizlik oranı: %{speech_map.silence_ratio * 100:.1f}, "
+              f"segmentlerin içinde kalan sessizlik: {covered_silence:.1f} saniye")
+    return aligned_text
+
+def _align_safely(transcription, chunks, speakers, assign_many, speech_map=None):
+    try:
+        return _align(transcription, chunks, speakers, assign_many, speech_map)
     except Exception as e:
         print(f"Transkripsiyon ve konuşmacı birleştirme hatası: {str(e)}")
         import traceback
         print(f"Birleştirme hata detayları:\n{traceback.format_exc()}")
         # Hata durumunda transkripsiyon varsa, onu tek bir segment olarak döndür
         if transcription:
-            return [{
-                "speaker": "SPEAKER_01",
-                "text": transcription,
-                "start": 0.0,
-                "end": len(transcription.split()) / 2.0  # Yaklaşık olarak saniye cinsinden süre (kelime başına 0.5 saniye)
-            }]
-        return [] 
\ No newline at end of file
+            # Yaklaşık olarak saniye cinsinden süre (kelime başına 0.5 saniye)
+            return _fallback_alignment(transcription, end=len(transcription.split()) / 2.0)
+        return []
+
+def align_transcription_with_speakers(transcription, chunks, speakers, speech_map=None):
+    """
+    Her transkripsiyon parçasını en çok örtüşen konuşmacıya atar. Konuşmacı segmentleri aralık ağacında ve
+    sıralı dizilerde tutulur, bu yüzden süre O((n+m) log m + k) olur (n: parça, m: segment, k: örtüşme sayısı).
+    speech_map (VAD konuşma bölgeleri) verilirse sessizlik oranı da raporlanır.
+    """
+    def assign_many(chunk_starts, chunk_ends):
+        index = SpeakerIndex(speakers)
+        return [index.assign(chunk_start, chunk_end) for chunk_start, chunk_end in zip(chunk_starts, chunk_ends)]
+    return _align_safely(transcription, chunks, speakers, assign_many, speech_map)
+
+def align_transcription_with_speakers_linear(transcription, chunks, speakers, speech_map=None):
+    """Her parça için tüm segmentleri tarayan referans eşleştirme, O(n*m). Karşılaştırma ve test için tutulur."""
+    def assign_many(chunk_starts, chunk_ends):
+        return [_assign_speaker_linear(chunk_start, chunk_end, speakers)
+                for chunk_start, chunk_end in zip(chunk_starts, chunk_ends)]
+    return _align_safely(transcription, chunks, speakers, assign_many, speech_map)
+
+def align_transcription_with_speakers_vectorized(transcription, chunks, speakers, block_size=4096, max_window=256,
+                                                 speech_map=None):
+    """
+    align_transcription_with_speakers ile aynı girdileri alır ve aynı sonucu üretir; zaman damgalarını
+    NumPy dizilerinde tutup örtüşmeleri blok blok toplu hesaplar. Çok uzun transkriptler için uygundur.
+    """
+    return _align_safely(
+        transcription, chunks, speakers,
+        lambda chunk_starts, chunk_ends: VectorizedSpeakerIndex(speakers).assign_many(
+            chunk_starts, chunk_ends, block_size=block_size, max_window=max_window
+        ),
+        speech_map
+    )
+
+def select_alignment_function(mode, chunk_count):
+    """ALIGNMENT_MODE değerine (auto, indexed, vectorized, linear) göre eşleştirme fonksiyonunu seçer."""
+    if mode == "vectorized" or (mode == "auto" and chunk_count >= VECTORIZED_ALIGNMENT_MIN_CHUNKS):
+        return align_transcription_with_speakers_vectorized
+    if mode == "linear":
+        return align_transcription_with_speakers_linear
+    return align_transcription_with_speakers